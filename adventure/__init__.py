@@ -0,0 +1,21 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+The Python Adventure game.
+
+The game engine is split across data.py (the world's data and the data
+lookup functions), output.py, commands.py, rules.py and game.py, and the
+built-in world is in builtin.py.  Everything else here is built on top of
+those:  loading worlds from files, sharing a world between sessions,
+replays, snapshots, the server and so on.
+
+Importing the package (or any of the engine modules) has no side effects:
+nothing is printed or read, and the built-in world isn't built until it is
+first needed.  python -m adventure plays the game at the console, and
+python_adventure.py still works as it always has.
+'''
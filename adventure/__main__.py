@@ -0,0 +1,25 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Plays the built-in world at the console.
+
+Run from the repository root:
+    python -m adventure [--names]
+
+With --names, object names can be cut short ("take oni") or a letter or two
+off, and near misses get a "Did you mean" (see adventure/names.py).
+'''
+
+import random
+import sys
+
+from adventure.game import PlayGame
+
+
+if __name__ == "__main__":
+    PlayGame(random.Random(), "--names" in sys.argv[1:])
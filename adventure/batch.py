@@ -0,0 +1,278 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Batch simulation of many recorded games across several processes.
+
+Every transcript (a file of commands, one per line, as for adventure/replay.py)
+in a directory is replayed once per seed, and the results are gathered into
+one report:  how many games were won, lost to the creature, exited or left
+unfinished, how many turns the games took, and how long each kind of
+command took to run.
+
+The work is spread over a pool of worker processes.  Each worker freezes the
+world once when it starts (see adventure/overlay.py) and every game it plays
+gets its own cheap view of that, so nothing but file names goes to a worker
+and nothing but a small partial report comes back.  Games are handed out in
+chunks to keep that traffic down, and since games never wait on each other
+the run time should shrink almost in step with the number of cores.
+
+Run from the repository root:
+    python -m adventure.batch transcripts/ --workers 4 --seeds 100
+    python -m adventure.batch transcripts/ --json report.json --world garden.json
+'''
+
+import argparse
+import concurrent.futures
+import glob
+import json
+import os
+import sys
+import time
+
+from adventure.commands import commandVerbs, NormalizeCommandVerb
+from adventure.rules import gameOutcomes
+from adventure.game import StartGame, RunCommand, SplitCommands
+from adventure.overlay import FreezeWorld
+from adventure.replay import NewReplaySession, ReadTranscript
+from adventure.world import LoadGameWorld
+
+
+# Outcome of a game whose transcript ran out before the game ended.
+unfinishedOutcome = "unfinished"
+
+# Timing key for commands that aren't in the command registry.
+unknownVerb = "(unknown)"
+
+# How many chunks of games each worker gets, roughly.  More chunks balance
+# the load better, fewer cost less in traffic between the processes.
+chunksPerWorker = 4
+
+# The frozen world (and its rules) each worker process plays its games in,
+# set up once by LoadWorker.
+workerWorld = None
+
+
+def BuildVerbNames():
+    '''
+    Returns a dictionary of (handler, argument) -> the first verb registered for
+    it, so that "n" and "north" are timed together as "north".
+    '''
+    verbNames = {}
+    for verb, registeredCommand in commandVerbs.items():
+        verbNames.setdefault(registeredCommand, verb)
+    return verbNames
+
+verbNames = BuildVerbNames()
+
+def GetVerbName( action ):
+    '''
+    Returns the name a command's timings are reported under.
+    '''
+    registeredCommand = commandVerbs.get(NormalizeCommandVerb(action.partition(" ")[0]))
+    if registeredCommand is None:
+        return unknownVerb
+    return verbNames[registeredCommand]
+
+def NewReport():
+    '''
+    Returns an empty report, ready to be filled in by SimulateGame and MergeReports.
+
+    turnCounts is a dictionary of game turns played -> number of games, and
+    commandTimes is verb -> [count, total seconds, longest seconds].
+    '''
+    outcomes = {}
+    for outcome in gameOutcomes + (unfinishedOutcome,):
+        outcomes[outcome] = 0
+    return {"games": 0, "outcomes": outcomes, "turnCounts": {}, "commandTimes": {}, "errors": []}
+
+def MergeReports( report, partialReport ):
+    '''
+    Adds everything in partialReport into report.
+    '''
+    report["games"] += partialReport["games"]
+    for outcome, count in partialReport["outcomes"].items():
+        report["outcomes"][outcome] = report["outcomes"].get(outcome, 0) + count
+    for turns, count in partialReport["turnCounts"].items():
+        report["turnCounts"][turns] = report["turnCounts"].get(turns, 0) + count
+    for verb, timing in partialReport["commandTimes"].items():
+        totals = report["commandTimes"].get(verb)
+        if totals is None:
+            report["commandTimes"][verb] = list(timing)
+        else:
+            totals[0] += timing[0]
+            totals[1] += timing[1]
+            totals[2] = max(totals[2], timing[2])
+    report["errors"].extend(partialReport["errors"])
+
+def SimulateGame( seed, commands, sharedRoomList, sharedObjectList, rules, report ):
+    '''
+    Plays one game from the start with the given seed, timing every command,
+    and adds how it went to the report.
+    '''
+    session = NewReplaySession(seed, sharedRoomList, sharedObjectList, rules)
+    commandTimes = report["commandTimes"]
+    # Help and commands that weren't understood don't use up a turn, so the
+    # game's own count is kept rather than a count of commands.
+    turns = 0
+    # Nobody reads the output, so it is just thrown away as it goes.
+    running = StartGame(session)
+    session.output.Take()
+    # Lines holding several commands are timed one command at a time.
+    actions = [action for line in commands for action in SplitCommands(line)]
+    for action in actions:
+        if not running:
+            break
+        startTime = time.perf_counter()
+        running = RunCommand(session, action)
+        elapsed = time.perf_counter() - startTime
+        # Exiting sets the turn negative, so the last real count is kept.
+        if session.gameTurn >= 0:
+            turns = session.gameTurn
+        session.output.Take()
+
+        verb = GetVerbName(action)
+        timing = commandTimes.get(verb)
+        if timing is None:
+            commandTimes[verb] = [1, elapsed, elapsed]
+        else:
+            timing[0] += 1
+            timing[1] += elapsed
+            if elapsed > timing[2]:
+                timing[2] = elapsed
+
+    outcome = session.outcome
+    if outcome == "":
+        outcome = unfinishedOutcome
+    report["games"] += 1
+    report["outcomes"][outcome] += 1
+    report["turnCounts"][turns] = report["turnCounts"].get(turns, 0) + 1
+
+def LoadWorker( worldFile ):
+    '''
+    Sets up a worker process:  loads and freezes the world it will play every
+    game in (the built-in world if worldFile is None).
+    '''
+    global workerWorld
+    world = LoadGameWorld(worldFile)
+    workerWorld = FreezeWorld(world[0], world[1]) + [world[2]]
+
+def RunChunk( tasks ):
+    '''
+    Plays a chunk of games in a worker process and returns their partial report.
+    Each task is [transcript file, first seed, number of seeds].
+    A game that raises is reported in the errors, and the rest still run.
+    '''
+    report = NewReport()
+    for transcriptFile, firstSeed, seedCount in tasks:
+        try:
+            commands = ReadTranscript(transcriptFile)
+        except (OSError, UnicodeDecodeError) as error:
+            report["errors"].append("%s: %s" % (transcriptFile, error))
+            continue
+        for seed in range(firstSeed, firstSeed + seedCount):
+            try:
+                SimulateGame(seed, commands, workerWorld[0], workerWorld[1], workerWorld[2], report)
+            except Exception as error:
+                # A broken world shouldn't cost the report for every other game.
+                report["errors"].append("%s (seed %d): %s: %s" % (transcriptFile, seed, type(error).__name__, error))
+    return report
+
+def SplitTasks( tasks, chunkCount ):
+    '''
+    Splits the task list into at most chunkCount chunks of nearly equal size.
+    '''
+    chunkCount = max(1, min(chunkCount, len(tasks)))
+    chunkSize = -(-len(tasks) // chunkCount)
+    return [tasks[start:start + chunkSize] for start in range(0, len(tasks), chunkSize)]
+
+def RunBatch( transcriptFiles, firstSeed, seedCount, workerCount, worldFile ):
+    '''
+    Replays every transcript once per seed, using workerCount processes
+    (or this one, if workerCount is 1).  Returns the combined report.
+    '''
+    report = NewReport()
+    if workerCount <= 1:
+        LoadWorker(worldFile)
+        MergeReports(report, RunChunk([[transcriptFile, firstSeed, seedCount] for transcriptFile in transcriptFiles]))
+        return report
+
+    # A few transcripts played with many seeds still need to be shared out
+    # evenly, so long runs of seeds are split up too.
+    chunkCount = workerCount * chunksPerWorker
+    seedsPerTask = max(1, -(-len(transcriptFiles) * seedCount // chunkCount))
+    tasks = []
+    for transcriptFile in transcriptFiles:
+        for taskSeed in range(firstSeed, firstSeed + seedCount, seedsPerTask):
+            tasks.append([transcriptFile, taskSeed, min(seedsPerTask, firstSeed + seedCount - taskSeed)])
+    chunks = SplitTasks(tasks, chunkCount)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workerCount, initializer=LoadWorker, initargs=(worldFile,)) as pool:
+        for partialReport in pool.map(RunChunk, chunks):
+            MergeReports(report, partialReport)
+    return report
+
+def FormatReport( report ):
+    '''
+    Returns the report as text for people to read.
+    '''
+    lines = ["games:  %d" % report["games"]]
+    for outcome, count in report["outcomes"].items():
+        lines.append("  %-10s  %d" % (outcome, count))
+
+    turnCounts = report["turnCounts"]
+    if len(turnCounts) > 0:
+        totalTurns = sum([turns * count for turns, count in turnCounts.items()])
+        lines.append("turns per game:  min %d, mean %.1f, max %d" %
+                     (min(turnCounts), totalTurns / report["games"], max(turnCounts)))
+
+    lines.append("command timings:")
+    lines.append("  %-12s %10s %12s %12s" % ("verb", "count", "mean us", "max us"))
+    for verb, timing in sorted(report["commandTimes"].items()):
+        lines.append("  %-12s %10d %12.1f %12.1f" % (verb, timing[0], timing[1] / timing[0] * 1e6, timing[2] * 1e6))
+
+    for error in report["errors"]:
+        lines.append("error:  %s" % error)
+    return "\n".join(lines)
+
+def Main( arguments ):
+    parser = argparse.ArgumentParser(prog="python -m adventure.batch",
+                                     description="Replay a directory of transcripts in parallel and report on the results.")
+    parser.add_argument("directory", help="directory of transcripts, one command per line")
+    parser.add_argument("--pattern", default="*.txt", help="which files in the directory are transcripts")
+    parser.add_argument("--seed", type=int, default=0, help="first seed for the creature's wandering")
+    parser.add_argument("--seeds", type=int, default=1, help="how many seeds to play each transcript with")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("--json", help="also save the report to this file as JSON")
+    parser.add_argument("--world", help="world file to play in, instead of the built-in world")
+    options = parser.parse_args(arguments)
+
+    transcriptFiles = sorted(glob.glob(os.path.join(options.directory, options.pattern)))
+    if len(transcriptFiles) == 0:
+        print("No transcripts found in %s." % options.directory)
+        return 1
+
+    startTime = time.perf_counter()
+    if options.world is not None:
+        # Load it once here, so the workers all find its cache ready.
+        LoadGameWorld(options.world)
+    report = RunBatch(transcriptFiles, options.seed, options.seeds, options.workers, options.world)
+    elapsed = time.perf_counter() - startTime
+
+    print(FormatReport(report))
+    print("%d games in %.2f s with %d workers (%.0f games/s)" %
+          (report["games"], elapsed, options.workers, report["games"] / elapsed))
+    if options.json is not None:
+        report["seconds"] = elapsed
+        report["workers"] = options.workers
+        with open(options.json, "w", encoding="utf-8") as jsonFile:
+            json.dump(report, jsonFile, indent=2)
+    if len(report["errors"]) > 0:
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(Main(sys.argv[1:]))
@@ -0,0 +1,244 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+The built-in world:  the rooms, objects and rules of the original game.
+
+Nothing imports this until the world is first needed (see GetGameRules in
+adventure/rules.py and PlayGame in adventure/game.py), so importing the
+game engine doesn't build it.  The console game plays in these lists
+directly;  everything else plays in its own view of them (see
+adventure/overlay.py).
+'''
+
+from adventure.data import ObjectList, RoomList
+from adventure.rules import CompileRules
+
+
+########
+### Begin game data
+########
+
+# Rooms
+#
+#   This is a list of rooms, where each "room" is just a list containing the
+#   description and a list of exits.  The exits are always ordered [N, E, S, W].
+#   An room with no exit in a direction will list "-1" in that index.
+#
+#   eg. A room's description will always be found at:
+#       roomList[room_number][0]
+#
+#   eg. A room's South exit will always be found at:
+#       roomList[room_number][1][2]
+#
+
+roomList = RoomList([
+    [
+        #Room 0
+        "You are in a small stone room with no furnishings.  Near the doorway is a tablet with writing on it.",
+        [-1,1,-1,-1]
+    ],
+    [
+        #Room 1
+        "You are in a small clearing at the bottom of a steep valley.  There appear to be a few small stone houses in the area, and a path leading off to the east.",
+        [2,4,3,0]
+    ],
+    [
+        #Room 2
+        "You are in what appears to have been a small herb garden in front of a crumbling structure.  A few plants are still growing, but much of the area has been overgrown with weeds.",
+        [-1,-1,1,-1]
+    ],
+    [
+        #Room 3
+        "You are in a small stone room with no furnishings.",
+        [1,-1,-1,-1]
+    ],
+    [
+        #Room 4
+        "You are on a path through some dense woods.  There is a fork in the path here.",
+        [-1,5,6,1]
+    ],
+    [
+        #Room 5
+        "You are standing before a large stone archway with a gate set in it.",
+        [-1,-1,-1,4]
+    ],
+    [
+        #Room 6
+        "You are at the edge of a small lake in the valley.  The water appears to be clear and calm.",
+        [4,-1,-1,-1]
+    ],
+    [
+        #Room 7 - Placeholder
+        "",
+        [-1,-1,-1,-1]
+    ]])
+
+# Objects
+#
+#   This is a list of anything which the player can interact with.  It's a
+#   relatively complicated list of lists to keep track of each object's
+#   properties and status.
+#
+#   Each item in the list represents a single object, structered thusly:
+#  - List: Object_Data (Ordered list of individual data items for each object.)
+#    - String: Object_Name
+#    - List: Aliases (List of strings that are also acceptable names for this object.
+#            Names are matched without regard to case, so "TAB" and "tab" both match "Tab".)
+#    - String: Description
+#    - Int: Current_Room_ID (-1 if it isn't anywhere, inventoryLocation if the player has it.)
+#    - Boolean: Usable?
+#    - Boolean: Takable?
+#    - Int: Status
+#    - String: Use_String
+#    - String: Take_String
+#    - List: Status_Strings (Ordered list of strings for each status used by this item in the `Status` Int above.)
+#
+
+objectList = ObjectList([
+    [
+        "Tablet", #Object Name
+        [   #Aliases
+            "Tab"],
+        #Description string
+        "As each eon comes to a close an individual is chosen to open the gate to prosperity for posterity.  As you now read this, know that you have been selected for this task.  Seek ye the gate and the key and pass through, that those who come after may follow.",
+        0,      #Room
+        False,  #Usable?
+        False,  #Takable?
+        -1,     #Status number
+        "",     #"Use" message
+        "",     #"Take" message
+        []      #List of status messages
+    ],
+    [
+        "Gate",
+        [],
+        "The gate is formed of some gleaming metal and appears to be polished to a high luster.",
+        5,
+        False,
+        False,
+        0,
+        "",
+        "",
+        [
+            "The gate is locked.",
+            "The gate is unlocked."
+        ]
+    ],
+    [
+        "Garden",
+        [   "Plant", "Plants",
+            "Herb", "Herbs",
+            "Weeds"
+            ],
+        "The garden is almost completely overgrown with weeds.  There appear to still be some onions growing off to one side.",
+        2,
+        False,
+        False,
+        -1,
+        "",
+        "",
+        []
+    ],
+    [
+        "Onion",
+        ["Onions"],
+        "It's a fresh onion.",
+        2,
+        True,
+        True,
+        -1,
+        "You offer the onion to the creature, which accepts it with a broad smile.  The creature removes the shiny object hanging from its neck and hands it to you before wandering off to eat.",
+        "You dig up a fresh onion and take it with you.",
+        []
+    ],
+    [
+        "Key",
+        [],
+        "It looks like a gleaming brass key.",
+        -1,
+        True,
+        False,
+        -1,
+        "You unlock the gate with the key.",
+        "You have received a key.",
+        []
+    ],
+    [
+        "Water",
+        ["Lake"],
+        "The water appears to be calm and clear.",
+        6,
+        False,
+        False,
+        -1,
+        "",
+        "",
+        []
+    ],
+    [
+        "Creature",
+        [],
+        "The creature walks in a constant slouch and still stands nearly twice your height.  There is a shiny object hanging by a thong from its neck. It seems hungry.",
+        6,
+        False,
+        False,
+        0,
+        "",
+        "",
+        ["There is a large bipedal creature here.  You hear it mumble about needing something to eat.",
+         "There is a large bipedal creature here.  It has a hungry look in its eyes when it sees you."]
+    ]])
+
+
+# Rules
+#
+#   Everything special that happens in the game.  See "##### Rules" in
+#   adventure/rules.py for how they are written.
+#
+
+ruleList = [
+    {   # Feeding the onion to the creature gets you its key.
+        "when": "use", "object": "Onion",
+        "if": [["here", "Creature"]],
+        "then": [
+            ["remove", "Onion"],
+            ["useMessage", "Onion"],
+            ["move", "Creature", -1],
+            ["take", "Key"],
+            ["takeMessage", "Key"]]},
+    {   # The key opens the gate, and the way out.
+        "when": "use", "object": "Key",
+        "if": [["here", "Gate"]],
+        "then": [
+            ["remove", "Key"],
+            ["setStatus", "Gate", 1],
+            ["setExit", 5, 1, 7],
+            ["useMessage", "Key"]]},
+    {   # Creature begins moving around after 10 game turns.
+        "when": "world",
+        "if": [["turnAtLeast", 10]],
+        "then": [["wander", "Creature"]]},
+    {   # Through the gate is the way out.  You win!
+        "when": "turn",
+        "if": [["playerIn", 7]],
+        "then": [
+            ["say", "\n\nCongradulations!  You have successfully opened the gate and stepped out into the world once more!\n"],
+            ["end", "win"]]},
+    {   # Creature becomes hostile after 25 game turns.
+        "when": "turn",
+        "if": [["turnAtLeast", 25]],
+        "then": [["setStatus", "Creature", 1]]},
+    {   # If the creature is hostile and you stay in the same room as it, you lose.
+        "when": "turn",
+        "if": [["encounter"], ["here", "Creature"]],
+        "then": [
+            ["say", "\n\nThe creature attacked you in the throes of its hunger.  Defenseless, you stood no chance.  You have died and failed.\n"],
+            ["end", "death"]]}]
+
+gameRules = CompileRules(ruleList, len(roomList), objectList)
+
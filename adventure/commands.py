@@ -0,0 +1,350 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+The commands the player can type:  a Command* function for each thing the
+player can do, the command registry that maps verbs to them, and
+ParseCommand, which carries out one line of input.
+'''
+
+from adventure.data import GetRoomDescription, GetRoomExits, GetObjectID, GetObjectName, \
+    IsUsableObject, IsTakableObject, GetTakeMessage, GetObjectStatusMessage, GetObjectLocation, \
+    GetObjectsInRoom, AddToInventory, IsInInventory, GetObjectDescription, inventoryLocation, \
+    GetRoomVersion, GetRoomContentsVersion, GetRoomViews
+from adventure.output import Say
+from adventure.rules import HasUseRules, RunUseRules
+
+
+##### Command handling
+
+# I want a specific function for each command so I can easily follow the code paths later.
+
+def CommandHelp():
+    '''
+    Prints the list of permitted commands.
+    '''
+    Say('''
+Commands:
+  Help
+  Inventory
+  Look
+  Examine <Object>
+  Take <Object>
+  Use <Object>
+  N or North
+  E or East
+  S or South
+  W or West
+  Exit
+
+''')
+
+# Names of the exits, in exit list order, as CommandLook lists them.
+exitNames = ["North", "East", "South", "West"]
+
+# How many rendered room views each cache keeps.  The oldest go first.
+roomViewCacheSize = 1024
+
+def RenderRoomView( roomID, roomList, objectList ):
+    '''
+    Returns everything CommandLook says about a room, as one string:  its
+    description, the status of any objects in it, and its exits.
+    '''
+    # The room description.  We should always have one.
+    lines = [GetRoomDescription(roomID,roomList)]
+    # Next we check for any items in this room.  The room index only gives us
+    # the items that are actually here, so sort them to keep a steady order.
+    for item in sorted(GetObjectsInRoom(roomID,objectList)):
+        # We have an item in this room.  Does it have a status message?
+        # Checking the length should give a valid number even if the status doesn't exist.
+        statusMessage = GetObjectStatusMessage(item,objectList)
+        if len(statusMessage) > 0:
+            lines.append(statusMessage)
+    # All that's left is to list the exits.
+    localExits = GetRoomExits(roomID,roomList)
+    exits = [exitNames[direction] + "  " for direction in range(4) if localExits[direction] > -1]
+    #Special case sanity check.  If there are no exits, list nothing.
+    if len(exits) > 0:
+        lines.append("Exits are:  " + "".join(exits))
+    return "\n".join(lines)
+
+def GetRoomView( roomID, roomList, objectList ):
+    '''
+    Returns RenderRoomView's string for a room, from the object list's cache
+    of room views when nothing the room shows has changed since it was last
+    rendered.  Storage that doesn't keep room versions is rendered every time.
+    '''
+    views = GetRoomViews(objectList)
+    roomVersion = GetRoomVersion(roomID,roomList)
+    contentsVersion = GetRoomContentsVersion(roomID,objectList)
+    if views is None or roomVersion < 0 or contentsVersion < 0:
+        return RenderRoomView(roomID,roomList,objectList)
+    key = (roomID, roomVersion, contentsVersion)
+    view = views.get(key)
+    if view is not None:
+        views.move_to_end(key)
+        return view
+    view = RenderRoomView(roomID,roomList,objectList)
+    views[key] = view
+    if len(views) > roomViewCacheSize:
+        views.popitem(last=False)
+    return view
+
+def CommandLook( roomID, roomList, objectList):
+    '''
+    Writes the specified room's description, the status of any objects in the room,
+    and lists the exits from the specified room.
+    '''
+    Say(GetRoomView(roomID,roomList,objectList))
+
+def CommandExamine( objectName, roomID, roomList, objectList, playerInventory):
+    '''
+    Tries to examine the specified object.
+    '''
+    # Declaring the default failure string, that way players can't fish for item names.
+    examineFailString = 'You do not see anything that is called that.'
+    # Convert our input into a numeric ID that we can use.
+    currentObjectID = GetObjectID(objectName,objectList)
+    if currentObjectID < 0:
+        # Doesn't match a defined object.  Print the failure string.
+        Say(examineFailString)
+        return
+    # It's a defined object.  The player can examine it if they have it with
+    # them or if it's in the current room.
+    currentLocation = GetObjectLocation(currentObjectID,objectList)
+    if currentLocation == inventoryLocation or currentLocation == roomID:
+        # Print the object status (if any) and description (if any).
+        if len(GetObjectStatusMessage(currentObjectID,objectList)) > 0:
+            Say(GetObjectStatusMessage(currentObjectID,objectList))
+        if len(GetObjectDescription(currentObjectID,objectList)) > 0:
+            Say(GetObjectDescription(currentObjectID,objectList))
+        # We found the object.  Return to caller.
+        return
+    # We didn't find the object.  Print the failure string.
+    Say(examineFailString)
+
+def CommandTake( objectName, roomID, roomList, objectList, playerInventory):
+    '''
+    Tries to take the named object.
+    '''
+    # Declaring the default failure string.
+    takeFailString = 'You cannot take that.'
+    # Convert our input into a numeric ID that we can use.
+    currentObjectID = GetObjectID(objectName,objectList)
+    if currentObjectID < 0:
+        # Doesn't match a defined object.  Print the failure string.
+        Say(takeFailString)
+        return
+    # Is the object in the room?
+    if GetObjectLocation(currentObjectID,objectList) == roomID:
+        # Object is here.  Can it be taken?
+        if IsTakableObject(currentObjectID,objectList):
+            # It's takable.  Take it.
+            # This involves moving it into the player's inventory and
+            #  printing any special "take" message.
+            AddToInventory(currentObjectID,objectList,playerInventory)
+            if len(GetTakeMessage(currentObjectID,objectList)) > 0:
+                Say(GetTakeMessage(currentObjectID,objectList))
+            # Object is now "Taken".  Return to caller.
+            return
+        # Object not takable.  Default through...
+    # Object not present or not takable.  Print failure string.
+    Say(takeFailString)
+
+def CommandUse( objectName, roomID, roomList, objectList, playerInventory):
+    '''
+    Try to use an object.
+
+    This command used to be full of special cases.  They are rules in the
+    game data now (see ruleList), so new worlds can have their own.
+
+    Most player-caused special actions occur inside this function.
+    '''
+    # First we cover the usual basics, like if the thing can be used at all.
+    # Declaring the default failure string.
+    useFailString = 'You do not have that.'
+    # Convert our input into a numeric ID that we can use.
+    currentObjectID = GetObjectID(objectName,objectList)
+    if currentObjectID < 0:
+        # Doesn't match a defined object.  Print the failure string.
+        Say(useFailString)
+        return
+    # It's a defined object.  Does the player have it with them?
+    if not IsInInventory(currentObjectID,objectList):
+        # Player doesn't have the object.  Print the failure string and return.
+        Say(useFailString)
+        return
+    if not IsUsableObject(currentObjectID,objectList):
+        # Player has the object but can't use it.  Print failure string and return.
+        # This shouldn't happen in this game when unaltered.  Let's mention that.
+        Say("You can't use that.  This situation shouldn't happen.")
+        return
+    # At this point, we know the player both *has* and *can use* the object.
+
+    ########
+    #### Begin Special Case Handling
+    ########
+
+    # What using something actually does is up to the world's rules (see
+    # ruleList), which only ever look at the rules for this one object.
+    if not HasUseRules(currentObjectID):
+        ## ??? Unknown Usable Item
+        # This should never be reached if the game is properly coded.
+        # Print a meaningful message to the player.
+        Say("You don't know how to use that.  You should speak with the developer about this.")
+        return
+    if not RunUseRules(currentObjectID,roomList,objectList,playerInventory,roomID):
+        # None of its rules work here.  (The onion needs the creature, the key needs the gate.)
+        Say("You can't use that here.")
+
+    #### End of magic "Use" handler
+
+
+##### Command registry
+
+#  Every verb the player can type is looked up in one dictionary, rather than
+#  being compared against each known spelling in turn.  Each entry holds the
+#  handler to call and an extra argument for that handler (the exit slot for
+#  movement, unused otherwise).
+#
+#  Every handler takes the same arguments and returns the same list that
+#  ParseCommand returns:  [roomID, gameTurn, newLook]
+
+commandVerbs = {}
+
+def NormalizeCommandVerb( verb ):
+    '''
+    Returns the form of a verb that is used as a key in the command registry.
+    '''
+    return verb.casefold()
+
+def RegisterCommand( handler, argument, verbs ):
+    '''
+    Adds a handler to the command registry under each of the given verbs.
+    Verbs are matched without regard to case, so only one spelling of each is needed.
+    '''
+    for verb in verbs:
+        commandVerbs[NormalizeCommandVerb(verb)] = (handler, argument)
+
+def HandleHelp( argument, localObject, roomList, objectList, playerInventory, roomID, gameTurn ):
+    '''
+    Command handler for "Help".
+    '''
+    CommandHelp()
+    # Getting the list of commands does not advance game time.
+    return [roomID, gameTurn, False]
+
+def HandleLook( argument, localObject, roomList, objectList, playerInventory, roomID, gameTurn ):
+    '''
+    Command handler for "Look".
+    '''
+    # Request a look from the calling function to ensure proper timing.
+    return [roomID, gameTurn + 1, True]
+
+def HandleExamine( argument, localObject, roomList, objectList, playerInventory, roomID, gameTurn ):
+    '''
+    Command handler for "Examine".
+    '''
+    # This command only really works with a target.
+    if localObject == None:
+        Say("You carefully examine nothing.  There was nothing worth noting.")
+    else:
+        CommandExamine(localObject,roomID,roomList,objectList,playerInventory)
+    return [roomID, gameTurn + 1, False]
+
+def HandleTake( argument, localObject, roomList, objectList, playerInventory, roomID, gameTurn ):
+    '''
+    Command handler for "Take".
+    '''
+    # This command also only works with a target.
+    if localObject == None:
+        Say("You grasp at air, but fail to hold on to anything.")
+    else:
+        CommandTake(localObject,roomID,roomList,objectList,playerInventory)
+    return [roomID, gameTurn + 1, False]
+
+def HandleUse( argument, localObject, roomList, objectList, playerInventory, roomID, gameTurn ):
+    '''
+    Command handler for "Use".
+    '''
+    # Yet another command that only works with a target.
+    if localObject == None:
+        Say("You succesfully use nothing.  There was no effect.")
+    else:
+        CommandUse(localObject,roomID,roomList,objectList,playerInventory)
+    return [roomID, gameTurn + 1, False]
+
+def HandleInventory( argument, localObject, roomList, objectList, playerInventory, roomID, gameTurn ):
+    '''
+    Command handler for "Inventory".
+    '''
+    Say("You are carrying: ")
+    if len(playerInventory) > 0:
+        for item in playerInventory:
+            Say(GetObjectName(item,objectList))
+    else:
+        Say("  Nothing")
+    # Checking your pockets does not advance game time.
+    return [roomID, gameTurn, False]
+
+def HandleMove( argument, localObject, roomList, objectList, playerInventory, roomID, gameTurn ):
+    '''
+    Command handler shared by all of the movement directions.
+    The argument is the exit slot to follow:  0=North, 1=East, 2=South, 3=West
+    '''
+    # Check for a path in this direction.
+    destination = GetRoomExits(roomID,roomList)[argument]
+    if destination > -1:
+        # There's a path this way.  Move the player.
+        return [destination, gameTurn + 1, True]
+    Say("You see no way to go that direction.")
+    return [roomID, gameTurn + 1, False]
+
+def HandleExit( argument, localObject, roomList, objectList, playerInventory, roomID, gameTurn ):
+    '''
+    Command handler for "Exit".
+    '''
+    # Implementing this as an arbitrary <0 check in the caller.
+    return [roomID, -5, False]
+
+RegisterCommand(HandleHelp, None, ["Help", "H", "?"])
+RegisterCommand(HandleLook, None, ["Look", "L"])
+RegisterCommand(HandleExamine, None, ["Examine", "Ex", "X"])
+RegisterCommand(HandleTake, None, ["Take", "T"])
+RegisterCommand(HandleUse, None, ["Use", "U"])
+RegisterCommand(HandleInventory, None, ["Inventory", "Inv", "I"])
+RegisterCommand(HandleMove, 0, ["North", "N"])
+RegisterCommand(HandleMove, 1, ["East", "E"])
+RegisterCommand(HandleMove, 2, ["South", "S"])
+RegisterCommand(HandleMove, 3, ["West", "W"])
+RegisterCommand(HandleExit, None, ["Exit"])
+
+def ParseCommand( command, roomList, objectList, playerInventory, roomID, gameTurn ):
+    '''
+    Attempts to parse the provided string for a valid command.
+    If the command is recognized, this will further attempt to process the command.
+    '''
+    # Split the command string into "'command' 'object'" if a space is present.
+    # The first word is our command.  Anything after the first space is
+    # assumed to be the object.
+    localCommand, separator, localObject = command.partition(" ")
+    if separator == "":
+        # No space, so the command isn't trying to target something.
+        localObject = None
+
+    ### Command handling
+
+    registeredCommand = commandVerbs.get(NormalizeCommandVerb(localCommand))
+    if registeredCommand == None:
+        Say("I don't understand that command.  Please ask for HELP to see what commands are available.")
+        # Nothing happened, so the caller gets back what it gave us.
+        return [roomID, gameTurn, False]
+
+    # Return the new roomID and gameTurn to the caller.
+    handler, argument = registeredCommand
+    return handler(argument, localObject, roomList, objectList, playerInventory, roomID, gameTurn)
+
@@ -0,0 +1,333 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Compact storage for the room and object lists.
+
+The normal game data is a list of lists, where every object is its own
+10 item list.  That is easy to read and edit by hand, but every object costs
+several hundred bytes scattered all over memory.  The classes here keep the
+same data in parallel typed arrays instead, with every string stored once in
+a shared string table.
+
+Object names and aliases are the exception:  they are kept as plain lists of
+Python strings, not in the string table.  The name index needs every one of
+them as soon as a world loads, and uses the name itself as its key when the
+name is already normalized, so the string is shared with the index anyway.
+Keeping them out of the table also keeps them out of a memory-mapped string
+store (adventure/mapped.py), which would otherwise have to read all of them
+back at load time.  Aliases are kept as written, so they show up the way the
+world spells them.
+
+CompactRoomList and CompactObjectList provide the same methods as the data
+lookup functions in adventure/data.py, so they can be passed anywhere a
+roomList or objectList is expected.
+'''
+
+from array import array
+
+
+def NormalizeName( name ):
+    '''
+    Returns the name index key for a name.  This must match NormalizeObjectName
+    in adventure/data.py.
+    '''
+    key = name.casefold()
+    # Reuse the original string when nothing changed so it isn't stored twice.
+    if key == name:
+        return name
+    return key
+
+def GetBit( bits, index ):
+    '''
+    Returns the boolean stored at the given position of a bitset.
+    '''
+    return (bits[index >> 3] >> (index & 7)) & 1 == 1
+
+def SetBit( bits, index, value ):
+    '''
+    Stores a boolean at the given position of a bitset, growing it if needed.
+    '''
+    while len(bits) <= (index >> 3):
+        bits.append(0)
+    if value:
+        bits[index >> 3] |= 1 << (index & 7)
+    else:
+        bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+
+class StringTable:
+    '''
+    Every distinct string used by the compact lists, stored exactly once.
+    Strings are referred to by their position in the table.
+    '''
+    __slots__ = ("strings", "stringIDs")
+
+    def __init__( self ):
+        self.strings = []
+        self.stringIDs = {}
+
+    def __len__( self ):
+        return len(self.strings)
+
+    def Intern( self, text ):
+        '''
+        Returns the ID of the given string, adding it to the table if it's new.
+        '''
+        stringID = self.stringIDs.get(text)
+        if stringID is None:
+            stringID = len(self.strings)
+            self.strings.append(text)
+            self.stringIDs[text] = stringID
+        return stringID
+
+
+class CompactRoomList:
+    '''
+    Room descriptions and exits kept in typed arrays.
+    Room N's exits are exits[4*N] through exits[4*N+3], ordered [N, E, S, W].
+    '''
+    __slots__ = ("strings", "descriptions", "exits")
+
+    def __init__( self, roomList, strings ):
+        self.strings = strings
+        self.descriptions = array("i")
+        self.exits = array("i")
+        for room in roomList:
+            self.descriptions.append(strings.Intern(room[0]))
+            self.exits.extend(room[1])
+
+    def __len__( self ):
+        return len(self.descriptions)
+
+    def GetRoomDescription( self, roomID ):
+        return self.strings.strings[self.descriptions[roomID]]
+
+    def GetRoomExits( self, roomID ):
+        # Callers get their own list, so changing it doesn't change the room.
+        return self.exits[roomID * 4:roomID * 4 + 4].tolist()
+
+    def SetRoomExit( self, roomID, direction, newRoomID ):
+        self.exits[roomID * 4 + direction] = int(newRoomID)
+
+    def GetRoomVersion( self, roomID ):
+        # Vectorized ticks (adventure/ticks.py) write straight into the
+        # arrays, so there is no telling when a room changed.
+        return -1
+
+
+class CompactObjectList:
+    '''
+    Object data kept in parallel typed arrays, one slot per objectID.
+
+    Aliases and status strings vary in number, so they are packed end to end,
+    with a second array holding where each object's run starts.  Object N's
+    status strings are statusIDs[statusStarts[N]:statusStarts[N+1]].  Names
+    and aliases are plain strings rather than string table IDs (see above),
+    kept as written for showing to the player;  only their name index keys
+    are normalized.  Aliases added after loading go in extraAliases
+    rather than shifting the packed list.
+
+    The objects in each location are chained together through nextInRoom and
+    previousInRoom, with roomHeads holding the first object of each chain.
+    Moving an object is then a couple of array writes, and nothing is stored
+    per room beyond one dictionary entry.
+    '''
+    __slots__ = ("strings", "names", "descriptions", "useMessages", "takeMessages",
+                 "locations", "statuses", "usable", "takable",
+                 "aliasStarts", "aliases", "extraAliases",
+                 "statusStarts", "statusIDs",
+                 "nameIndex", "roomHeads", "nextInRoom", "previousInRoom")
+
+    def __init__( self, objectList, strings ):
+        self.strings = strings
+        self.names = []
+        self.descriptions = array("i")
+        self.useMessages = array("i")
+        self.takeMessages = array("i")
+        self.locations = array("i")
+        self.statuses = array("i")
+        self.usable = bytearray()
+        self.takable = bytearray()
+        self.aliasStarts = array("i", [0])
+        self.aliases = []
+        self.extraAliases = {}
+        self.statusStarts = array("i", [0])
+        self.statusIDs = array("i")
+        self.nameIndex = {}
+        self.roomHeads = {}
+        self.nextInRoom = array("i")
+        self.previousInRoom = array("i")
+        for objectData in objectList:
+            self.AddObject(objectData)
+
+    def __len__( self ):
+        return len(self.names)
+
+    def GetObjectAliases( self, objectID ):
+        '''
+        Returns the list of aliases for the given object, as they were written.
+        '''
+        aliases = self.aliases[self.aliasStarts[objectID]:self.aliasStarts[objectID + 1]]
+        return aliases + self.extraAliases.get(objectID, [])
+
+    def IndexName( self, name, objectID ):
+        '''
+        Adds a name to the name index.  Returns the key that was used.
+        '''
+        key = NormalizeName(name)
+        currentID = self.nameIndex.get(key, -1)
+        # Lower objectIDs win, just like the front-to-back search always did.
+        if currentID < 0 or objectID < currentID:
+            self.nameIndex[key] = objectID
+        return key
+
+    def ReindexName( self, key ):
+        # Only needed when an object gives up a name, so a full walk is fine.
+        for objectID in range(len(self.names)):
+            names = [self.names[objectID]] + self.GetObjectAliases(objectID)
+            if key in [NormalizeName(name) for name in names]:
+                self.nameIndex[key] = objectID
+                return
+
+    def LinkIntoRoom( self, objectID, roomID ):
+        '''
+        Puts an object at the front of a location's chain.
+        '''
+        head = self.roomHeads.get(roomID, -1)
+        self.nextInRoom[objectID] = head
+        self.previousInRoom[objectID] = -1
+        if head > -1:
+            self.previousInRoom[head] = objectID
+        self.roomHeads[roomID] = objectID
+
+    def UnlinkFromRoom( self, objectID, roomID ):
+        '''
+        Takes an object out of a location's chain.
+        '''
+        nextID = self.nextInRoom[objectID]
+        previousID = self.previousInRoom[objectID]
+        if previousID > -1:
+            self.nextInRoom[previousID] = nextID
+        elif nextID > -1:
+            self.roomHeads[roomID] = nextID
+        else:
+            # That was the last thing here.
+            del self.roomHeads[roomID]
+        if nextID > -1:
+            self.previousInRoom[nextID] = previousID
+
+    def GetObjectID( self, objectName ):
+        return self.nameIndex.get(NormalizeName(objectName), -1)
+
+    def GetObjectName( self, objectID ):
+        return self.names[objectID]
+
+    def SetObjectName( self, objectID, newName ):
+        oldKey = NormalizeName(self.names[objectID])
+        self.names[objectID] = str(newName)
+        if self.nameIndex.get(oldKey) == objectID:
+            del self.nameIndex[oldKey]
+            self.ReindexName(oldKey)
+        self.IndexName(newName, objectID)
+
+    def AddObjectAlias( self, objectID, alias ):
+        self.IndexName(str(alias), objectID)
+        self.extraAliases.setdefault(objectID, []).append(str(alias))
+
+    def AddObject( self, objectData ):
+        intern = self.strings.Intern
+        objectID = len(self.names)
+        self.names.append(objectData[0])
+        self.IndexName(objectData[0], objectID)
+        for alias in objectData[1]:
+            self.IndexName(alias, objectID)
+            self.aliases.append(alias)
+        self.aliasStarts.append(len(self.aliases))
+        self.descriptions.append(intern(objectData[2]))
+        self.locations.append(int(objectData[3]))
+        SetBit(self.usable, objectID, objectData[4])
+        SetBit(self.takable, objectID, objectData[5])
+        self.statuses.append(int(objectData[6]))
+        self.useMessages.append(intern(objectData[7]))
+        self.takeMessages.append(intern(objectData[8]))
+        for statusMessage in objectData[9]:
+            self.statusIDs.append(intern(statusMessage))
+        self.statusStarts.append(len(self.statusIDs))
+        self.nextInRoom.append(-1)
+        self.previousInRoom.append(-1)
+        self.LinkIntoRoom(objectID, int(objectData[3]))
+        return objectID
+
+    def IsUsableObject( self, objectID ):
+        return GetBit(self.usable, objectID)
+
+    def SetUsableObject( self, objectID, newValue ):
+        SetBit(self.usable, objectID, bool(newValue))
+
+    def GetUseMessage( self, objectID ):
+        return self.strings.strings[self.useMessages[objectID]]
+
+    def IsTakableObject( self, objectID ):
+        return GetBit(self.takable, objectID)
+
+    def GetTakeMessage( self, objectID ):
+        return self.strings.strings[self.takeMessages[objectID]]
+
+    def GetObjectStatus( self, objectID ):
+        return self.statuses[objectID]
+
+    def SetObjectStatus( self, objectID, newStatus ):
+        self.statuses[objectID] = int(newStatus)
+
+    def GetObjectStatusMessage( self, objectID ):
+        return self.GetStatusMessage(objectID, self.statuses[objectID])
+
+    def GetStatusMessage( self, objectID, status ):
+        if status > -1:
+            position = self.statusStarts[objectID] + status
+            # The packed array would happily hand back the next object's message.
+            if position >= self.statusStarts[objectID + 1]:
+                raise IndexError("object %d has no status message %d" % (objectID, status))
+            return self.strings.strings[self.statusIDs[position]]
+        return ""
+
+    def GetObjectLocation( self, objectID ):
+        return self.locations[objectID]
+
+    def SetObjectLocation( self, objectID, newLocation ):
+        newLocation = int(newLocation)
+        self.UnlinkFromRoom(objectID, self.locations[objectID])
+        self.locations[objectID] = newLocation
+        self.LinkIntoRoom(objectID, newLocation)
+
+    def GetObjectsInRoom( self, roomID ):
+        roomObjects = []
+        objectID = self.roomHeads.get(roomID, -1)
+        while objectID > -1:
+            roomObjects.append(objectID)
+            objectID = self.nextInRoom[objectID]
+        return roomObjects
+
+    def GetObjectDescription( self, objectID ):
+        return self.strings.strings[self.descriptions[objectID]]
+
+    def GetRoomContentsVersion( self, roomID ):
+        # See CompactRoomList.GetRoomVersion.
+        return -1
+
+    def GetRoomViews( self ):
+        return None
+
+
+def BuildCompactWorld( roomList, objectList ):
+    '''
+    Converts list-of-lists world data into compact storage.
+    Returns [compactRoomList, compactObjectList], which share one string table.
+    '''
+    strings = StringTable()
+    return [CompactRoomList(roomList, strings), CompactObjectList(objectList, strings)]
@@ -0,0 +1,451 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+The world's data structures, and the data lookup functions that every other
+part of the game goes through to read and change them.
+
+A room is [description, [N, E, S, W exits]], and an object is a list of
+fields (see the built-in world in adventure/builtin.py).  Nothing here knows
+about commands, rules or sessions.
+'''
+
+import collections
+import itertools
+
+##### Lookup indexes
+
+#  Scanning every object (and every alias of every object) for each name
+#  lookup gets slow once a world has more than a handful of objects.  The
+#  object list can carry an index that is built once when the world loads.
+
+def NormalizeObjectName( objectName ):
+    '''
+    Returns the form of a name or alias that is used as a key in the name index.
+    '''
+    return objectName.casefold()
+
+def BuildObjectNameIndex( objectList ):
+    '''
+    Returns a dictionary mapping every normalized object name and alias to its objectID.
+    If two objects share a name, the one with the lower objectID wins, which is
+    the same object the old front-to-back search used to find.
+    '''
+    nameIndex = {}
+    for itemNum in range(len(objectList)):
+        nameIndex.setdefault(NormalizeObjectName(objectList[itemNum][0]), itemNum)
+        for alias in objectList[itemNum][1]:
+            nameIndex.setdefault(NormalizeObjectName(alias), itemNum)
+    return nameIndex
+
+def IndexObjectName( objectName, objectID, objectList ):
+    '''
+    Adds a single name to the name index of an indexed object list.
+    An existing entry is only replaced if the new object comes first in the list.
+    '''
+    key = NormalizeObjectName(objectName)
+    currentID = objectList.nameIndex.get(key, -1)
+    if currentID < 0 or objectID < currentID:
+        objectList.nameIndex[key] = objectID
+
+def ReindexObjectName( key, objectList ):
+    '''
+    Finds the next object (if any) which still answers to an already normalized name.
+    This walks the whole list, but is only needed when an object gives up a name.
+    '''
+    for itemNum in range(len(objectList)):
+        names = [objectList[itemNum][0]] + objectList[itemNum][1]
+        for name in names:
+            if NormalizeObjectName(name) == key:
+                objectList.nameIndex[key] = itemNum
+                return
+
+def BuildObjectRoomIndex( objectList ):
+    '''
+    Returns a dictionary mapping each location to the set of objectIDs found there.
+    Locations with nothing in them are left out entirely.
+    '''
+    roomIndex = {}
+    for itemNum in range(len(objectList)):
+        roomIndex.setdefault(objectList[itemNum][3], set()).add(itemNum)
+    return roomIndex
+
+def MoveIndexedObject( objectID, oldLocation, newLocation, roomIndex ):
+    '''
+    Moves a single objectID from one location set to another in a room index.
+    '''
+    oldRoomObjects = roomIndex.get(oldLocation)
+    if oldRoomObjects is not None:
+        oldRoomObjects.discard(objectID)
+        # Don't keep empty sets around for every room something ever visited.
+        if len(oldRoomObjects) == 0:
+            del roomIndex[oldLocation]
+    roomIndex.setdefault(newLocation, set()).add(objectID)
+
+class ObjectList(list):
+    '''
+    A normal object list which also carries the name index and room index for its objects,
+    the version stamps of what each room holds, and the cache of rendered room views.
+    Anything that works on a plain object list works on this too.
+    '''
+    __slots__ = ("nameIndex", "roomIndex", "roomVersions", "views")
+
+    def __init__( self, objects ):
+        list.__init__(self, objects)
+        self.nameIndex = BuildObjectNameIndex(self)
+        self.roomIndex = BuildObjectRoomIndex(self)
+        self.roomVersions = {}
+        self.views = collections.OrderedDict()
+
+class RoomList(list):
+    '''
+    A normal room list which also carries the version stamps of each room's exits.
+    Anything that works on a plain room list works on this too.
+    '''
+    __slots__ = ("roomVersions",)
+
+    def __init__( self, rooms ):
+        list.__init__(self, rooms)
+        self.roomVersions = {}
+
+
+##### Room versions
+
+#  Looking around a room shows its description, the status of everything in
+#  it and its exits, and CommandLook keeps what it showed so it doesn't have
+#  to work it out again (see GetRoomView in adventure/commands.py).  To know
+#  when that is out of date, storage that can keeps a version stamp for each
+#  room, and anything that changes what a room shows (moving something in or
+#  out, changing the status of something in it, changing an exit) gives the
+#  room a new stamp.  Stamps come from one counter for the whole program, so
+#  two different states of a room never have the same stamp, even in two
+#  different sessions.  A room that has never changed has stamp 0.
+
+versionStamps = itertools.count(1)
+
+def StampRoom( roomID, roomVersions ):
+    '''
+    Gives a room a new version stamp.
+    '''
+    roomVersions[roomID] = next(versionStamps)
+
+
+##### Data lookup functions
+
+#  Define the helper functions so I don't have to remember how
+#  I structured everything for every data lookup.
+
+# Objects the player is carrying are kept in this pretend "room".
+# A location of -1 still means the object isn't anywhere in the world.
+inventoryLocation = -2
+
+# Shared answer for rooms with nothing in them.
+emptyRoom = frozenset()
+
+#  The room and object lists don't have to be real lists.  Any other storage
+#  (like the compact storage in adventure/compact.py) has to provide methods
+#  with the same names as these functions, taking the same arguments minus
+#  the list itself.  Real lists skip straight to the list handling, and so do
+#  tuples, which are how a world shared between sessions is kept read-only.
+
+def GetRoomDescription( roomID, roomList ):
+    ''' Returns the description string from the specified Room_ID in the RoomList list.'''
+    if not isinstance(roomList, (list, tuple)):
+        return roomList.GetRoomDescription(roomID)
+    return roomList[roomID][0]
+
+def GetRoomExits( roomID, roomList ):
+    ''' Returns the list of room connections from the specified Room_ID in the RoomList list.'''
+    if not isinstance(roomList, (list, tuple)):
+        return roomList.GetRoomExits(roomID)
+    return roomList[roomID][1]
+
+def SetRoomExit( roomID, direction, newRoomID, roomList ):
+    '''
+    Sets (or with -1, removes) the connection in one direction from the specified Room_ID.
+    Directions are numbered the same as the exit list:  0=North, 1=East, 2=South, 3=West
+    '''
+    if not isinstance(roomList, (list, tuple)):
+        return roomList.SetRoomExit(roomID, direction, newRoomID)
+    roomList[roomID][1][direction] = int(newRoomID)
+    roomVersions = getattr(roomList, "roomVersions", None)
+    if roomVersions is not None:
+        StampRoom(roomID, roomVersions)
+
+def GetRoomVersion( roomID, roomList ):
+    '''
+    Returns the version stamp of the specified room's exits, or -1 if the room
+    list doesn't keep them (and so views of the room can't be cached).
+    '''
+    if not isinstance(roomList, (list, tuple)):
+        return roomList.GetRoomVersion(roomID)
+    if isinstance(roomList, tuple):
+        # Read-only, so it never changes.
+        return 0
+    roomVersions = getattr(roomList, "roomVersions", None)
+    if roomVersions is None:
+        return -1
+    return roomVersions.get(roomID, 0)
+
+def GetObjectID( objectName, objectList ):
+    '''
+    This will try to find an object which has a Name or Alias matching the objectName input.
+    If found, it will return the matching objectID.  Otherwise it will return -1.
+    Matching ignores case, so "TABLET", "tablet" and "Tablet" all find the same object.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.GetObjectID(objectName)
+    # An indexed object list already knows every name, so this is a single lookup.
+    nameIndex = getattr(objectList, "nameIndex", None)
+    if nameIndex is None:
+        # A plain list has no index.  Build a throwaway one so the answer is the same.
+        nameIndex = BuildObjectNameIndex(objectList)
+    # Didn't find it?  Return a non-valid index.
+    return nameIndex.get(NormalizeObjectName(objectName), -1)
+
+def GetObjectName( objectID, objectList ):
+    '''
+    Returns the proper name of the specified object.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.GetObjectName(objectID)
+    return objectList[objectID][0]
+
+def GetObjectAliases( objectID, objectList ):
+    '''
+    Returns the list of other names the specified object answers to.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.GetObjectAliases(objectID)
+    return objectList[objectID][1]
+
+def SetObjectName( objectID, newName, objectList ):
+    '''
+    Renames the specified object, keeping the name index (if any) up to date.
+    The old name stops working unless it is also one of the object's aliases.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.SetObjectName(objectID, newName)
+    oldName = objectList[objectID][0]
+    objectList[objectID][0] = str(newName)
+    nameIndex = getattr(objectList, "nameIndex", None)
+    if nameIndex is not None:
+        # Drop the old name first, then add the new one.
+        oldKey = NormalizeObjectName(oldName)
+        if nameIndex.get(oldKey) == objectID:
+            del nameIndex[oldKey]
+            ReindexObjectName(oldKey, objectList)
+        IndexObjectName(newName, objectID, objectList)
+
+def AddObjectAlias( objectID, alias, objectList ):
+    '''
+    Adds another acceptable name for the specified object.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.AddObjectAlias(objectID, alias)
+    objectList[objectID][1].append(str(alias))
+    if getattr(objectList, "nameIndex", None) is not None:
+        IndexObjectName(alias, objectID, objectList)
+
+def AddObject( objectData, objectList ):
+    '''
+    Appends a new object (in the usual 10 item layout) to the object list.
+    Returns the objectID of the new object.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.AddObject(objectData)
+    objectList.append(objectData)
+    objectID = len(objectList) - 1
+    if getattr(objectList, "nameIndex", None) is not None:
+        IndexObjectName(objectData[0], objectID, objectList)
+        for alias in objectData[1]:
+            IndexObjectName(alias, objectID, objectList)
+    roomIndex = getattr(objectList, "roomIndex", None)
+    if roomIndex is not None:
+        roomIndex.setdefault(objectData[3], set()).add(objectID)
+    roomVersions = getattr(objectList, "roomVersions", None)
+    if roomVersions is not None:
+        StampRoom(objectData[3], roomVersions)
+    return objectID
+
+def IsUsableObject( objectID, objectList ):
+    '''
+    Returns the boolean for if this object is a valid target for the "Use" command.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.IsUsableObject(objectID)
+    return objectList[objectID][4]
+
+def SetUsableObject( objectID, newValue, objectList ):
+    '''
+    Sets the boolean for if this object is a valid target for the "Use" command.
+    For proper logic comparisons, this new value MUST be a boolean.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.SetUsableObject(objectID, newValue)
+    objectList[objectID][4] = bool(newValue)
+
+def GetUseMessage( objectID, objectList ):
+    '''
+    Returns the string to display if this object is "Used".
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.GetUseMessage(objectID)
+    return objectList[objectID][7]
+
+def IsTakableObject( objectID, objectList ):
+    '''
+    Returns the boolean for if this object is a valid target for the "Take" command.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.IsTakableObject(objectID)
+    return objectList[objectID][5]
+
+def GetTakeMessage( objectID, objectList ):
+    '''
+    Returns the string to display if this object is "Taken".
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.GetTakeMessage(objectID)
+    return objectList[objectID][8]
+
+def GetObjectStatus( objectID, objectList ):
+    '''
+    Returns the numeric status for the given object.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.GetObjectStatus(objectID)
+    return objectList[objectID][6]
+
+def SetObjectStatus( objectID, newStatus, objectList ):
+    '''
+    Sets the numeric status for the given object.
+    Status values are always expected to be "int" types.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.SetObjectStatus(objectID, newStatus)
+    if objectList[objectID][6] == int(newStatus):
+        # Nothing changes, so views of the room don't need making again.
+        return
+    objectList[objectID][6] = int(newStatus)
+    roomVersions = getattr(objectList, "roomVersions", None)
+    if roomVersions is not None:
+        StampRoom(objectList[objectID][3], roomVersions)
+
+def GetObjectStatusMessage( objectID, objectList ):
+    '''
+    Returns the string to display if this object is "Taken".
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.GetObjectStatusMessage(objectID)
+    # Intentionally awkward variable name to ensure I don't accidentally
+    # use it for something else elsewhere in the program.
+    temp_current_object_status = GetObjectStatus(objectID,objectList)
+    return GetStatusMessage(objectID,temp_current_object_status,objectList)
+
+def GetStatusMessage( objectID, status, objectList ):
+    '''
+    Returns the string to display for the given object when it has the given status.
+    A status of -1 (or less) means there is nothing to display.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.GetStatusMessage(objectID, status)
+    if status > -1:
+        return objectList[objectID][9][status]
+    return ""
+
+def GetObjectLocation( objectID, objectList ):
+    '''
+    Returns the room (if any) where the given object is currently located.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.GetObjectLocation(objectID)
+    return objectList[objectID][3]
+
+def SetObjectLocation( objectID, newLocation, objectList ):
+    '''
+    Sets the room (if any) where the given object is currently located.
+    This is intentially required to be an "int" to avoid confusion with later use.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.SetObjectLocation(objectID, newLocation)
+    oldLocation = objectList[objectID][3]
+    objectList[objectID][3] = int(newLocation)
+    roomIndex = getattr(objectList, "roomIndex", None)
+    if roomIndex is not None:
+        MoveIndexedObject(objectID, oldLocation, int(newLocation), roomIndex)
+    roomVersions = getattr(objectList, "roomVersions", None)
+    if roomVersions is not None:
+        StampRoom(oldLocation, roomVersions)
+        StampRoom(int(newLocation), roomVersions)
+
+def GetObjectsInRoom( roomID, objectList ):
+    '''
+    Returns the objectIDs currently located in the given room, in no particular order.
+    Passing inventoryLocation returns everything the player is carrying.
+    The returned collection must not be changed by the caller.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.GetObjectsInRoom(roomID)
+    roomIndex = getattr(objectList, "roomIndex", None)
+    if roomIndex is None:
+        # A plain list has no index, so we have to look at every object.
+        return set([item for item in range(len(objectList)) if objectList[item][3] == roomID])
+    return roomIndex.get(roomID, emptyRoom)
+
+def GetRoomContentsVersion( roomID, objectList ):
+    '''
+    Returns the version stamp of what is in the given room, or -1 if the
+    object list doesn't keep them (and so views of the room can't be cached).
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.GetRoomContentsVersion(roomID)
+    if isinstance(objectList, tuple):
+        # Read-only, so it never changes.
+        return 0
+    roomVersions = getattr(objectList, "roomVersions", None)
+    if roomVersions is None:
+        return -1
+    return roomVersions.get(roomID, 0)
+
+def GetRoomViews( objectList ):
+    '''
+    Returns the cache of rendered room views that goes with the given object
+    list (an OrderedDict, oldest first), or None if it doesn't have one.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.GetRoomViews()
+    return getattr(objectList, "views", None)
+
+def AddToInventory( objectID, objectList, playerInventory ):
+    '''
+    Moves the given object into the player's inventory.
+    '''
+    SetObjectLocation(objectID,inventoryLocation,objectList)
+    playerInventory += [objectID]
+
+def RemoveFromInventory( objectID, objectList, playerInventory ):
+    '''
+    Removes the given object from the player's inventory and from the world.
+    '''
+    playerInventory.remove(objectID)
+    SetObjectLocation(objectID,-1,objectList)
+
+def IsInInventory( objectID, objectList ):
+    '''
+    Returns True if the player is carrying the given object.
+    '''
+    return GetObjectLocation(objectID,objectList) == inventoryLocation
+
+def GetObjectDescription( objectID, objectList ):
+    '''
+    Returns the description string for the specified object.
+    '''
+    if not isinstance(objectList, (list, tuple)):
+        return objectList.GetObjectDescription(objectID)
+    return objectList[objectID][2]
+
@@ -0,0 +1,194 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Game flow:  a GameSession holds one game in progress, and StartGame and
+RunCommand play it a turn at a time.  PlayGame plays the built-in world at
+the console (see adventure/__main__.py), with forgiving object names (see
+adventure/names.py) if asked.
+
+Several commands can be sent on one line, separated by semicolons ("n; e;
+take onion").  RunCommandLine carries them all out in one call, exactly as
+if they had been typed one at a time, creature moves and all, and stops at
+the first one that ends the game.
+'''
+
+from adventure.data import GetObjectsInRoom, inventoryLocation
+from adventure.output import OutputBuffer, WriteToStdout, OutputTo, Say
+from adventure.commands import CommandLook, ParseCommand
+from adventure.rules import RulesFrom, RunTurnRules
+from adventure.names import NewNameResolver
+
+
+# Shown before every command the player types, after some blank lines.
+promptString = '["?" for Help]  Action>  '
+promptPadding = "\n\n\n\n"
+
+# Separates commands sent together on one line.
+commandSeparator = ";"
+
+class GameSession:
+    '''
+    These are our "global" tracking variables that get passed around among functions,
+    gathered up so that more than one game can be running at a time.
+
+    The room and object lists can be shared between sessions, so long as each
+    session is given its own view of them (see adventure/overlay.py) to write through.
+    rules is the RuleBook of the world being played (see adventure/rules.py).
+    '''
+    __slots__ = ("roomList", "objectList", "playerRoom", "playerInventory", "gameTurn",
+                 "encounter", "newLook", "rng", "finished", "outcome", "output",
+                 "rules", "npcs", "ticks", "names")
+
+    def __init__( self, roomList, objectList, rules, rng ):
+        self.roomList = roomList
+        self.objectList = objectList
+        self.playerRoom = 0
+        # Worlds can start the player off carrying things (objects whose
+        # location is inventoryLocation).
+        self.playerInventory = sorted(GetObjectsInRoom(inventoryLocation, objectList))
+        self.gameTurn = 0
+        self.encounter = False
+        self.newLook = True
+        # Anything with choice() and random() methods will do.  Creatures use it to wander.
+        self.rng = rng
+        self.finished = False
+        # How the game ended:  one of gameOutcomes, or "" while it is still going.
+        self.outcome = ""
+        # Everything the game says goes here first.  Whoever runs the session
+        # flushes it once per turn, or points its sink somewhere else.
+        self.output = OutputBuffer(WriteToStdout)
+        # The RuleBook of the world being played.
+        self.rules = rules
+        # An NpcScheduler (see adventure/npc.py) for worlds full of wandering
+        # creatures, or None.
+        self.npcs = None
+        # A TickPhase (see adventure/ticks.py) for worlds full of timed
+        # objects, or None.
+        self.ticks = None
+        # A NameResolver (see adventure/names.py) to make sense of object
+        # names the player only got partly right, or None.
+        self.names = None
+
+def StartGame( session ):
+    '''
+    Says the introduction and everything up to the first prompt.
+    Returns False if the game is already over.
+    The output is left in session.output for the caller to flush.
+    '''
+    with OutputTo(session.output), RulesFrom(session.rules):
+        Say("\n\n\n\n")
+        Say("You wake up on a dirt floor with no recolection of how you came to be here.")
+        return BeginTurn(session)
+
+def BeginTurn( session ):
+    '''
+    Checks the win/lose conditions and looks around if needed, ready for the next prompt.
+    Returns False (and marks the session finished) if the game is over.
+    '''
+    # Check win/lose conditions, and anything else the rules do every turn.
+    RunTurnRules(session.rules.turnRules, session)
+    if session.finished:
+        return False
+
+    if session.newLook:
+        CommandLook(session.playerRoom,session.roomList,session.objectList)
+    return True
+
+def TakeTurn( session, action ):
+    '''
+    The body of RunCommand, for callers that have already pointed output and
+    rules at the session.
+    '''
+    hint = ""
+    if session.names is not None:
+        action, hint = session.names.ResolveCommand(action, session)
+    #When we call the command parsing function, it returns our new roomID and gameTurn.
+    commandReturn = ParseCommand(action, session.roomList, session.objectList,
+                                 session.playerInventory, session.playerRoom, session.gameTurn)
+    if len(hint) > 0:
+        Say(hint)
+    session.playerRoom = commandReturn[0]
+    session.gameTurn = commandReturn[1]
+    session.newLook = commandReturn[2]
+
+    if session.gameTurn < 0:
+        Say("Exiting game...")
+        session.finished = True
+        session.outcome = "exit"
+        return False
+
+    # The rest of the world takes its turn.
+    RunTurnRules(session.rules.worldRules, session)
+    if session.finished:
+        return False
+    if session.npcs is not None:
+        session.npcs.RunTurn(session)
+    if session.ticks is not None:
+        session.ticks.RunTurn(session)
+    return BeginTurn(session)
+
+def RunCommand( session, action ):
+    '''
+    Carries out one command typed by the player, then lets the rest of the world
+    take its turn.  Returns False if the game is over.
+    The output is left in session.output for the caller to flush.
+    '''
+    with OutputTo(session.output), RulesFrom(session.rules):
+        return TakeTurn(session, action)
+
+def RunCommands( session, actions ):
+    '''
+    Carries out several commands in a row, with the rest of the world taking
+    its turn after each one, just as RunCommand would one at a time.  Stops
+    as soon as one of them ends the game.  Returns False if the game is over.
+    Everything they say is left in session.output, in order.
+    '''
+    with OutputTo(session.output), RulesFrom(session.rules):
+        for action in actions:
+            if not TakeTurn(session, action):
+                return False
+    return True
+
+def SplitCommands( line ):
+    '''
+    Returns the list of commands on one line typed by the player.  A line
+    without separators is one command, just as it was typed.
+    '''
+    if commandSeparator not in line:
+        return [line]
+    actions = [action.strip() for action in line.split(commandSeparator)]
+    return [action for action in actions if len(action) > 0]
+
+def RunCommandLine( session, line ):
+    '''
+    Carries out every command on one line typed by the player (see
+    SplitCommands and RunCommands).  Returns False if the game is over.
+    '''
+    return RunCommands(session, SplitCommands(line))
+
+
+def PlayGame( rng, forgivingNames ):
+    '''
+    Plays a game at the console, using the built-in world's data directly.
+    With forgivingNames, object names can be cut short or a little off.
+    '''
+    from adventure.builtin import roomList, objectList, gameRules
+    session = GameSession(roomList, objectList, gameRules, rng)
+    if forgivingNames:
+        session.names = NewNameResolver()
+
+    # Main loop
+    running = StartGame(session)
+    while running:
+        #Prompt for action.  The prompt goes out with the rest of the turn, in one write.
+        session.output.Write(promptPadding + promptString)
+        session.output.Flush()
+        line = input()
+        running = RunCommandLine(session, line)
+    session.output.Flush()
+
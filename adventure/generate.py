@@ -0,0 +1,381 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Made-up worlds of any size, for load and scale testing.
+
+A WorldPlan says how big a world to make and what it should look like:
+
+  - how many rooms, and how they are laid out:
+      "grid"  a square grid, every room joined to its neighbours;
+      "tree"  every room has up to three rooms further in, and one way
+              back out, so most rooms are dead ends;
+      "maze"  a grid with walls:  enough doors to reach every room (with
+              lots of dead ends), and a few more to make some loops;
+  - how many things per room (on average), and how many aliases each has;
+  - how many wandering creatures (NPCs), hostile one time in ten;
+  - how many locked gates, each blocking one of its room's exits (both
+    ways) until the matching key is used on it, from either side.  These
+    come with rules, which set the gate's status and open the way, like
+    the built-in gate.  Keys are always somewhere the player can get to
+    from the start with every gate still locked.
+
+The same plan and seed always make the same world.  Every random choice is
+worked out from the seed and the room (or thing) it is about, rather than
+drawn in order from a generator, so any room can be made on its own, in any
+order.  That means the world never has to be held in memory:  GenerateRooms
+and GenerateObjects produce one room or object at a time, in world file
+form, and WriteWorld streams them straight into a world file (see
+adventure/world.py), so a world of millions of rooms takes no more memory
+to make than a small one.
+
+NPCs are ordinary objects called "Creature<N>" with no rules of their own;
+hand them to an NpcScheduler (adventure/npc.py) to have them move.  The
+player starts in room 0.
+
+Run from the repository root:
+    python -m adventure.generate big.json --rooms 1000000 --shape maze --seed 1
+    python -m adventure.generate town.json --rooms 10000 --objects 2.5 --aliases 2 --npcs 500 --gates 20
+'''
+
+import argparse
+import json
+import math
+import sys
+
+
+# The layouts a world can have.
+worldShapes = ("grid", "tree", "maze")
+
+# How often a maze wall has a door in it anyway, making a loop.
+loopChance = 0.1
+
+# How many random steps from the start room a key is put.
+keyWalkLength = 1000
+
+# Each kind of choice gets its own salt, so they don't all come out the same.
+saltMaze = 1
+saltLoop = 2
+saltDescription = 3
+saltObjectCount = 4
+saltObject = 5
+saltNpc = 6
+saltGate = 7
+saltKey = 8
+
+# Words to make up descriptions and names from.
+roomAdjectives = ["damp", "narrow", "dusty", "echoing", "cold", "bright", "crooked", "quiet"]
+roomKinds = ["cave", "hallway", "cellar", "chamber", "clearing", "tunnel", "storeroom", "courtyard"]
+thingAdjectives = ["Rusty", "Old", "Shiny", "Broken", "Heavy", "Tiny", "Odd", "Plain"]
+thingKinds = ["Lamp", "Rope", "Bottle", "Stone", "Box", "Coin", "Bone", "Book"]
+statusTemplates = [["It is closed.", "It is open."], ["It is cold.", "It is warm.", "It is hot."]]
+
+mask64 = (1 << 64) - 1
+
+
+def Roll( seed, number, salt ):
+    '''
+    Returns a number from 0 up to (not including) 1 that depends only on the
+    seed, a room or thing number, and what the number is for.  (This is the
+    splitmix64 mixing function, which spreads nearby inputs all over.)
+    '''
+    value = (seed * 0x9E3779B97F4A7C15 + number * 0xD1B54A32D192ED03 + salt * 0x8CB92BA72F3D8DD7) & mask64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & mask64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & mask64
+    return (value ^ (value >> 31)) / 18446744073709551616.0
+
+def Pick( choices, roll ):
+    return choices[int(roll * len(choices))]
+
+
+class WorldPlan:
+    '''
+    What a generated world should be like.  objectDensity is the average
+    number of things per room (2.5 means half the rooms get 2 and half get 3).
+    '''
+    __slots__ = ("seed", "roomCount", "shape", "objectDensity", "aliasCount", "npcCount", "gateCount",
+                 "side", "gates")
+
+    def __init__( self, seed, roomCount, shape, objectDensity, aliasCount, npcCount, gateCount ):
+        if roomCount < 1:
+            raise ValueError("a world needs at least one room")
+        if shape not in worldShapes:
+            raise ValueError("the shape must be one of %s" % ", ".join(worldShapes))
+        if objectDensity < 0 or aliasCount < 0 or npcCount < 0 or gateCount < 0:
+            raise ValueError("object density and alias, NPC and gate counts can't be negative")
+        self.seed = seed
+        self.roomCount = roomCount
+        self.shape = shape
+        self.objectDensity = objectDensity
+        self.aliasCount = aliasCount
+        self.npcCount = npcCount
+        self.gateCount = gateCount
+        # Grids and mazes are this many rooms across, with the last row left short if need be.
+        self.side = math.isqrt(roomCount - 1) + 1
+        # roomID -> [gate number, direction, room it leads to] for each gate.
+        # Two gates that land in the same room are one gate, and a gate is
+        # never put on a way that a gate on the other side already blocks.
+        self.gates = {}
+        for gateNum in range(gateCount):
+            roomID = int(Roll(seed, gateNum, saltGate) * roomCount)
+            exits = GetShapeExits(self, roomID)
+            for direction in range(4):
+                if exits[direction] > -1 and roomID not in self.gates and \
+                   not IsGated(self, exits[direction], (direction + 2) % 4, roomID):
+                    self.gates[roomID] = [gateNum, direction, exits[direction]]
+
+
+##### Layouts
+
+def GetGridExits( plan, roomID ):
+    row, column = divmod(roomID, plan.side)
+    return [roomID - plan.side if row > 0 else -1,
+            roomID + 1 if column < plan.side - 1 and roomID + 1 < plan.roomCount else -1,
+            roomID + plan.side if roomID + plan.side < plan.roomCount else -1,
+            roomID - 1 if column > 0 else -1]
+
+def GetTreeBackDirection( roomID ):
+    '''
+    Returns the direction of the way back out of a room in a tree, or -1 for room 0.
+    '''
+    if roomID == 0:
+        return -1
+    parentID = (roomID - 1) // 3
+    return (GetTreeChildDirections(parentID)[(roomID - 1) % 3] + 2) % 4
+
+def GetTreeChildDirections( roomID ):
+    '''
+    Returns the directions of the (up to) three rooms further in from a room in a tree.
+    '''
+    backDirection = GetTreeBackDirection(roomID)
+    return [direction for direction in range(4) if direction != backDirection][:3]
+
+def GetTreeExits( plan, roomID ):
+    exits = [-1, -1, -1, -1]
+    backDirection = GetTreeBackDirection(roomID)
+    if backDirection > -1:
+        exits[backDirection] = (roomID - 1) // 3
+    childDirections = GetTreeChildDirections(roomID)
+    for childNum in range(3):
+        childID = 3 * roomID + 1 + childNum
+        if childID < plan.roomCount:
+            exits[childDirections[childNum]] = childID
+    return exits
+
+def GetMazeDoor( plan, roomID ):
+    '''
+    Returns which way (0 for North, 3 for West) a maze room knocks through
+    to make sure it can be reached, or -1 for room 0.  Doing this for every
+    room joins them all up, as a tree with lots of dead ends.
+    '''
+    row, column = divmod(roomID, plan.side)
+    if row == 0:
+        return 3 if column > 0 else -1
+    if column == 0:
+        return 0
+    return 0 if Roll(plan.seed, roomID, saltMaze) < 0.5 else 3
+
+def IsMazeLoop( plan, roomID, across ):
+    '''
+    True if there's an extra door south (or east, if across is 1) of a maze room.
+    '''
+    return Roll(plan.seed, 2 * roomID + across, saltLoop) < loopChance
+
+def GetMazeExits( plan, roomID ):
+    exits = GetGridExits(plan, roomID)
+    if exits[0] > -1 and GetMazeDoor(plan, roomID) != 0 and not IsMazeLoop(plan, exits[0], 0):
+        exits[0] = -1
+    if exits[1] > -1 and GetMazeDoor(plan, exits[1]) != 3 and not IsMazeLoop(plan, roomID, 1):
+        exits[1] = -1
+    if exits[2] > -1 and GetMazeDoor(plan, exits[2]) != 0 and not IsMazeLoop(plan, roomID, 0):
+        exits[2] = -1
+    if exits[3] > -1 and GetMazeDoor(plan, roomID) != 3 and not IsMazeLoop(plan, exits[3], 1):
+        exits[3] = -1
+    return exits
+
+shapeExits = {"grid": GetGridExits, "tree": GetTreeExits, "maze": GetMazeExits}
+
+def GetShapeExits( plan, roomID ):
+    '''
+    Returns a room's [N, E, S, W] exits from the layout alone, gates and all open.
+    '''
+    return shapeExits[plan.shape](plan, roomID)
+
+
+def IsGated( plan, roomID, direction, toRoomID ):
+    '''
+    True if a gate blocks the way from a room in the given direction, from
+    either side.  (The way back is always the opposite direction.)
+    '''
+    gate = plan.gates.get(roomID)
+    if gate is not None and gate[1] == direction:
+        return True
+    gate = plan.gates.get(toRoomID)
+    return gate is not None and gate[1] == (direction + 2) % 4 and gate[2] == roomID
+
+def GetLockedExits( plan, roomID ):
+    '''
+    Returns a room's [N, E, S, W] exits with every gate locked.
+    '''
+    exits = GetShapeExits(plan, roomID)
+    for direction in range(4):
+        if exits[direction] > -1 and IsGated(plan, roomID, direction, exits[direction]):
+            exits[direction] = -1
+    return exits
+
+def PlaceKey( plan, gateNum ):
+    '''
+    Returns the room a gate's key goes in:  where a walk of keyWalkLength
+    random steps from the start room ends, never going through a gate.
+    '''
+    roomID = 0
+    for step in range(keyWalkLength):
+        exits = [roomExit for roomExit in GetLockedExits(plan, roomID) if roomExit > -1]
+        if len(exits) == 0:
+            break
+        roomID = Pick(exits, Roll(plan.seed, gateNum * keyWalkLength + step, saltKey))
+    return roomID
+
+
+##### Rooms, objects and rules
+
+def GenerateRooms( plan ):
+    '''
+    Produces every room in world file form, in order.
+    '''
+    for roomID in range(plan.roomCount):
+        # Gates are locked until their keys are used.
+        exits = GetLockedExits(plan, roomID)
+        roll = Roll(plan.seed, roomID, saltDescription)
+        yield {"description": "You are in a %s %s.  (Room %d)" % (Pick(roomAdjectives, roll),
+                                                                Pick(roomKinds, roll * len(roomAdjectives) % 1), roomID),
+               "exits": exits}
+
+def MakeThing( plan, objectID, roomID ):
+    '''
+    Returns one of the things lying around a room, in world file form.
+    '''
+    # One roll does for all of its choices, a few bits of it at a time.
+    roll = Roll(plan.seed, objectID, saltObject)
+    adjective = Pick(thingAdjectives, roll)
+    kind = Pick(thingKinds, roll * 8 % 1)
+    aliasPatterns = [kind.lower() + "%d", "Item%d", "Thing%d", adjective.lower() + kind.lower() + "%d"]
+    statusMessages = []
+    if roll * 64 % 1 < 0.3:
+        statusMessages = Pick(statusTemplates, roll * 512 % 1)
+    return {"name": "%s%s%d" % (adjective, kind, objectID),
+            "aliases": [aliasPatterns[aliasNum % len(aliasPatterns)] % objectID + "x" * (aliasNum // len(aliasPatterns))
+                        for aliasNum in range(plan.aliasCount)],
+            "description": "It looks like any other %s %s." % (adjective.lower(), kind.lower()),
+            "location": roomID,
+            "usable": roll * 4096 % 1 < 0.1,
+            "takable": roll * 32768 % 1 < 0.5,
+            "status": 0 if len(statusMessages) > 0 else -1,
+            "useMessage": "Nothing much happens.",
+            "takeMessage": "",
+            "statusMessages": statusMessages}
+
+def GenerateObjects( plan ):
+    '''
+    Produces every object in world file form, in order:  the things in each
+    room, then the NPCs, then the gates and their keys.
+    '''
+    objectID = 0
+    wholeThings = int(plan.objectDensity)
+    for roomID in range(plan.roomCount):
+        thingCount = wholeThings
+        if Roll(plan.seed, roomID, saltObjectCount) < plan.objectDensity - wholeThings:
+            thingCount += 1
+        for thingNum in range(thingCount):
+            yield MakeThing(plan, objectID, roomID)
+            objectID += 1
+    for npcNum in range(plan.npcCount):
+        yield {"name": "Creature%d" % npcNum, "aliases": [],
+               "description": "A scruffy creature, going about its business.",
+               "location": int(Roll(plan.seed, npcNum, saltNpc) * plan.roomCount),
+               "status": 1 if npcNum % 10 == 0 else 0,
+               "statusMessages": ["It ignores you.", "It looks hungry."]}
+    for roomID, gate in plan.gates.items():
+        gateNum = gate[0]
+        yield {"name": "Gate%d" % gateNum, "aliases": [],
+               "description": "A heavy iron gate.", "location": roomID, "status": 0,
+               "statusMessages": ["The gate is locked.", "The gate stands open."]}
+        yield {"name": "Key%d" % gateNum, "aliases": [],
+               "description": "A key with the number %d stamped on it." % gateNum,
+               "location": PlaceKey(plan, gateNum),
+               "usable": True, "takable": True,
+               "useMessage": "The key turns, and the gate swings open.", "takeMessage": "You pocket the key."}
+
+def GenerateRules( plan ):
+    '''
+    Returns the world's rules:  two for each gate's key, one for using it
+    by the gate and one for using it on the other side.
+    '''
+    rules = []
+    for roomID, gate in plan.gates.items():
+        gateNum, direction, toRoomID = gate
+        opening = [["remove", "Key%d" % gateNum],
+                   ["setStatus", "Gate%d" % gateNum, 1],
+                   ["setExit", roomID, direction, toRoomID],
+                   ["setExit", toRoomID, (direction + 2) % 4, roomID],
+                   ["useMessage", "Key%d" % gateNum]]
+        rules.append({"when": "use", "object": "Key%d" % gateNum,
+                      "if": [["here", "Gate%d" % gateNum]], "then": opening})
+        rules.append({"when": "use", "object": "Key%d" % gateNum,
+                      "if": [["playerIn", toRoomID]], "then": opening})
+    return rules
+
+def WriteItems( items, worldFile ):
+    '''
+    Writes the inside of a JSON list, one item per line.
+    '''
+    separator = "\n"
+    for item in items:
+        worldFile.write(separator)
+        worldFile.write(json.dumps(item))
+        separator = ",\n"
+    worldFile.write("\n")
+
+def WriteWorld( plan, worldFile ):
+    '''
+    Writes the world to an open text file, as a JSON world file, a room or
+    object at a time.
+    '''
+    worldFile.write('{"rooms": [')
+    WriteItems(GenerateRooms(plan), worldFile)
+    worldFile.write('],\n"objects": [')
+    WriteItems(GenerateObjects(plan), worldFile)
+    worldFile.write('],\n"rules": [')
+    WriteItems(GenerateRules(plan), worldFile)
+    worldFile.write("]}\n")
+
+
+def Main( arguments ):
+    parser = argparse.ArgumentParser(prog="python -m adventure.generate",
+                                     description="Make up a world file of any size.")
+    parser.add_argument("worldFile", help="JSON world file to write")
+    parser.add_argument("--rooms", type=int, default=1000, help="how many rooms")
+    parser.add_argument("--shape", choices=worldShapes, default="maze", help="how the rooms are laid out")
+    parser.add_argument("--seed", type=int, default=0, help="the same seed always makes the same world")
+    parser.add_argument("--objects", type=float, default=1.0, help="average number of things per room")
+    parser.add_argument("--aliases", type=int, default=1, help="aliases for each thing")
+    parser.add_argument("--npcs", type=int, default=0, help="how many wandering creatures")
+    parser.add_argument("--gates", type=int, default=0, help="how many locked gates (each with a key)")
+    options = parser.parse_args(arguments)
+
+    try:
+        plan = WorldPlan(options.seed, options.rooms, options.shape, options.objects, options.aliases,
+                         options.npcs, options.gates)
+    except ValueError as error:
+        print(error)
+        return 1
+    with open(options.worldFile, "w", encoding="utf-8") as worldFile:
+        WriteWorld(plan, worldFile)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(Main(sys.argv[1:]))
@@ -0,0 +1,369 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Distances between rooms, for creatures that hunt the player and for hints.
+
+The hostile creature only knows whether the player is in a room right next
+to it.  Anything smarter (chasing the player down, "you hear something three
+rooms away", pointing a lost player the right way) needs shortest paths
+through the exits, which is what a RoomGraph gives.
+
+Exits only go one way (the gate opens from room 5 to room 7, not back), so
+the distance from A to B isn't always the distance from B to A.
+
+How a RoomGraph finds paths depends on the size of the world:
+
+  - Small worlds (up to allPairsLimit rooms) get every distance and every
+    first step worked out ahead of time, one breadth-first search from each
+    room, so any question is a table lookup.
+  - Big worlds would need far too much memory for that, so they get the
+    distances to and from a few landmark rooms instead, spread out around the
+    world.  Those give a lower bound on any distance, which steers an A*
+    search almost straight to the answer.
+
+Opening an exit at runtime (UpdateRoom, after SetRoomExit) only fixes the
+distances that got shorter, starting from the new exit, rather than working
+everything out again.  Closing one means starting over.  Exits are mostly
+changed by rules (the key opens the gate), which don't know about any
+RoomGraph, so CatchUp finds the rooms whose exits changed since it last
+looked from their version stamps (see adventure/data.py) and updates those.
+
+Run from the repository root:
+    python benchmarks/room_graph.py
+'''
+
+import heapq
+from array import array
+
+from adventure.data import GetRoomExits, versionStamps
+
+
+# Worlds with up to this many rooms get every distance worked out ahead of time.
+allPairsLimit = 1024
+
+# How many landmark rooms bigger worlds get.
+landmarkCount = 8
+
+# The distance to a room that can't be reached at all.
+farAway = 2 ** 31 - 1
+
+
+def GetExitRooms( roomID, roomList ):
+    '''
+    Returns the rooms a room's exits lead to, without repeats.
+    '''
+    exitRooms = []
+    for roomExit in GetRoomExits(roomID, roomList):
+        if roomExit > -1 and roomExit not in exitRooms:
+            exitRooms.append(roomExit)
+    return tuple(exitRooms)
+
+def BreadthFirst( startRoom, neighbours, keepHops ):
+    '''
+    Returns [distances, hops] from startRoom to every room, following the
+    given neighbour lists.  hops[roomID] is the first room on the way there,
+    or None if keepHops is False.
+    '''
+    distances = array("i", [farAway]) * len(neighbours)
+    hops = None
+    if keepHops:
+        hops = array("i", [-1]) * len(neighbours)
+        hops[startRoom] = startRoom
+    distances[startRoom] = 0
+    distance = 0
+    edge = [startRoom]
+    while len(edge) > 0:
+        distance += 1
+        nextEdge = []
+        for edgeRoom in edge:
+            for nextRoom in neighbours[edgeRoom]:
+                if distances[nextRoom] == farAway:
+                    distances[nextRoom] = distance
+                    if keepHops:
+                        # Leaving the start room, the first step is the room
+                        # itself.  After that, it's whatever got us this far.
+                        hops[nextRoom] = nextRoom if edgeRoom == startRoom else hops[edgeRoom]
+                    nextEdge.append(nextRoom)
+        edge = nextEdge
+    return [distances, hops]
+
+def Relax( distances, hops, neighbours, roomID, distance, hop ):
+    '''
+    Lowers a room's distance in a table, if the given one is shorter, and
+    carries the improvement on to every room beyond it that gets closer too.
+    Those rooms are all reached the same way, so they all get the same first
+    step (hop) when there is a hops table to update.
+    '''
+    if distance >= distances[roomID]:
+        return
+    distances[roomID] = distance
+    if hops is not None:
+        hops[roomID] = hop
+    edge = [roomID]
+    while len(edge) > 0:
+        distance += 1
+        nextEdge = []
+        for edgeRoom in edge:
+            for nextRoom in neighbours[edgeRoom]:
+                if distance < distances[nextRoom]:
+                    distances[nextRoom] = distance
+                    if hops is not None:
+                        hops[nextRoom] = hop
+                    nextEdge.append(nextRoom)
+        edge = nextEdge
+
+
+class RoomGraph:
+    '''
+    Shortest paths through the exits of one room list.  Make one with
+    BuildRoomGraph.
+
+    A RoomGraph follows the exits of the room list it was made from.  A
+    session that changes exits in its own view of a shared world needs its
+    own RoomGraph, kept up to date with UpdateRoom or CatchUp.
+    '''
+    __slots__ = ("neighbours", "entrances", "distances", "hops", "landmarks",
+                 "fromLandmarks", "toLandmarks", "seenVersion")
+
+    def __init__( self, roomList, useAllPairs ):
+        roomCount = len(roomList)
+        # roomID -> the rooms its exits lead to, and the rooms with exits into it
+        self.neighbours = [GetExitRooms(roomID, roomList) for roomID in range(roomCount)]
+        self.entrances = None
+        # All pairs:  distances[fromRoom][toRoom], and the first step of the way.
+        self.distances = None
+        self.hops = None
+        # Landmarks:  fromLandmarks[n][roomID] is the distance from landmark n
+        # to the room, and toLandmarks[n][roomID] the distance back.
+        self.landmarks = None
+        self.fromLandmarks = None
+        self.toLandmarks = None
+        # A version stamp from before the exits above were read.
+        self.seenVersion = next(versionStamps)
+        if useAllPairs:
+            self.BuildAllPairs()
+        else:
+            self.BuildLandmarks()
+
+    def __len__( self ):
+        return len(self.neighbours)
+
+    def BuildAllPairs( self ):
+        self.distances = []
+        self.hops = []
+        for roomID in range(len(self.neighbours)):
+            distances, hops = BreadthFirst(roomID, self.neighbours, True)
+            self.distances.append(distances)
+            self.hops.append(hops)
+
+    def BuildEntrances( self ):
+        entrances = [[] for roomID in range(len(self.neighbours))]
+        for roomID in range(len(self.neighbours)):
+            for nextRoom in self.neighbours[roomID]:
+                entrances[nextRoom].append(roomID)
+        self.entrances = [tuple(rooms) for rooms in entrances]
+
+    def BuildLandmarks( self ):
+        '''
+        Picks the landmarks, each as far as possible from the ones before it,
+        and works out the distances to and from every one of them.
+        '''
+        self.BuildEntrances()
+        self.landmarks = []
+        self.fromLandmarks = []
+        self.toLandmarks = []
+        # How far each room is from the nearest landmark so far.
+        nearest = array("i", [farAway]) * len(self.neighbours)
+        landmark = 0
+        while len(self.landmarks) < min(landmarkCount, len(self.neighbours)):
+            self.landmarks.append(landmark)
+            self.fromLandmarks.append(BreadthFirst(landmark, self.neighbours, False)[0])
+            self.toLandmarks.append(BreadthFirst(landmark, self.entrances, False)[0])
+            farthest = -1
+            for roomID in range(len(nearest)):
+                distance = min(self.fromLandmarks[-1][roomID], self.toLandmarks[-1][roomID])
+                if distance < nearest[roomID]:
+                    nearest[roomID] = distance
+                # Rooms no landmark can reach (or be reached from) are the
+                # farthest of all, so they make the best next landmark.
+                if nearest[roomID] > 0 and (farthest < 0 or nearest[roomID] > nearest[farthest]):
+                    farthest = roomID
+            if farthest < 0:
+                # Every room is a landmark already.
+                break
+            landmark = farthest
+
+    def EstimateDistance( self, fromRoom, toRoom ):
+        '''
+        Returns a distance from fromRoom to toRoom that is no more than the
+        real one (for the A* search), or farAway if there can't be a path.
+        '''
+        estimate = 0
+        for landmarkNum in range(len(self.landmarks)):
+            fromLandmark = self.fromLandmarks[landmarkNum]
+            toLandmark = self.toLandmarks[landmarkNum]
+            # landmark -> toRoom is no longer than landmark -> fromRoom -> toRoom.
+            if fromLandmark[fromRoom] != farAway:
+                if fromLandmark[toRoom] == farAway:
+                    return farAway
+                estimate = max(estimate, fromLandmark[toRoom] - fromLandmark[fromRoom])
+            # fromRoom -> landmark is no longer than fromRoom -> toRoom -> landmark.
+            if toLandmark[toRoom] != farAway:
+                if toLandmark[fromRoom] == farAway:
+                    return farAway
+                estimate = max(estimate, toLandmark[fromRoom] - toLandmark[toRoom])
+        return estimate
+
+    def FindPath( self, fromRoom, toRoom ):
+        '''
+        Returns the rooms along a shortest path, fromRoom and toRoom included,
+        by A* search.  Returns [] if there is no path.
+        '''
+        if self.EstimateDistance(fromRoom, toRoom) == farAway:
+            return []
+        cameFrom = {fromRoom: -1}
+        distances = {fromRoom: 0}
+        # [distance so far + estimate of the rest, -distance so far, roomID].
+        # Of the rooms that look just as good, try the one furthest along
+        # first, or a grid full of equally short paths gets searched end to end.
+        queue = [[self.EstimateDistance(fromRoom, toRoom), 0, fromRoom]]
+        while len(queue) > 0:
+            roomID = heapq.heappop(queue)[2]
+            if roomID == toRoom:
+                path = []
+                while roomID != -1:
+                    path.append(roomID)
+                    roomID = cameFrom[roomID]
+                path.reverse()
+                return path
+            distance = distances[roomID] + 1
+            for nextRoom in self.neighbours[roomID]:
+                if distance < distances.get(nextRoom, farAway):
+                    estimate = self.EstimateDistance(nextRoom, toRoom)
+                    if estimate == farAway:
+                        continue
+                    distances[nextRoom] = distance
+                    cameFrom[nextRoom] = roomID
+                    heapq.heappush(queue, [distance + estimate, -distance, nextRoom])
+        return []
+
+    def GetDistance( self, fromRoom, toRoom ):
+        '''
+        Returns the number of moves from one room to another, or -1 if there is no way there.
+        '''
+        if self.distances is not None:
+            distance = self.distances[fromRoom][toRoom]
+            if distance == farAway:
+                return -1
+            return distance
+        return len(self.FindPath(fromRoom, toRoom)) - 1
+
+    def GetNextHop( self, fromRoom, toRoom ):
+        '''
+        Returns the first room to go to on the way from one room to another
+        (toRoom itself if it is right next door, fromRoom if they are the same
+        room), or -1 if there is no way there.
+        '''
+        if self.hops is not None:
+            return self.hops[fromRoom][toRoom]
+        path = self.FindPath(fromRoom, toRoom)
+        if len(path) == 0:
+            return -1
+        if len(path) == 1:
+            return fromRoom
+        return path[1]
+
+    def GetPath( self, fromRoom, toRoom ):
+        '''
+        Returns the rooms along a shortest path, fromRoom and toRoom included,
+        or [] if there is no way there.
+        '''
+        if self.hops is None:
+            return self.FindPath(fromRoom, toRoom)
+        if self.hops[fromRoom][toRoom] == -1:
+            return []
+        path = [fromRoom]
+        while path[-1] != toRoom:
+            path.append(self.hops[path[-1]][toRoom])
+        return path
+
+    def GetDirectionTo( self, fromRoom, toRoom, roomList ):
+        '''
+        Returns which exit to take (0=North, 1=East, 2=South, 3=West) to head
+        for toRoom, or -1 if there is no way there (or we're already there).
+        '''
+        hop = self.GetNextHop(fromRoom, toRoom)
+        if hop < 0 or hop == fromRoom:
+            return -1
+        exits = list(GetRoomExits(fromRoom, roomList))
+        if hop not in exits:
+            # The graph is behind the room list, and that exit is gone.
+            return -1
+        return exits.index(hop)
+
+    def CatchUp( self, roomList ):
+        '''
+        Updates every room whose exits have changed in the room list since
+        the graph was made (or last caught up).  Only room lists that keep
+        version stamps can be caught up with;  for any other, use UpdateRoom.
+        '''
+        roomVersions = getattr(roomList, "roomVersions", None)
+        if roomVersions is None or len(roomVersions) == 0:
+            return
+        seenVersion = self.seenVersion
+        self.seenVersion = next(versionStamps)
+        for roomID, version in list(roomVersions.items()):
+            if version > seenVersion and GetExitRooms(roomID, roomList) != self.neighbours[roomID]:
+                self.UpdateRoom(roomID, roomList)
+
+    def UpdateRoom( self, roomID, roomList ):
+        '''
+        Catches up with a change to a room's exits.  New exits only shorten
+        the distances they can; if any exit went away, everything is worked
+        out again.
+        '''
+        oldRooms = self.neighbours[roomID]
+        newRooms = GetExitRooms(roomID, roomList)
+        self.neighbours[roomID] = newRooms
+        if not all([exitRoom in newRooms for exitRoom in oldRooms]):
+            if self.distances is not None:
+                self.BuildAllPairs()
+            else:
+                self.BuildLandmarks()
+            return
+        addedRooms = [exitRoom for exitRoom in newRooms if exitRoom not in oldRooms]
+        if self.entrances is not None:
+            for exitRoom in addedRooms:
+                self.entrances[exitRoom] = self.entrances[exitRoom] + (roomID,)
+        for exitRoom in addedRooms:
+            if self.distances is not None:
+                # Anywhere that can get to roomID can now go on through the new exit.
+                for fromRoom in range(len(self.neighbours)):
+                    distance = self.distances[fromRoom][roomID]
+                    if distance == farAway:
+                        continue
+                    hop = exitRoom if fromRoom == roomID else self.hops[fromRoom][roomID]
+                    Relax(self.distances[fromRoom], self.hops[fromRoom], self.neighbours,
+                          exitRoom, distance + 1, hop)
+            else:
+                for landmarkNum in range(len(self.landmarks)):
+                    fromLandmark = self.fromLandmarks[landmarkNum]
+                    if fromLandmark[roomID] != farAway:
+                        Relax(fromLandmark, None, self.neighbours, exitRoom, fromLandmark[roomID] + 1, -1)
+                    # Going back to the landmark, the new exit is a way in to roomID.
+                    toLandmark = self.toLandmarks[landmarkNum]
+                    if toLandmark[exitRoom] != farAway:
+                        Relax(toLandmark, None, self.entrances, roomID, toLandmark[exitRoom] + 1, -1)
+
+
+def BuildRoomGraph( roomList ):
+    '''
+    Returns a RoomGraph for a room list, with every distance worked out ahead
+    of time if the world is small enough, or landmarks if it isn't.
+    '''
+    return RoomGraph(roomList, len(roomList) <= allPairsLimit)
@@ -0,0 +1,339 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Counting and timing what goes on inside a turn.
+
+Inside an Instrumented block, a Metrics object collects:
+
+  - for every command (by verb, so "n" and "north" count together), how many
+    were run and a histogram of how long ParseCommand took to carry them out;
+  - the same for each Command* handler (CommandLook, CommandUse, ...) and
+    for the rest of a turn:  the world's rules, MoveCreature and BeginTurn;
+  - how many times each data lookup function (GetObjectID,
+    GetObjectLocation, ...) was called.
+
+It works by swapping counting and timing wrappers in for those functions in
+the engine modules (adventure/data.py, commands.py, rules.py and game.py),
+and putting the originals back at the end of the block.  The game looks
+them up by name every time it calls them, so it picks up the wrappers
+without knowing about them, and outside an Instrumented block there is
+nothing extra to run at all.
+
+Histograms have fixed buckets (1 us, 2 us, 4 us, ... about 16 s), so they
+cost the same however long a game runs, and p50 and p99 are worked out from
+the buckets the same way Prometheus does.  Metrics can be written to a file
+as Prometheus text or JSON (WriteMetrics), or served to Prometheus over HTTP
+(StartMetricsServer, which the game server runs with a metrics port).
+
+Run from the repository root:
+    python -m adventure.replay --metrics turns.prom transcript.txt
+    python -m adventure.replay --profile profile.txt transcript.txt
+'''
+
+import bisect
+import contextlib
+import json
+import time
+
+import adventure.commands
+import adventure.data
+import adventure.game
+import adventure.output
+import adventure.rules
+from adventure.commands import commandVerbs, NormalizeCommandVerb
+
+
+# Upper bounds of the histogram buckets, in seconds:  1 us, 2 us, 4 us ... about 16 s.
+bucketBounds = tuple([1e-6 * 2 ** power for power in range(25)])
+
+# What commands the registry doesn't know are counted as.
+unknownVerb = "(unknown)"
+
+# The modules the game's functions are called through.
+engineModules = (adventure.data, adventure.output, adventure.commands, adventure.rules, adventure.game)
+
+# The functions that get timed, besides ParseCommand.
+handlerFunctions = ("CommandHelp", "CommandLook", "CommandExamine", "CommandTake", "CommandUse")
+phaseFunctions = ("RunTurnRules", "RunUseRules", "MoveCreature", "BeginTurn")
+
+# The data lookup functions, which are only counted.  They are called so
+# often, and are so quick, that timing each call would cost more than the call.
+accessorFunctions = ("GetRoomDescription", "GetRoomExits", "SetRoomExit", "GetObjectID",
+                     "GetObjectName", "GetObjectAliases", "SetObjectName", "AddObjectAlias",
+                     "AddObject", "IsUsableObject", "SetUsableObject", "GetUseMessage",
+                     "IsTakableObject", "GetTakeMessage", "GetObjectStatus", "SetObjectStatus",
+                     "GetObjectStatusMessage", "GetStatusMessage", "GetObjectLocation",
+                     "SetObjectLocation", "GetObjectsInRoom", "AddToInventory",
+                     "RemoveFromInventory", "IsInInventory", "GetObjectDescription")
+
+
+class Histogram:
+    '''
+    How many times something took each bucket's worth of time, and how long in all.
+    counts[N] is the number of times that took no more than bucketBounds[N],
+    but more than the bound before it.  The last count is everything longer.
+    '''
+    __slots__ = ("counts", "count", "total")
+
+    def __init__( self ):
+        self.counts = [0] * (len(bucketBounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def Record( self, seconds ):
+        self.counts[bisect.bisect_left(bucketBounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def GetPercentile( self, fraction ):
+        '''
+        Returns an estimate of the time that fraction (0.5 for p50) of the
+        records took no longer than, going in a straight line across the
+        bucket it falls in.
+        '''
+        rank = fraction * self.count
+        seen = 0
+        for bucketNum in range(len(self.counts)):
+            bucketCount = self.counts[bucketNum]
+            if bucketCount > 0 and seen + bucketCount >= rank:
+                if bucketNum == len(bucketBounds):
+                    return bucketBounds[-1]
+                lower = 0.0
+                if bucketNum > 0:
+                    lower = bucketBounds[bucketNum - 1]
+                return lower + (bucketBounds[bucketNum] - lower) * (rank - seen) / bucketCount
+            seen += bucketCount
+        return 0.0
+
+
+class Metrics:
+    '''
+    Everything an Instrumented block collects.
+    commands, handlers and phases are name -> Histogram, and accessorCalls
+    is name -> number of calls.
+    '''
+    __slots__ = ("commands", "handlers", "phases", "accessorCalls")
+
+    def __init__( self ):
+        self.commands = {}
+        self.handlers = {}
+        self.phases = {}
+        self.accessorCalls = dict([(name, 0) for name in accessorFunctions])
+
+    def GetHistogram( self, histograms, name ):
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = Histogram()
+            histograms[name] = histogram
+        return histogram
+
+
+##### Wrappers
+
+def BuildVerbLabels():
+    '''
+    Returns a dictionary of every verb in the command registry -> the name
+    its command is counted under (the first verb registered for the same
+    handler, so "n" counts as "north").
+    '''
+    firstVerbs = {}
+    verbLabels = {}
+    for verb, registeredCommand in commandVerbs.items():
+        verbLabels[verb] = firstVerbs.setdefault(registeredCommand, verb)
+    return verbLabels
+
+def TimeFunction( function, histogram ):
+    '''
+    Returns a function that calls the given one and records how long it took.
+    '''
+    def Timed( *arguments ):
+        startTime = time.perf_counter()
+        try:
+            return function(*arguments)
+        finally:
+            histogram.Record(time.perf_counter() - startTime)
+    return Timed
+
+def CountFunction( function, calls, name ):
+    '''
+    Returns a function that calls the given one and counts the call.
+    '''
+    def Counted( *arguments ):
+        calls[name] += 1
+        return function(*arguments)
+    return Counted
+
+def TimeParseCommand( function, metrics ):
+    '''
+    Returns a ParseCommand that records how long each command took under its verb.
+    '''
+    verbLabels = BuildVerbLabels()
+    def TimedParseCommand( command, *arguments ):
+        verb = verbLabels.get(NormalizeCommandVerb(command.partition(" ")[0]), unknownVerb)
+        histogram = metrics.commands.get(verb)
+        if histogram is None:
+            histogram = metrics.GetHistogram(metrics.commands, verb)
+        startTime = time.perf_counter()
+        try:
+            return function(command, *arguments)
+        finally:
+            histogram.Record(time.perf_counter() - startTime)
+    return TimedParseCommand
+
+def FindOriginals():
+    '''
+    Returns a dictionary of name -> [function, [modules that call it by that name]]
+    for every function that gets wrapped.
+    '''
+    originals = {}
+    for name in handlerFunctions + phaseFunctions + accessorFunctions + ("ParseCommand",):
+        function = None
+        for module in engineModules:
+            if name in module.__dict__ and (function is None or module.__dict__[name] is function):
+                function = module.__dict__[name]
+                originals.setdefault(name, [function, []])[1].append(module)
+    return originals
+
+@contextlib.contextmanager
+def Instrumented( metrics ):
+    '''
+    Collects metrics on everything the game does inside the "with" block.
+    '''
+    originals = FindOriginals()
+    wrappers = {}
+    for name in handlerFunctions:
+        wrappers[name] = TimeFunction(originals[name][0], metrics.GetHistogram(metrics.handlers, name))
+    for name in phaseFunctions:
+        wrappers[name] = TimeFunction(originals[name][0], metrics.GetHistogram(metrics.phases, name))
+    for name in accessorFunctions:
+        wrappers[name] = CountFunction(originals[name][0], metrics.accessorCalls, name)
+    wrappers["ParseCommand"] = TimeParseCommand(originals["ParseCommand"][0], metrics)
+    try:
+        for name, wrapper in wrappers.items():
+            for module in originals[name][1]:
+                setattr(module, name, wrapper)
+        yield metrics
+    finally:
+        for name, original in originals.items():
+            for module in original[1]:
+                setattr(module, name, original[0])
+
+
+##### Reports
+
+def FormatHistogram( metricName, labelName, histograms ):
+    '''
+    Returns Prometheus text lines for a group of histograms.
+    '''
+    lines = ["# TYPE %s histogram" % metricName]
+    for name in sorted(histograms):
+        histogram = histograms[name]
+        seen = 0
+        for bucketNum in range(len(bucketBounds)):
+            seen += histogram.counts[bucketNum]
+            lines.append('%s_bucket{%s="%s",le="%g"} %d' % (metricName, labelName, name, bucketBounds[bucketNum], seen))
+        lines.append('%s_bucket{%s="%s",le="+Inf"} %d' % (metricName, labelName, name, histogram.count))
+        lines.append('%s_sum{%s="%s"} %r' % (metricName, labelName, name, histogram.total))
+        lines.append('%s_count{%s="%s"} %d' % (metricName, labelName, name, histogram.count))
+    return lines
+
+def FormatPrometheus( metrics ):
+    '''
+    Returns the metrics in the Prometheus text format.
+    '''
+    lines = FormatHistogram("adventure_command_seconds", "verb", metrics.commands)
+    lines += FormatHistogram("adventure_handler_seconds", "handler", metrics.handlers)
+    lines += FormatHistogram("adventure_phase_seconds", "phase", metrics.phases)
+    lines.append("# TYPE adventure_accessor_calls_total counter")
+    for name in sorted(metrics.accessorCalls):
+        lines.append('adventure_accessor_calls_total{accessor="%s"} %d' % (name, metrics.accessorCalls[name]))
+    return "\n".join(lines) + "\n"
+
+def SummarizeHistograms( histograms ):
+    '''
+    Returns name -> {"count", "mean", "p50", "p99"} (times in seconds) for a group of histograms.
+    '''
+    summary = {}
+    for name, histogram in histograms.items():
+        mean = 0.0
+        if histogram.count > 0:
+            mean = histogram.total / histogram.count
+        summary[name] = {"count": histogram.count, "mean": mean,
+                         "p50": histogram.GetPercentile(0.5), "p99": histogram.GetPercentile(0.99)}
+    return summary
+
+def SummarizeMetrics( metrics ):
+    '''
+    Returns the metrics as plain data, ready to be saved as JSON.
+    '''
+    return {"commands": SummarizeHistograms(metrics.commands),
+            "handlers": SummarizeHistograms(metrics.handlers),
+            "phases": SummarizeHistograms(metrics.phases),
+            "accessorCalls": dict(metrics.accessorCalls)}
+
+def FormatMetrics( metrics ):
+    '''
+    Returns a readable table of the metrics.
+    '''
+    lines = []
+    for title, histograms in [["command", metrics.commands], ["handler", metrics.handlers], ["phase", metrics.phases]]:
+        lines.append("  %-22s %8s %10s %10s %10s" % (title, "count", "mean us", "p50 us", "p99 us"))
+        summary = SummarizeHistograms(histograms)
+        for name in sorted(summary):
+            lines.append("  %-22s %8d %10.1f %10.1f %10.1f" % (name, summary[name]["count"], summary[name]["mean"] * 1e6,
+                                                             summary[name]["p50"] * 1e6, summary[name]["p99"] * 1e6))
+    lines.append("  %-22s %8s" % ("accessor", "calls"))
+    for name in sorted(metrics.accessorCalls):
+        if metrics.accessorCalls[name] > 0:
+            lines.append("  %-22s %8d" % (name, metrics.accessorCalls[name]))
+    return "\n".join(lines) + "\n"
+
+def WriteMetrics( metrics, fileName ):
+    '''
+    Saves the metrics to a file:  JSON if its name ends in .json, and
+    Prometheus text (for a node exporter's textfile directory, say) otherwise.
+    '''
+    with open(fileName, "w", encoding="utf-8") as metricsFile:
+        if fileName.endswith(".json"):
+            json.dump(SummarizeMetrics(metrics), metricsFile, indent=2, sort_keys=True)
+            metricsFile.write("\n")
+        else:
+            metricsFile.write(FormatPrometheus(metrics))
+
+
+##### Serving metrics
+
+async def HandleMetricsRequest( reader, writer, metrics ):
+    '''
+    Answers one HTTP request with the metrics, whatever was asked for.
+    '''
+    try:
+        # The request line and headers, up to the blank line.  Nothing in them matters.
+        while True:
+            line = await reader.readline()
+            if line in (b"", b"\r\n", b"\n"):
+                break
+        body = FormatPrometheus(metrics).encode("utf-8")
+        writer.write(b"HTTP/1.0 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n" +
+                     b"Content-Length: %d\r\n\r\n" % len(body) + body)
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def StartMetricsServer( host, port, metrics ):
+    '''
+    Starts answering Prometheus scrapes on the given port.  Returns the asyncio server.
+    '''
+    # Only the server needs asyncio, and it takes a while to import, so
+    # replays and batch workers don't pay for it.
+    import asyncio
+    async def OnConnect( reader, writer ):
+        await HandleMetricsRequest(reader, writer, metrics)
+    return await asyncio.start_server(OnConnect, host, port)
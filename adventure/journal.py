@@ -0,0 +1,410 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+A write-ahead journal of hosted games, so they survive the server dying.
+
+Every game the server hosts writes to one shared, append-only journal file:
+
+  - a snapshot (see adventure/snapshot.py) when the game starts, and again
+    every snapshotEvery commands, so recovery never has far to replay;
+  - every command line the game accepted, with the turn number it left the
+    game on and a fingerprint of the random number generator afterwards
+    (the generator is what the creature draws its moves from, so checking
+    it checks the creature got the same moves on replay);
+  - the game's resume token (see NewResumeToken), when it starts;
+  - an end record when the game is over, so it isn't brought back.
+
+A turn's output is only sent once its command is safely on disk.  Rather
+than one fsync per command, commands are "group committed":  whichever game
+needs a sync first writes out everything waiting and syncs once, and every
+game that added a record in the meantime shares that sync.  The busier the
+server, the more commands each fsync covers.
+
+On startup, RecoverSessions reads the journal back.  A record cut short by
+a crash (or one that fails its checksum) ends the journal there.  Each
+unfinished game is loaded from its last snapshot and the commands after it
+are played again, checking each one lands on the same turn and generator
+state as before.  StartJournal then starts a fresh journal holding just a
+snapshot of each recovered game, so the file never grows without bound.
+
+Unfinished games nobody is playing (recovered, or whose player got cut off)
+are kept as "detached" games, for their players to resume with the game's
+number and token.  ExpireDetached ends the ones left too long, so they
+aren't kept, or recovered, forever.
+
+If writing the journal fails, the records that didn't make it stay waiting
+for the next sync, and everyone waiting on that sync gets the error.
+
+Record layout (all little-endian):
+
+    header      I I         length of the rest, CRC-32 of the rest
+    record      B Q i I     kind, sessionID, game turn, generator fingerprint
+    data        n bytes     snapshot, UTF-8 command line, ASCII token, or nothing
+
+Run from the repository root:
+    python -m adventure.server [host] [port] [world file] [metrics port] [journal file]
+    python benchmarks/journal_commit.py
+'''
+
+import asyncio
+import hmac
+import os
+import secrets
+import struct
+import zlib
+from array import array
+
+from adventure.game import RunCommandLine
+from adventure.names import NewNameResolver
+from adventure.snapshot import SaveSnapshot, LoadSnapshot
+
+
+# Record kinds.
+snapshotRecord = 1
+commandRecord = 2
+endRecord = 3
+tokenRecord = 4
+
+headerFormat = struct.Struct("<II")
+recordFormat = struct.Struct("<BQiI")
+
+# Commands between snapshots of the same game.
+defaultSnapshotEvery = 50
+
+# Random bytes in a resume token (it is written out as twice as many hex digits).
+resumeTokenBytes = 16
+
+
+def RngFingerprint( rng ):
+    '''
+    Returns a CRC-32 of the state of a random.Random, to tell whether two
+    generators have drawn the same numbers.
+    '''
+    state = rng.getstate()[1]
+    return zlib.crc32(array("I", state).tobytes())
+
+def NewResumeToken():
+    '''
+    Returns a new, unguessable resume token:  a string of hex digits.
+    '''
+    return secrets.token_hex(resumeTokenBytes)
+
+def EncodeRecord( kind, sessionID, gameTurn, fingerprint, data ):
+    '''
+    Returns one journal record, ready to append.
+    '''
+    body = recordFormat.pack(kind, sessionID, gameTurn, fingerprint) + data
+    return headerFormat.pack(len(body), zlib.crc32(body)) + body
+
+def ReadJournal( journalFileName ):
+    '''
+    Reads every whole, undamaged record in a journal file, stopping at the
+    first one that isn't.  Returns [records, length of the good part], where
+    each record is [kind, sessionID, gameTurn, fingerprint, data].
+    '''
+    with open(journalFileName, "rb") as journalFile:
+        journalBytes = journalFile.read()
+    records = []
+    offset = 0
+    while offset + headerFormat.size <= len(journalBytes):
+        bodyLength, checksum = headerFormat.unpack_from(journalBytes, offset)
+        bodyStart = offset + headerFormat.size
+        bodyEnd = bodyStart + bodyLength
+        if bodyLength < recordFormat.size or bodyEnd > len(journalBytes):
+            break
+        body = journalBytes[bodyStart:bodyEnd]
+        if zlib.crc32(body) != checksum:
+            break
+        kind, sessionID, gameTurn, fingerprint = recordFormat.unpack_from(body, 0)
+        records.append([kind, sessionID, gameTurn, fingerprint, body[recordFormat.size:]])
+        offset = bodyEnd
+    return [records, offset]
+
+def RecoverSessions( journalFileName, sharedRoomList, sharedObjectList, rules, forgivingNames ):
+    '''
+    Rebuilds every unfinished game in a journal, in views of the given shared
+    (frozen) world.  Commands are replayed as they were typed, so
+    forgivingNames has to be what the games were played with (see
+    adventure/names.py).  Returns [sessions, tokens, problems]:  dictionaries of
+    sessionID -> GameSession and sessionID -> resume token, and a list of
+    messages about games that couldn't be rebuilt (those are left out).  A
+    missing journal has nothing to recover.
+    '''
+    sessions = {}
+    tokens = {}
+    problems = []
+    if not os.path.exists(journalFileName):
+        return [sessions, tokens, problems]
+    records, goodLength = ReadJournal(journalFileName)
+    if goodLength < os.path.getsize(journalFileName):
+        problems.append("journal ends with %d damaged or unfinished bytes, ignored" %
+                        (os.path.getsize(journalFileName) - goodLength))
+
+    # sessionID -> [last snapshot, command records since]
+    games = {}
+    for record in records:
+        kind, sessionID = record[0], record[1]
+        if kind == snapshotRecord:
+            games[sessionID] = [record[4], []]
+        elif kind == commandRecord:
+            if sessionID in games:
+                games[sessionID][1].append(record)
+        elif kind == tokenRecord:
+            tokens[sessionID] = record[4].decode("ascii")
+        elif kind == endRecord:
+            games.pop(sessionID, None)
+            tokens.pop(sessionID, None)
+
+    for sessionID, game in games.items():
+        snapshot, commands = game
+        try:
+            session = LoadSnapshot(snapshot, sharedRoomList, sharedObjectList, rules)
+        except ValueError as error:
+            problems.append("game %d:  %s" % (sessionID, error))
+            continue
+        if forgivingNames:
+            session.names = NewNameResolver()
+        for record in commands:
+            RunCommandLine(session, record[4].decode("utf-8"))
+            session.output.Take()
+            if session.gameTurn != record[2] or RngFingerprint(session.rng) != record[3]:
+                problems.append("game %d:  replay went differently at turn %d" % (sessionID, record[2]))
+                break
+        else:
+            if not session.finished:
+                sessions[sessionID] = session
+    for sessionID in list(tokens):
+        if sessionID not in sessions:
+            del tokens[sessionID]
+    return [sessions, tokens, problems]
+
+
+class Journal:
+    '''
+    The open journal file shared by every game on the server.  Records are
+    added with Append (or the Record* helpers) and made durable in batches by
+    Sync or WaitUntilDurable.  Records are numbered from 1 in the order they
+    were added.
+    '''
+    __slots__ = ("journalFile", "snapshotEvery", "pending", "appendedCount", "durableCount",
+                 "syncCount", "syncing", "sinceSnapshot", "tokens", "detached", "detachedSince",
+                 "nextSessionID")
+
+    def __init__( self, journalFile, snapshotEvery ):
+        # A binary file opened for appending.
+        self.journalFile = journalFile
+        self.snapshotEvery = snapshotEvery
+        # Encoded records not yet written.
+        self.pending = []
+        self.appendedCount = 0
+        self.durableCount = 0
+        self.syncCount = 0
+        # A future for the sync in progress, or None.
+        self.syncing = None
+        # sessionID -> commands since its last snapshot
+        self.sinceSnapshot = {}
+        # sessionID -> resume token
+        self.tokens = {}
+        # sessionID -> GameSession for unfinished games nobody is playing
+        # right now (recovered, or whose player hung up), waiting to resume,
+        # and sessionID -> when it was detached (in time.monotonic seconds).
+        self.detached = {}
+        self.detachedSince = {}
+        self.nextSessionID = 1
+
+    def NewSessionID( self ):
+        sessionID = self.nextSessionID
+        self.nextSessionID += 1
+        return sessionID
+
+    def Append( self, kind, sessionID, gameTurn, fingerprint, data ):
+        '''
+        Adds a record to be written with the next sync.  Returns its number.
+        '''
+        self.pending.append(EncodeRecord(kind, sessionID, gameTurn, fingerprint, data))
+        self.appendedCount += 1
+        return self.appendedCount
+
+    def RecordSnapshot( self, sessionID, session ):
+        self.sinceSnapshot[sessionID] = 0
+        return self.Append(snapshotRecord, sessionID, session.gameTurn, RngFingerprint(session.rng),
+                           SaveSnapshot(session))
+
+    def RecordCommand( self, sessionID, session, action ):
+        '''
+        Records a command the game has just carried out, and a snapshot too
+        if it's been snapshotEvery commands since the last one.  Returns the
+        number of the last record added.
+        '''
+        recordNumber = self.Append(commandRecord, sessionID, session.gameTurn,
+                                   RngFingerprint(session.rng), action.encode("utf-8"))
+        commandCount = self.sinceSnapshot.get(sessionID, 0) + 1
+        self.sinceSnapshot[sessionID] = commandCount
+        if commandCount >= self.snapshotEvery and not session.finished:
+            recordNumber = self.RecordSnapshot(sessionID, session)
+        return recordNumber
+
+    def RecordToken( self, sessionID, token ):
+        self.tokens[sessionID] = token
+        return self.Append(tokenRecord, sessionID, 0, 0, token.encode("ascii"))
+
+    def RecordEnd( self, sessionID ):
+        self.sinceSnapshot.pop(sessionID, None)
+        self.tokens.pop(sessionID, None)
+        self.detached.pop(sessionID, None)
+        self.detachedSince.pop(sessionID, None)
+        return self.Append(endRecord, sessionID, 0, 0, b"")
+
+    def Detach( self, sessionID, session, now ):
+        '''
+        Keeps an unfinished game nobody is playing, for its player to resume.
+        now must never go backwards from one call to the next.
+        '''
+        self.detached[sessionID] = session
+        # Kept in the order games were detached, oldest first.
+        self.detachedSince.pop(sessionID, None)
+        self.detachedSince[sessionID] = now
+
+    def Resume( self, sessionID, token ):
+        '''
+        Returns the detached game with the given number, taking it out of the
+        detached games, if token is its resume token.  Otherwise returns None,
+        whether or not there is such a game.
+        '''
+        expected = None
+        if sessionID in self.detached:
+            expected = self.tokens.get(sessionID)
+        if expected is None:
+            # Compare with something anyway, so that how long it takes gives
+            # nothing away about which games there are.
+            expected = "0" * (2 * resumeTokenBytes)
+            sessionID = -1
+        if not hmac.compare_digest(expected.encode("utf-8"), token.encode("utf-8")) or sessionID < 0:
+            return None
+        self.detachedSince.pop(sessionID, None)
+        return self.detached.pop(sessionID)
+
+    def ExpireDetached( self, now, idleSeconds ):
+        '''
+        Ends every detached game that has waited idleSeconds or more to be
+        resumed.  Returns how many there were.
+        '''
+        expired = []
+        for sessionID, since in self.detachedSince.items():
+            if now - since < idleSeconds:
+                # Every game after this one was detached later still.
+                break
+            expired.append(sessionID)
+        for sessionID in expired:
+            self.RecordEnd(sessionID)
+        return len(expired)
+
+    def WriteRecords( self, records ):
+        '''
+        Writes and fsyncs the given encoded records.  If that fails, whatever
+        part of them got written is cut off again (where possible), so they
+        can be written whole next time.
+        '''
+        startOffset = self.journalFile.tell()
+        try:
+            self.journalFile.write(b"".join(records))
+            self.journalFile.flush()
+            os.fsync(self.journalFile.fileno())
+        except OSError:
+            try:
+                self.journalFile.truncate(startOffset)
+                self.journalFile.seek(startOffset)
+            except (OSError, ValueError):
+                # Recovery stops at a torn record anyway.
+                pass
+            raise
+        self.syncCount += 1
+
+    def Sync( self ):
+        '''
+        Makes every record added so far durable, right now.
+        '''
+        if len(self.pending) == 0:
+            return
+        records = self.pending
+        upTo = self.appendedCount
+        self.pending = []
+        try:
+            self.WriteRecords(records)
+        except OSError:
+            self.pending = records + self.pending
+            raise
+        self.durableCount = upTo
+
+    async def SyncPending( self ):
+        '''
+        Writes and fsyncs every record waiting, from a worker thread so the
+        other games keep playing while it happens.  If that fails, the
+        records go back to the front of the queue and the error is raised.
+        '''
+        records = self.pending
+        upTo = self.appendedCount
+        self.pending = []
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.WriteRecords, records)
+            self.durableCount = upTo
+        except BaseException:
+            # Records added while the write was going on stay behind these.
+            self.pending = records + self.pending
+            raise
+        finally:
+            self.syncing = None
+
+    async def WaitUntilDurable( self, recordNumber ):
+        '''
+        Returns once record number recordNumber is on disk.  If a sync is
+        already under way, waits for it and then syncs whatever piled up
+        meanwhile (unless another game got there first), so one fsync covers
+        every game waiting.  Raises OSError if the sync it waited on failed.
+        '''
+        while self.durableCount < recordNumber:
+            if self.syncing is None:
+                self.syncing = asyncio.ensure_future(self.SyncPending())
+            # Shielded, so a game whose player hangs up mid-sync doesn't
+            # cancel the sync for everyone else.
+            await asyncio.shield(self.syncing)
+
+    def Close( self ):
+        self.Sync()
+        self.journalFile.close()
+
+
+def StartJournal( journalFileName, sessions, tokens, snapshotEvery, now ):
+    '''
+    Starts a fresh journal holding a snapshot and the resume token of each
+    of the given games (dictionaries of sessionID -> GameSession and
+    sessionID -> token, usually from RecoverSessions), which become the
+    journal's detached games, as of now.  The old journal is only replaced
+    once the new one is safely written.  Returns the open Journal.
+    '''
+    newFileName = journalFileName + ".new"
+    journal = Journal(open(newFileName, "wb"), snapshotEvery)
+    for sessionID, session in sessions.items():
+        journal.RecordSnapshot(sessionID, session)
+        if sessionID in tokens:
+            journal.RecordToken(sessionID, tokens[sessionID])
+        journal.nextSessionID = max(journal.nextSessionID, sessionID + 1)
+    journal.Sync()
+    journal.journalFile.close()
+    os.replace(newFileName, journalFileName)
+    # Make the rename itself durable, where the system lets us.
+    if hasattr(os, "O_DIRECTORY"):
+        directory = os.open(os.path.dirname(os.path.abspath(journalFileName)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+    journal.journalFile = open(journalFileName, "ab")
+    for sessionID, session in sessions.items():
+        journal.Detach(sessionID, session, now)
+    return journal
@@ -0,0 +1,202 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+A read-only string table kept in a memory-mapped file.
+
+In a world with millions of rooms, the room and object descriptions and the
+use, take and status messages are most of the memory, and a session only
+ever reads a handful of them.  BuildMappedWorld writes all of that text to a
+string store file once and gives back compact storage (see
+adventure/compact.py) that reads each string out of the mapped file only
+when it is asked for.  OpenMappedWorld maps a store that was already written,
+so worker processes can share one store without writing it again.  Text that is never read is never loaded, and every
+process that maps the same file shares the same pages of it.
+
+Store file layout (all little-endian):
+
+    header      4s H H I      magic "PADS", format version, reserved (0), count N
+    offsets     (N + 1) * q   where string K starts in the text, and where it
+                              ends (which is where string K + 1 starts)
+    text        UTF-8 bytes of every string, end to end
+
+Object names and aliases aren't in the store.  The name index needs all of
+them the moment a world loads anyway.
+'''
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from adventure.compact import StringTable, CompactRoomList, CompactObjectList
+
+
+storeMagic = b"PADS"
+storeVersion = 1
+
+storeHeaderFormat = struct.Struct("<4sHHI")
+
+
+def WriteStringStore( storeFile, strings ):
+    '''
+    Writes a list of strings to a string store file.  String K of the list is
+    string K of the store.  An existing store is replaced, not overwritten, so
+    processes that already have it mapped keep reading the old one.
+    '''
+    encoded = [text.encode("utf-8") for text in strings]
+    offsets = array("q", [0])
+    position = 0
+    for data in encoded:
+        position += len(data)
+        offsets.append(position)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    temporaryFile = "%s.%d.tmp" % (storeFile, os.getpid())
+    try:
+        with open(temporaryFile, "wb") as store:
+            store.write(storeHeaderFormat.pack(storeMagic, storeVersion, 0, len(encoded)))
+            store.write(offsets.tobytes())
+            for data in encoded:
+                store.write(data)
+        # Never write over a store in place:  a process that has it mapped
+        # would be killed (SIGBUS) reading a page that is no longer there.
+        # Replacing the file leaves the old one alive for as long as it's mapped.
+        os.replace(temporaryFile, storeFile)
+    except BaseException:
+        try:
+            os.remove(temporaryFile)
+        except OSError:
+            pass
+        raise
+
+
+class MappedStrings:
+    '''
+    The strings of a string store file, looked up by position like a list.
+
+    Strings added after the store was written (by AddObject, say) can't go in
+    the file, so they are kept in memory in extra, and numbered after the
+    stored ones.
+    '''
+    __slots__ = ("storeFile", "storeMap", "offsets", "count", "textStart", "extra")
+
+    def __init__( self, storeFile ):
+        self.storeFile = os.path.abspath(storeFile)
+        with open(self.storeFile, "rb") as store:
+            # The mapping stays open after the file is closed.
+            self.storeMap = mmap.mmap(store.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(mmap, "MADV_RANDOM"):
+            # Strings are read a few at a time from all over the file, so
+            # reading ahead would only load text nobody asked for.
+            self.storeMap.madvise(mmap.MADV_RANDOM)
+        if len(self.storeMap) < storeHeaderFormat.size:
+            raise ValueError("string store is truncated")
+        magic, version, reserved, count = storeHeaderFormat.unpack_from(self.storeMap, 0)
+        if magic != storeMagic:
+            raise ValueError("not a string store")
+        if version != storeVersion:
+            raise ValueError("unsupported string store version %d" % version)
+        self.count = count
+        self.textStart = storeHeaderFormat.size + (count + 1) * 8
+        if len(self.storeMap) < self.textStart:
+            raise ValueError("string store is truncated")
+        offsetBytes = memoryview(self.storeMap)[storeHeaderFormat.size:self.textStart]
+        if sys.byteorder == "little":
+            # Read the offsets straight out of the mapped file, too.
+            self.offsets = offsetBytes.cast("q")
+        else:
+            self.offsets = array("q", offsetBytes.tobytes())
+            self.offsets.byteswap()
+        self.extra = []
+
+    def __len__( self ):
+        return self.count + len(self.extra)
+
+    def __getitem__( self, stringID ):
+        if stringID >= self.count:
+            return self.extra[stringID - self.count]
+        if stringID < 0:
+            raise IndexError("string %d isn't in the store" % stringID)
+        start = self.textStart + self.offsets[stringID]
+        end = self.textStart + self.offsets[stringID + 1]
+        return str(self.storeMap[start:end], "utf-8")
+
+    def __reduce__( self ):
+        # Pickling (for a world cache, or to hand a world to another process)
+        # saves where the store is, not what's in it.
+        return (ReopenMappedStrings, (self.storeFile, self.extra))
+
+def ReopenMappedStrings( storeFile, extra ):
+    '''
+    Maps a string store again when a pickled MappedStrings is loaded.
+    '''
+    strings = MappedStrings(storeFile)
+    strings.extra = extra
+    return strings
+
+
+class MappedStringTable:
+    '''
+    A StringTable (see adventure/compact.py) whose strings live in a string store file.
+    '''
+    __slots__ = ("strings",)
+
+    def __init__( self, storeFile ):
+        self.strings = MappedStrings(storeFile)
+
+    def __len__( self ):
+        return len(self.strings)
+
+    def Intern( self, text ):
+        '''
+        Returns the ID of a new string.  The store is read-only, so this is
+        kept in memory, and isn't shared with an equal string in the store.
+        '''
+        self.strings.extra.append(text)
+        return len(self.strings) - 1
+
+
+def CompactWorld( roomList, objectList ):
+    # The string IDs only depend on the world data, so the same world always
+    # gives the same StringTable, and so the same store.
+    strings = StringTable()
+    return [CompactRoomList(roomList, strings), CompactObjectList(objectList, strings), strings]
+
+def UseMappedStrings( compactRooms, compactObjects, mappedStrings ):
+    # From here on, every string comes out of the file instead.
+    compactRooms.strings = mappedStrings
+    compactObjects.strings = mappedStrings
+    return [compactRooms, compactObjects]
+
+def BuildMappedWorld( roomList, objectList, storeFile ):
+    '''
+    Converts list-of-lists world data into compact storage whose text is read
+    from a string store, writing the store to storeFile.
+    Returns [compactRoomList, compactObjectList].
+    '''
+    compactRooms, compactObjects, strings = CompactWorld(roomList, objectList)
+    WriteStringStore(storeFile, strings.strings)
+    return UseMappedStrings(compactRooms, compactObjects, MappedStringTable(storeFile))
+
+def OpenMappedWorld( roomList, objectList, storeFile ):
+    '''
+    Like BuildMappedWorld, but maps a store that BuildMappedWorld already wrote
+    for the same world instead of writing it again.  This is how worker
+    processes share one store.
+    Raises ValueError if the store doesn't hold this world's strings.
+    '''
+    compactRooms, compactObjects, strings = CompactWorld(roomList, objectList)
+    mappedStrings = MappedStringTable(storeFile)
+    storeStrings = mappedStrings.strings
+    # Reading every string back would load the whole file;  comparing the
+    # count and the total length catches a store written for another world.
+    textLength = sum(len(text.encode("utf-8")) for text in strings.strings)
+    if storeStrings.count != len(strings) or storeStrings.offsets[storeStrings.count] != textLength:
+        raise ValueError("string store %s was written for a different world" % storeFile)
+    return UseMappedStrings(compactRooms, compactObjects, mappedStrings)
@@ -0,0 +1,247 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Forgiving object names:  prefixes and near misses.
+
+GetObjectID only knows whole names and aliases, so "take oni" or "examine
+creatur" get the same "You cannot take that." as asking for something that
+doesn't exist.  A NameResolver looks a bit harder, among the objects the
+player can actually get at (the ones in the room and in the inventory):
+
+  - a name that is the start of exactly one of their names or aliases
+    means that object ("oni" is the Onion);
+  - otherwise, names and aliases a letter or two away from what was typed
+    (or every object a prefix fits, if it fits more than one) are offered
+    as suggestions after the command fails.
+
+A name that is the whole name or alias of more than one object in reach is
+left alone, and the command goes ahead just as it would without a resolver.
+
+The names in reach are put in a NameTrie, a tree with one letter per step,
+so that everything starting with a prefix is one walk down the tree, and the
+search for near misses can give up on a whole branch as soon as its start is
+too far from what was typed.  Recent answers are kept in a small LRU cache,
+keyed by the name and the objects in reach, so typing the same thing in the
+same place again costs a dictionary lookup.  The work depends on how much is
+in reach, not on how big the world is.
+
+A session uses a NameResolver by setting session.names to one.  RunCommand
+then passes every Examine, Take and Use through it before carrying it out.
+Objects that change their names or aliases during a game should call Clear
+afterwards, since the cache can't tell.  The console game and both servers
+give every session one (from NewNameResolver) when started with --names.
+Without it they answer exactly as they always have.
+
+Run from the repository root:
+    python benchmarks/name_matching.py
+'''
+
+import collections
+
+from adventure.data import NormalizeObjectName, GetObjectID, GetObjectName, GetObjectAliases, \
+    GetObjectsInRoom, inventoryLocation
+from adventure.commands import commandVerbs, NormalizeCommandVerb, HandleExamine, HandleTake, HandleUse
+
+
+# The command handlers whose object names get resolved.
+objectHandlers = (HandleExamine, HandleTake, HandleUse)
+
+# How far off a near miss can be, and how many answers each session keeps,
+# for the sessions of a game started with --names.
+defaultMaxDistance = 2
+defaultCacheSize = 256
+
+
+class NameTrie:
+    '''
+    Names and aliases (already normalized) and the objects they belong to,
+    one letter per level.  Each node is a dictionary of letter -> node, and
+    a node where a name ends also holds None -> set of objectIDs.
+    '''
+    __slots__ = ("root",)
+
+    def __init__( self ):
+        self.root = {}
+
+    def AddName( self, key, objectID ):
+        node = self.root
+        for letter in key:
+            node = node.setdefault(letter, {})
+        node.setdefault(None, set()).add(objectID)
+
+    def FindNode( self, key ):
+        '''
+        Returns the node key leads to, or None if no name starts with key.
+        '''
+        node = self.root
+        for letter in key:
+            node = node.get(letter)
+            if node is None:
+                return None
+        return node
+
+    def Find( self, key ):
+        '''
+        Returns the set of objects with exactly this name or alias (empty if none).
+        '''
+        node = self.FindNode(key)
+        if node is None:
+            return set()
+        return node.get(None, set())
+
+    def FindPrefix( self, prefix ):
+        '''
+        Returns the set of objects with a name or alias starting with prefix.
+        '''
+        found = set()
+        node = self.FindNode(prefix)
+        if node is None:
+            return found
+        waiting = [node]
+        while len(waiting) > 0:
+            node = waiting.pop()
+            for letter, child in node.items():
+                if letter is None:
+                    found.update(child)
+                else:
+                    waiting.append(child)
+        return found
+
+    def FindClose( self, key, maxDistance ):
+        '''
+        Returns a dictionary of objectID -> edit distance for every object
+        with a name or alias no more than maxDistance letters (added,
+        removed or changed) away from key.
+        '''
+        found = {}
+        # Each entry is a node and the last row of the edit distance table
+        # for the letters that lead to it:  row[N] is how far the node's
+        # letters are from the first N letters of key.
+        waiting = [[self.root, list(range(len(key) + 1))]]
+        while len(waiting) > 0:
+            node, lastRow = waiting.pop()
+            for letter, child in node.items():
+                if letter is None:
+                    continue
+                row = [lastRow[0] + 1]
+                for column in range(1, len(key) + 1):
+                    row.append(min(row[column - 1] + 1, lastRow[column] + 1,
+                                   lastRow[column - 1] + (key[column - 1] != letter)))
+                if row[-1] <= maxDistance and None in child:
+                    for objectID in child[None]:
+                        if found.get(objectID, maxDistance + 1) > row[-1]:
+                            found[objectID] = row[-1]
+                # Longer names can't get any closer than the closest this row allows.
+                if min(row) <= maxDistance:
+                    waiting.append([child, row])
+        return found
+
+
+def BuildNameTrie( objectIDs, objectList ):
+    '''
+    Returns a NameTrie of the names and aliases of the given objects.
+    '''
+    trie = NameTrie()
+    for objectID in objectIDs:
+        trie.AddName(NormalizeObjectName(GetObjectName(objectID, objectList)), objectID)
+        for alias in GetObjectAliases(objectID, objectList):
+            trie.AddName(NormalizeObjectName(alias), objectID)
+    return trie
+
+
+class NameResolver:
+    '''
+    Works out which object in reach a player meant.  Keeps the last
+    cacheSize answers.
+    '''
+    __slots__ = ("maxDistance", "cacheSize", "resolutions")
+
+    def __init__( self, maxDistance, cacheSize ):
+        self.maxDistance = maxDistance
+        self.cacheSize = cacheSize
+        # [key, objects in reach] -> [objectID, suggested objectIDs], oldest first
+        self.resolutions = collections.OrderedDict()
+
+    def Clear( self ):
+        self.resolutions.clear()
+
+    def Resolve( self, objectName, roomID, objectList ):
+        '''
+        Returns [objectID, suggestions] for a name typed by a player in the
+        given room.  objectID is -1 if the name doesn't pick out one object
+        in reach, and then suggestions is a list of the objectIDs they might
+        have meant, closest first (and otherwise in objectID order).  A name
+        belonging to more than one object in reach has no suggestions, since
+        GetObjectID already picks one of them.  An empty name picks out nothing
+        and has no suggestions.
+        '''
+        key = NormalizeObjectName(objectName)
+        if key == "":
+            # Every name starts with nothing, so this would pick out everything.
+            return [-1, []]
+        inReach = tuple(sorted(set(GetObjectsInRoom(roomID, objectList)) |
+                               set(GetObjectsInRoom(inventoryLocation, objectList))))
+        cacheKey = (key, inReach)
+        resolution = self.resolutions.get(cacheKey)
+        if resolution is not None:
+            self.resolutions.move_to_end(cacheKey)
+            return resolution
+
+        trie = BuildNameTrie(inReach, objectList)
+        matches = trie.Find(key)
+        wholeName = len(matches) > 0
+        if not wholeName:
+            matches = trie.FindPrefix(key)
+        if len(matches) == 1:
+            resolution = [min(matches), []]
+        elif wholeName:
+            # Several objects answer to it, and GetObjectID picks one already.
+            resolution = [-1, []]
+        elif len(matches) > 1:
+            resolution = [-1, sorted(matches)]
+        else:
+            close = trie.FindClose(key, self.maxDistance)
+            resolution = [-1, sorted(close, key=lambda objectID: [close[objectID], objectID])]
+
+        self.resolutions[cacheKey] = resolution
+        if len(self.resolutions) > self.cacheSize:
+            self.resolutions.popitem(last=False)
+        return resolution
+
+    def ResolveCommand( self, action, session ):
+        '''
+        Returns [action, hint] for a command line.  If the command's object
+        was meant to be one object in reach that GetObjectID wouldn't find,
+        action has its name swapped for one GetObjectID does find.  hint is
+        a "Did you mean" line to say after the command, or "" for none.
+        '''
+        verb, separator, objectName = action.partition(" ")
+        registeredCommand = commandVerbs.get(NormalizeCommandVerb(verb))
+        if separator == "" or registeredCommand is None or registeredCommand[0] not in objectHandlers:
+            return [action, ""]
+        objectList = session.objectList
+        objectID, suggestions = self.Resolve(objectName, session.playerRoom, objectList)
+        if objectID < 0:
+            if len(suggestions) == 0:
+                return [action, ""]
+            names = [GetObjectName(suggestion, objectList) for suggestion in suggestions]
+            return [action, "Did you mean:  %s?" % ", ".join(names)]
+        if GetObjectID(objectName, objectList) == objectID:
+            return [action, ""]
+        # Any of its names will do, so long as it's this object that answers to it.
+        for name in [GetObjectName(objectID, objectList)] + list(GetObjectAliases(objectID, objectList)):
+            if GetObjectID(name, objectList) == objectID:
+                return [verb + " " + name, ""]
+        return [action, ""]
+
+def NewNameResolver():
+    '''
+    Returns a NameResolver with the settings every session of a game started
+    with --names gets.
+    '''
+    return NameResolver(defaultMaxDistance, defaultCacheSize)
@@ -0,0 +1,244 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Scheduling lots of wandering creatures (NPCs).
+
+The creature in the built-in world is moved by its "wander" rule after
+every command:  MoveCreature builds a list of its room and exits, and picks
+from it at random until it picks something that isn't a wall.  That's fine
+for one creature, but a world with thousands of them would spend every turn
+moving creatures that nobody is anywhere near.  An NpcScheduler instead:
+
+  - looks up where a creature can go from a MoveTable, worked out once per
+    world, so a move is a single random pick with no walls to retry;
+  - files every NPC under the turn it next acts, so a turn only looks at the
+    NPCs that are due on it;
+  - only moves NPCs within a few rooms of the player.  An NPC that comes due
+    anywhere else is put to sleep in its room, and woken up when the player
+    comes near it again.  Sleeping NPCs cost nothing at all.  Something
+    else (a rule, say) can move a sleeping NPC, so the rooms near the player
+    are also searched for sleepers filed somewhere else, when their
+    contents may have changed since.
+
+So a turn costs about as much as the NPCs near the player, however many
+there are in the whole world.
+
+A session plays with an NpcScheduler by setting session.npcs to one, and
+RunCommand runs it after the world's rules every turn.  NPCs are ordinary
+objects, so where they are is saved with the session (and in snapshots),
+but the scheduler itself isn't:  after LoadSnapshot, make a new one and add
+the NPCs to it again.
+
+Run from the repository root:
+    python benchmarks/npc_scheduler.py
+'''
+
+from adventure.data import GetRoomExits, GetObjectLocation, GetObjectStatus, SetObjectLocation, \
+    GetObjectsInRoom, GetRoomContentsVersion, versionStamps
+
+
+def GetMoveChoices( roomID, exits ):
+    '''
+    Returns where a wandering creature in the room can go next:  the room
+    itself, or through any exit that isn't a wall.  These are the same
+    choices (and chances) MoveCreature has.
+    '''
+    return tuple([roomID] + [roomExit for roomExit in exits if roomExit > -1])
+
+class MoveTable:
+    '''
+    The move choices for every room in a world.  Made once per world, and
+    shared by every session (and scheduler) playing in it.
+
+    A session can change a room's exits (the key opens the gate, say), so the
+    exits each room had when the table was made are kept too, and checked
+    before a room's choices are used.  For a frozen world, that check is just
+    seeing that the session is still looking at the same tuple.
+    '''
+    __slots__ = ("exits", "choices")
+
+    def __init__( self, roomList ):
+        self.exits = []
+        self.choices = []
+        for roomID in range(len(roomList)):
+            exits = GetRoomExits(roomID, roomList)
+            if not isinstance(exits, tuple):
+                # A list of exits can be changed in place, so keep a copy.
+                exits = tuple(exits)
+            self.exits.append(exits)
+            self.choices.append(GetMoveChoices(roomID, exits))
+
+    def __len__( self ):
+        return len(self.choices)
+
+    def GetChoices( self, roomID, roomList ):
+        '''
+        Returns the move choices for a room, as the given session's room list
+        has it now.
+        '''
+        exits = GetRoomExits(roomID, roomList)
+        knownExits = self.exits[roomID]
+        if exits is knownExits or tuple(exits) == knownExits:
+            return self.choices[roomID]
+        return GetMoveChoices(roomID, exits)
+
+
+class NpcScheduler:
+    '''
+    The wandering NPCs of one session.
+
+    Each NPC is an object (by objectID) that moves every "interval" turns.
+    Hostile NPCs (status above 0) go after the player when next to them, the
+    way the built-in creature does, or if roomGraph is set to a RoomGraph
+    (see adventure/graph.py) for the session's rooms, by the shortest way
+    from anywhere.  The graph is caught up with any exits that changed every
+    turn, and a step it gives that the room's exits don't allow is never
+    taken.  NPCs only ever move while the player is within "radius" moves
+    of them.
+    '''
+    __slots__ = ("moveTable", "radius", "roomGraph", "objectIDs", "npcNums", "intervals", "due",
+                 "sleeping", "asleepIn", "sleptSince", "nearRooms", "searchedAt", "lastTurn")
+
+    def __init__( self, moveTable, radius ):
+        self.moveTable = moveTable
+        self.radius = radius
+        self.roomGraph = None
+        # npcNum -> objectID, and how many turns it waits between moves
+        self.objectIDs = []
+        self.intervals = []
+        # objectID -> npcNum
+        self.npcNums = {}
+        # turn -> npcNums due to act on that turn
+        self.due = {}
+        # roomID -> npcNums asleep in that room, and npcNum -> the room it
+        # is filed under there (-1 while it's awake)
+        self.sleeping = {}
+        self.asleepIn = []
+        # For finding sleepers moved by something else (see
+        # WakeMovedSleepers):  a version stamp (see adventure/data.py) from
+        # before any NPC now asleep went to sleep, or None if none are;  the
+        # rooms near the player last turn;  and a stamp from just after it.
+        self.sleptSince = None
+        self.nearRooms = set()
+        self.searchedAt = 0
+        # The last turn that has been run.
+        self.lastTurn = 0
+
+    def __len__( self ):
+        return len(self.objectIDs)
+
+    def AddNpc( self, objectID, interval, firstTurn ):
+        '''
+        Adds an object as an NPC that first acts on firstTurn (or the next turn
+        to be run, if that has already gone by).  Returns its npcNum.
+        '''
+        if interval < 1:
+            raise ValueError("an NPC has to wait at least 1 turn between moves")
+        npcNum = len(self.objectIDs)
+        self.objectIDs.append(objectID)
+        self.intervals.append(interval)
+        self.npcNums[objectID] = npcNum
+        self.asleepIn.append(-1)
+        self.due.setdefault(max(firstTurn, self.lastTurn + 1), []).append(npcNum)
+        return npcNum
+
+    def GetRoomsNear( self, roomID, roomList ):
+        '''
+        Returns the set of rooms within radius moves of a room.
+        '''
+        nearRooms = set([roomID])
+        edge = [roomID]
+        for step in range(self.radius):
+            nextEdge = []
+            for edgeRoom in edge:
+                for choice in self.moveTable.GetChoices(edgeRoom, roomList):
+                    if choice not in nearRooms:
+                        nearRooms.add(choice)
+                        nextEdge.append(choice)
+            edge = nextEdge
+        return nearRooms
+
+    def WakeMovedSleepers( self, nearRooms, objectList, turn ):
+        '''
+        Wakes any sleeping NPC that something else (a rule, say) has moved
+        into a room near the player, to act on the given turn.  Only rooms
+        that can have changed since the NPCs went to sleep, and haven't been
+        searched since, are looked through.
+        '''
+        if self.sleptSince is None:
+            return
+        for roomID in nearRooms:
+            version = GetRoomContentsVersion(roomID, objectList)
+            if -1 < version < self.searchedAt and (version < self.sleptSince or roomID in self.nearRooms):
+                continue
+            for objectID in GetObjectsInRoom(roomID, objectList):
+                npcNum = self.npcNums.get(objectID, -1)
+                if npcNum < 0 or self.asleepIn[npcNum] < 0:
+                    continue
+                sleepers = self.sleeping[self.asleepIn[npcNum]]
+                sleepers.remove(npcNum)
+                if len(sleepers) == 0:
+                    del self.sleeping[self.asleepIn[npcNum]]
+                self.asleepIn[npcNum] = -1
+                self.due.setdefault(turn, []).append(npcNum)
+
+    def RunTurn( self, session ):
+        '''
+        Moves every NPC that is due and near the player, for each turn since
+        the last one that was run.
+        '''
+        roomList = session.roomList
+        objectList = session.objectList
+        playerRoom = session.playerRoom
+        nearRooms = self.GetRoomsNear(playerRoom, roomList)
+        if self.roomGraph is not None:
+            self.roomGraph.CatchUp(roomList)
+        self.WakeMovedSleepers(nearRooms, objectList, self.lastTurn + 1)
+        for turn in range(self.lastTurn + 1, session.gameTurn + 1):
+            # Wake up anyone asleep near the player.  They act right away.
+            for roomID in nearRooms:
+                sleepers = self.sleeping.pop(roomID, None)
+                if sleepers is not None:
+                    for npcNum in sleepers:
+                        self.asleepIn[npcNum] = -1
+                    self.due.setdefault(turn, []).extend(sleepers)
+
+            for npcNum in self.due.pop(turn, []):
+                objectID = self.objectIDs[npcNum]
+                location = GetObjectLocation(objectID, objectList)
+                if location < 0:
+                    # Gone from the world (or taken).  It stays out of the schedule.
+                    continue
+                if location not in nearRooms:
+                    if self.sleptSince is None:
+                        self.sleptSince = next(versionStamps)
+                    self.sleeping.setdefault(location, []).append(npcNum)
+                    self.asleepIn[npcNum] = location
+                    continue
+                choices = self.moveTable.GetChoices(location, roomList)
+                moveTo = -1
+                if GetObjectStatus(objectID, objectList) > 0:
+                    # Hostile.  Head for the player, if there's a way there.
+                    if self.roomGraph is not None:
+                        moveTo = self.roomGraph.GetNextHop(location, playerRoom)
+                        if moveTo not in choices:
+                            # The graph can't see this change (see
+                            # RoomGraph.CatchUp).  Wander instead.
+                            moveTo = -1
+                    elif playerRoom in choices:
+                        moveTo = playerRoom
+                if moveTo < 0:
+                    moveTo = choices[int(session.rng.random() * len(choices))]
+                if moveTo != location:
+                    SetObjectLocation(objectID, moveTo, objectList)
+                self.due.setdefault(turn + self.intervals[npcNum], []).append(npcNum)
+            self.lastTurn = turn
+        if len(self.sleeping) == 0:
+            self.sleptSince = None
+        self.nearRooms = nearRooms
+        self.searchedAt = next(versionStamps)
@@ -0,0 +1,90 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Game output:  Say(), and the per-turn OutputBuffer it writes to.
+'''
+
+import contextlib
+import sys
+
+
+##### Game output
+
+#  Everything the game says goes through Say() instead of print().  Say()
+#  collects the text in the current turn's OutputBuffer, and the whole turn is
+#  handed to the buffer's sink in one go when the turn is over.  That is one
+#  write per turn instead of one per line, which matters when the other end
+#  is a network connection instead of a console.
+
+class OutputBuffer:
+    '''
+    Collects one turn's worth of game output.
+
+    The sink is anything that can be called with a string:  WriteToStdout for
+    the console, a list's append method to keep the turns, or a function that
+    sends the text down a network connection.
+    '''
+    __slots__ = ("parts", "sink")
+
+    def __init__( self, sink ):
+        self.parts = []
+        self.sink = sink
+
+    def Write( self, text ):
+        self.parts.append(text)
+
+    def Take( self ):
+        '''
+        Returns everything written since the last Take or Flush, and empties the buffer.
+        '''
+        text = "".join(self.parts)
+        self.parts.clear()
+        return text
+
+    def Flush( self ):
+        '''
+        Sends everything written so far to the sink, if there is anything.
+        '''
+        if len(self.parts) > 0:
+            self.sink(self.Take())
+
+def WriteToStdout( text ):
+    '''
+    Sink for console games.
+    '''
+    # Look up sys.stdout every time, so anything that redirects it still works.
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+# The buffer Say() writes to.  The game flow functions point this at their
+# session's buffer for as long as they run (see OutputTo).  Outside of a
+# game, Say() just prints.
+gameOutput = None
+
+@contextlib.contextmanager
+def OutputTo( outputBuffer ):
+    '''
+    Sends everything said inside the "with" block to the given OutputBuffer.
+    '''
+    global gameOutput
+    previousOutput = gameOutput
+    gameOutput = outputBuffer
+    try:
+        yield outputBuffer
+    finally:
+        gameOutput = previousOutput
+
+def Say( text ):
+    '''
+    Game output.  Works like print() with a single string.
+    '''
+    if gameOutput is None:
+        print(text)
+    else:
+        gameOutput.Write(text + "\n")
+
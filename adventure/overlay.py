@@ -0,0 +1,367 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Per-session views of a shared world.
+
+Every player in a multi-player server needs their own gate, creature and
+onion, but copying the whole world for each of them is wasteful.  Instead,
+the world is frozen once (FreezeWorld) and every session gets a view of it
+(NewSessionWorld) that keeps only what that session has changed.
+
+Reads check the session's changes first and fall through to the shared
+world for everything else.  Writes only ever go into the session's changes,
+which start out empty, so a new session costs the same no matter how big the
+world is.  The changes are plain dictionaries of numbers and strings and can
+be saved with ExportSessionDelta and put back with LoadSessionDelta.
+
+Rendered room views (see GetRoomView in adventure/commands.py) are cached
+with the shared world, so a room no session has changed is worked out once
+for all of them.  A session that changes a room gives it its own version
+stamp, which keeps its view of the room apart from everyone else's.
+'''
+
+import collections
+
+from adventure.data import GetRoomDescription, GetRoomExits, GetObjectID, GetObjectName, \
+    GetObjectAliases, IsUsableObject, GetUseMessage, IsTakableObject, GetTakeMessage, \
+    GetObjectStatus, GetObjectStatusMessage, GetStatusMessage, GetObjectLocation, \
+    GetObjectsInRoom, GetObjectDescription, NormalizeObjectName, BuildObjectNameIndex, \
+    BuildObjectRoomIndex, GetRoomVersion, GetRoomContentsVersion, GetRoomViews, StampRoom
+
+
+##### The shared world
+
+class SharedRoomList(tuple):
+    '''
+    A room list made of tuples, so nothing can change it by accident.
+    '''
+    def __new__( cls, roomList ):
+        return tuple.__new__(cls, [(room[0], tuple(room[1])) for room in roomList])
+
+class SharedObjectList(tuple):
+    '''
+    An object list made of tuples, so nothing can change it by accident.
+    It carries the same name and room indexes as adventure.data.ObjectList,
+    and the room view cache every session on it shares.
+    '''
+    def __new__( cls, objectList ):
+        self = tuple.__new__(cls, [FreezeObject(objectData) for objectData in objectList])
+        self.nameIndex = BuildObjectNameIndex(self)
+        self.roomIndex = {}
+        for location, roomObjects in BuildObjectRoomIndex(self).items():
+            self.roomIndex[location] = frozenset(roomObjects)
+        self.views = collections.OrderedDict()
+        return self
+
+def FreezeObject( objectData ):
+    '''
+    Returns a tuple copy of one object, with its alias and status lists as tuples too.
+    '''
+    return tuple([tuple(item) if isinstance(item, list) else item for item in objectData])
+
+def FreezeWorld( roomList, objectList ):
+    '''
+    Returns [sharedRoomList, sharedObjectList], read-only copies of the given
+    list-of-lists world data that can be handed to any number of sessions.
+    '''
+    return [SharedRoomList(roomList), SharedObjectList(objectList)]
+
+
+##### One session's view
+
+class SessionRoomList:
+    '''
+    One session's view of a shared room list.
+    '''
+    __slots__ = ("base", "exits", "roomVersions")
+
+    def __init__( self, baseRoomList ):
+        self.base = baseRoomList
+        # roomID -> this session's exit list for that room
+        self.exits = None
+        # roomID -> version stamp, for rooms whose exits this session changed
+        self.roomVersions = None
+
+    def __len__( self ):
+        return len(self.base)
+
+    def GetRoomDescription( self, roomID ):
+        return GetRoomDescription(roomID, self.base)
+
+    def GetRoomVersion( self, roomID ):
+        if self.roomVersions is not None and roomID in self.roomVersions:
+            return self.roomVersions[roomID]
+        return GetRoomVersion(roomID, self.base)
+
+    def StampChangedRooms( self ):
+        '''
+        Gives every room this session has changed a new version stamp.
+        Needed whenever the changes are replaced wholesale.
+        '''
+        self.roomVersions = {}
+        if self.exits is not None:
+            for roomID in self.exits:
+                StampRoom(roomID, self.roomVersions)
+
+    def GetRoomExits( self, roomID ):
+        if self.exits is not None and roomID in self.exits:
+            return self.exits[roomID]
+        return GetRoomExits(roomID, self.base)
+
+    def SetRoomExit( self, roomID, direction, newRoomID ):
+        if self.exits is None:
+            self.exits = {}
+        localExits = self.exits.get(roomID)
+        if localExits is None:
+            # First change to this room.  Take our own copy of its exits.
+            localExits = list(GetRoomExits(roomID, self.base))
+            self.exits[roomID] = localExits
+        localExits[direction] = int(newRoomID)
+        if self.roomVersions is None:
+            self.roomVersions = {}
+        StampRoom(roomID, self.roomVersions)
+
+    def ExportDelta( self ):
+        delta = {}
+        if self.exits is not None:
+            delta["exits"] = dict([(roomID, list(localExits)) for roomID, localExits in self.exits.items()])
+        return delta
+
+    def LoadDelta( self, delta ):
+        self.exits = None
+        if "exits" in delta:
+            self.exits = dict([(int(roomID), list(localExits)) for roomID, localExits in delta["exits"].items()])
+        self.StampChangedRooms()
+
+
+class SessionObjectList:
+    '''
+    One session's view of a shared object list.
+
+    Each kind of change has its own dictionary of objectID -> new value, and
+    stays None until the session changes something of that kind.  nameKeys
+    holds name index entries that differ from the shared world's, with -1
+    for names that no longer match anything.  roomVersions holds the
+    version stamps of rooms whose contents this session changed.
+    '''
+    __slots__ = ("base", "locations", "statuses", "usable", "names", "aliases", "nameKeys",
+                 "roomVersions")
+
+    # Every change dictionary, in the order they are saved.
+    deltaFields = ("locations", "statuses", "usable", "names", "aliases", "nameKeys")
+
+    def __init__( self, baseObjectList ):
+        self.base = baseObjectList
+        self.locations = None
+        self.statuses = None
+        self.usable = None
+        self.names = None
+        self.aliases = None
+        self.nameKeys = None
+        self.roomVersions = None
+
+    def __len__( self ):
+        return len(self.base)
+
+    def StampRoom( self, roomID ):
+        if self.roomVersions is None:
+            self.roomVersions = {}
+        StampRoom(roomID, self.roomVersions)
+
+    def StampChangedRooms( self ):
+        '''
+        Gives every room whose contents this session has changed a new
+        version stamp.  Needed whenever the changes are replaced wholesale.
+        '''
+        self.roomVersions = None
+        if self.locations is not None:
+            for objectID, location in self.locations.items():
+                self.StampRoom(GetObjectLocation(objectID, self.base))
+                self.StampRoom(location)
+        if self.statuses is not None:
+            for objectID in self.statuses:
+                self.StampRoom(self.GetObjectLocation(objectID))
+
+    def GetRoomContentsVersion( self, roomID ):
+        if self.roomVersions is not None and roomID in self.roomVersions:
+            return self.roomVersions[roomID]
+        return GetRoomContentsVersion(roomID, self.base)
+
+    def GetRoomViews( self ):
+        return GetRoomViews(self.base)
+
+    def GetObjectID( self, objectName ):
+        if self.nameKeys is not None:
+            key = NormalizeObjectName(objectName)
+            if key in self.nameKeys:
+                return self.nameKeys[key]
+        return GetObjectID(objectName, self.base)
+
+    def GetObjectName( self, objectID ):
+        if self.names is not None and objectID in self.names:
+            return self.names[objectID]
+        return GetObjectName(objectID, self.base)
+
+    def GetObjectAliases( self, objectID ):
+        if self.aliases is not None and objectID in self.aliases:
+            return list(GetObjectAliases(objectID, self.base)) + self.aliases[objectID]
+        return GetObjectAliases(objectID, self.base)
+
+    def IndexName( self, name, objectID ):
+        '''
+        Makes a name find the given object, unless an earlier object already has it.
+        '''
+        currentID = self.GetObjectID(name)
+        if currentID < 0 or objectID < currentID:
+            if self.nameKeys is None:
+                self.nameKeys = {}
+            self.nameKeys[NormalizeObjectName(name)] = objectID
+
+    def FindNameHolder( self, key ):
+        '''
+        Returns the first object (or -1) that still answers to a normalized name.
+        This walks every object, but is only needed when an object gives up a name.
+        '''
+        for objectID in range(len(self.base)):
+            for name in [self.GetObjectName(objectID)] + list(self.GetObjectAliases(objectID)):
+                if NormalizeObjectName(name) == key:
+                    return objectID
+        return -1
+
+    def SetObjectName( self, objectID, newName ):
+        oldName = self.GetObjectName(objectID)
+        if self.names is None:
+            self.names = {}
+        self.names[objectID] = str(newName)
+        if self.GetObjectID(oldName) == objectID:
+            if self.nameKeys is None:
+                self.nameKeys = {}
+            oldKey = NormalizeObjectName(oldName)
+            self.nameKeys[oldKey] = self.FindNameHolder(oldKey)
+        self.IndexName(newName, objectID)
+
+    def AddObjectAlias( self, objectID, alias ):
+        if self.aliases is None:
+            self.aliases = {}
+        self.aliases.setdefault(objectID, []).append(str(alias))
+        self.IndexName(alias, objectID)
+
+    def AddObject( self, objectData ):
+        raise TypeError("objects can't be added to one session's view of a shared world")
+
+    def IsUsableObject( self, objectID ):
+        if self.usable is not None and objectID in self.usable:
+            return self.usable[objectID]
+        return IsUsableObject(objectID, self.base)
+
+    def SetUsableObject( self, objectID, newValue ):
+        if self.usable is None:
+            self.usable = {}
+        self.usable[objectID] = bool(newValue)
+
+    def GetUseMessage( self, objectID ):
+        return GetUseMessage(objectID, self.base)
+
+    def IsTakableObject( self, objectID ):
+        return IsTakableObject(objectID, self.base)
+
+    def GetTakeMessage( self, objectID ):
+        return GetTakeMessage(objectID, self.base)
+
+    def GetObjectStatus( self, objectID ):
+        if self.statuses is not None and objectID in self.statuses:
+            return self.statuses[objectID]
+        return GetObjectStatus(objectID, self.base)
+
+    def SetObjectStatus( self, objectID, newStatus ):
+        if self.GetObjectStatus(objectID) == int(newStatus):
+            return
+        if self.statuses is None:
+            self.statuses = {}
+        self.statuses[objectID] = int(newStatus)
+        self.StampRoom(self.GetObjectLocation(objectID))
+
+    def GetObjectStatusMessage( self, objectID ):
+        if self.statuses is not None and objectID in self.statuses:
+            return GetStatusMessage(objectID, self.statuses[objectID], self.base)
+        return GetObjectStatusMessage(objectID, self.base)
+
+    def GetStatusMessage( self, objectID, status ):
+        return GetStatusMessage(objectID, status, self.base)
+
+    def GetObjectLocation( self, objectID ):
+        if self.locations is not None and objectID in self.locations:
+            return self.locations[objectID]
+        return GetObjectLocation(objectID, self.base)
+
+    def SetObjectLocation( self, objectID, newLocation ):
+        self.StampRoom(self.GetObjectLocation(objectID))
+        if self.locations is None:
+            self.locations = {}
+        self.locations[objectID] = int(newLocation)
+        self.StampRoom(int(newLocation))
+
+    def GetObjectsInRoom( self, roomID ):
+        sharedObjects = GetObjectsInRoom(roomID, self.base)
+        if self.locations is None:
+            return sharedObjects
+        # Anything this session moved is where the session says it is, not
+        # where the shared list says.  Sessions only ever move a few things.
+        roomObjects = [item for item in sharedObjects if item not in self.locations]
+        for item, location in self.locations.items():
+            if location == roomID:
+                roomObjects.append(item)
+        return roomObjects
+
+    def GetObjectDescription( self, objectID ):
+        return GetObjectDescription(objectID, self.base)
+
+    def ExportDelta( self ):
+        delta = {}
+        for field in self.deltaFields:
+            changes = getattr(self, field)
+            if changes is not None:
+                if field == "aliases":
+                    changes = dict([(objectID, list(extra)) for objectID, extra in changes.items()])
+                delta[field] = dict(changes)
+        return delta
+
+    def LoadDelta( self, delta ):
+        for field in self.deltaFields:
+            changes = None
+            if field in delta:
+                changes = {}
+                for key, value in delta[field].items():
+                    if field == "aliases":
+                        value = list(value)
+                    if field != "nameKeys":
+                        # Saving as JSON turns the objectIDs into strings.
+                        key = int(key)
+                    changes[key] = value
+            setattr(self, field, changes)
+        self.StampChangedRooms()
+
+
+def NewSessionWorld( sharedRoomList, sharedObjectList ):
+    '''
+    Returns [roomList, objectList] views of a shared world for one new session.
+    '''
+    return [SessionRoomList(sharedRoomList), SessionObjectList(sharedObjectList)]
+
+def ExportSessionDelta( roomList, objectList ):
+    '''
+    Returns everything a session has changed, as dictionaries of plain values.
+    '''
+    return {"rooms": roomList.ExportDelta(), "objects": objectList.ExportDelta()}
+
+def LoadSessionDelta( delta, roomList, objectList ):
+    '''
+    Replaces a session's changes with ones saved by ExportSessionDelta.
+    '''
+    roomList.LoadDelta(delta["rooms"])
+    objectList.LoadDelta(delta["objects"])
@@ -0,0 +1,200 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Deterministic replays of recorded games.
+
+A transcript is just the list of command lines a player typed.  Given the
+same seed for the creature's random wandering, replaying a transcript always
+produces exactly the same game, with no console involved.  Replays can start
+from the beginning or from a snapshot (see adventure/snapshot.py), and can be
+compared turn by turn against what was recorded the first time.
+
+A replay's output is kept as a list with one entry per turn:  entry 0 is
+everything printed before the first prompt, and entry N is everything the
+Nth command line printed (all of its commands, for a line holding several
+separated by semicolons).  FormatConsoleOutput turns that back into exactly what
+the console game would have shown, and SplitConsoleOutput goes the other way.
+
+Run from the repository root:
+    python -m adventure.replay --seed 1 transcript.txt
+    python -m adventure.replay --seed 1 transcript.txt --expect recorded.txt
+    python -m adventure.replay --seed 1 transcript.txt --metrics turns.prom
+    python -m adventure.replay --seed 1 transcript.txt --profile profile.txt
+
+--metrics saves counts and timings of what the replay did (see
+adventure/instrument.py).  --profile runs the replay under cProfile and
+saves a report of every function, the ones the replay spent longest in
+(counting what they called) first.
+'''
+
+import argparse
+import contextlib
+import random
+import sys
+
+from adventure.game import GameSession, StartGame, RunCommandLine, promptString, promptPadding
+from adventure.instrument import Instrumented, Metrics, WriteMetrics
+from adventure.overlay import FreezeWorld, NewSessionWorld
+from adventure.snapshot import LoadSnapshot
+from adventure.world import LoadGameWorld
+
+
+def NewReplaySession( seed, sharedRoomList, sharedObjectList, rules ):
+    '''
+    Returns a fresh GameSession on a shared (frozen) world and its rules, with
+    its random number generator seeded so the replay is repeatable.
+    '''
+    sessionWorld = NewSessionWorld(sharedRoomList, sharedObjectList)
+    session = GameSession(sessionWorld[0], sessionWorld[1], rules, random.Random(seed))
+    return session
+
+def ReadTranscript( transcriptFile ):
+    '''
+    Returns the list of command lines in a transcript file.
+    '''
+    with open(transcriptFile, encoding="utf-8") as transcript:
+        return transcript.read().splitlines()
+
+def ReplayCommands( session, commands, fromStart ):
+    '''
+    Plays the given commands in the given session, stopping early if the game ends.
+    If fromStart is True the introduction is played first, as for a new game.
+    Returns the list of per-turn outputs.  The session is left in its final state.
+    '''
+    turnOutputs = []
+    running = not session.finished
+    if fromStart:
+        running = StartGame(session)
+        turnOutputs.append(session.output.Take())
+    for action in commands:
+        if not running:
+            break
+        running = RunCommandLine(session, action)
+        turnOutputs.append(session.output.Take())
+    return turnOutputs
+
+def ReplayTranscript( seed, commands, sharedRoomList, sharedObjectList, rules ):
+    '''
+    Replays a whole game from the start.
+    Returns [session, turnOutputs], with the session in its final state.
+    '''
+    session = NewReplaySession(seed, sharedRoomList, sharedObjectList, rules)
+    turnOutputs = ReplayCommands(session, commands, True)
+    return [session, turnOutputs]
+
+def ReplayFromSnapshot( snapshot, commands, sharedRoomList, sharedObjectList, rules ):
+    '''
+    Replays commands starting from a saved game.
+    Returns [session, turnOutputs].  There is no introduction, so entry 0 of
+    turnOutputs is the output of the first command.
+    '''
+    session = LoadSnapshot(snapshot, sharedRoomList, sharedObjectList, rules)
+    turnOutputs = ReplayCommands(session, commands, False)
+    return [session, turnOutputs]
+
+def FormatConsoleOutput( turnOutputs ):
+    '''
+    Returns the per-turn outputs of a game from the start joined together the
+    way the console shows them, prompts included.
+    '''
+    return (promptPadding + promptString).join(turnOutputs)
+
+def SplitConsoleOutput( consoleOutput ):
+    '''
+    Splits a recorded console session back into per-turn outputs.
+    '''
+    return consoleOutput.split(promptPadding + promptString)
+
+def FindFirstDifference( turnOutputs, expectedOutputs ):
+    '''
+    Returns the index of the first turn whose output differs from the expected
+    output (including a turn that is missing from one side), or -1 if they match.
+    '''
+    for turnNum in range(min(len(turnOutputs), len(expectedOutputs))):
+        if turnOutputs[turnNum] != expectedOutputs[turnNum]:
+            return turnNum
+    if len(turnOutputs) != len(expectedOutputs):
+        return min(len(turnOutputs), len(expectedOutputs))
+    return -1
+
+def WriteProfileReport( profiler, fileName ):
+    '''
+    Saves a cProfile report, sorted by cumulative time, to a file.
+    '''
+    import pstats
+    with open(fileName, "w", encoding="utf-8") as reportFile:
+        stats = pstats.Stats(profiler, stream=reportFile)
+        stats.sort_stats("cumulative").print_stats()
+
+def Main( arguments ):
+    parser = argparse.ArgumentParser(prog="python -m adventure.replay",
+                                     description="Replay a transcript of game commands.")
+    parser.add_argument("transcript", help="file with one command per line")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the creature's wandering")
+    parser.add_argument("--snapshot", help="start from this saved game instead of a new one")
+    parser.add_argument("--expect", help="recorded output to compare against")
+    parser.add_argument("--world", help="world file to play in, instead of the built-in world")
+    parser.add_argument("--metrics", help="save metrics to this file (JSON if it ends in .json, else Prometheus text)")
+    parser.add_argument("--profile", help="run under cProfile and save the report to this file")
+    options = parser.parse_args(arguments)
+
+    world = LoadGameWorld(options.world)
+    sharedWorld = FreezeWorld(world[0], world[1])
+    commands = ReadTranscript(options.transcript)
+    snapshot = None
+    if options.snapshot is not None:
+        with open(options.snapshot, "rb") as snapshotFile:
+            snapshot = snapshotFile.read()
+
+    metrics = Metrics()
+    profiler = None
+    with contextlib.ExitStack() as measuring:
+        if options.metrics is not None:
+            measuring.enter_context(Instrumented(metrics))
+        if options.profile is not None:
+            # Imported here, like pstats, so batch workers that import this
+            # module don't load the profiler for nothing.
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+            measuring.callback(profiler.disable)
+        if snapshot is None:
+            session, turnOutputs = ReplayTranscript(options.seed, commands, sharedWorld[0], sharedWorld[1], world[2])
+        else:
+            session, turnOutputs = ReplayFromSnapshot(snapshot, commands, sharedWorld[0], sharedWorld[1], world[2])
+    if options.metrics is not None:
+        WriteMetrics(metrics, options.metrics)
+    if options.profile is not None:
+        WriteProfileReport(profiler, options.profile)
+
+    consoleOutput = FormatConsoleOutput(turnOutputs)
+    if options.snapshot is not None:
+        # The console shows a prompt before the first command after a restore too.
+        consoleOutput = promptPadding + promptString + consoleOutput
+    if options.expect is None:
+        sys.stdout.write(consoleOutput)
+        return 0
+
+    with open(options.expect, encoding="utf-8") as expectFile:
+        expectedOutputs = SplitConsoleOutput(expectFile.read())
+    if options.snapshot is not None and len(expectedOutputs) > 0 and expectedOutputs[0] == "":
+        # Nothing comes before the first prompt when starting from a snapshot.
+        expectedOutputs = expectedOutputs[1:]
+    difference = FindFirstDifference(turnOutputs, expectedOutputs)
+    if difference < 0:
+        print("Replay matches the recording (%d turns)." % len(turnOutputs))
+        return 0
+    print("First difference at turn %d." % difference)
+    if difference < len(expectedOutputs):
+        print("Expected:\n%s" % expectedOutputs[difference])
+    if difference < len(turnOutputs):
+        print("Replayed:\n%s" % turnOutputs[difference])
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(Main(sys.argv[1:]))
@@ -0,0 +1,424 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+The rules engine:  everything special that happens in a world, kept as data
+instead of being coded into the commands.  See "##### Rules" below.
+'''
+
+import bisect
+import contextlib
+
+from adventure.data import GetRoomExits, SetRoomExit, GetObjectID, IsInInventory, GetUseMessage, \
+    GetTakeMessage, GetObjectStatus, SetObjectStatus, GetObjectLocation, SetObjectLocation, \
+    AddToInventory, RemoveFromInventory
+from adventure.output import Say
+
+
+##### Rules
+
+#  Anything special that happens in the game is written down as a rule in the
+#  game data (see ruleList in adventure/builtin.py) instead of being coded
+#  into the commands.
+#  A rule says when it is checked, what has to be true (its conditions) and
+#  what happens then (its effects):
+#
+#      {"when": "use", "object": "Onion",
+#       "if": [["holding", "Onion"], ["here", "Creature"]],
+#       "then": [["remove", "Onion"], ["useMessage", "Onion"], ...]}
+#
+#  "when" is one of:
+#    - "use":    The player uses "object".  Only the first of its rules whose
+#                conditions hold is carried out.
+#    - "world":  After every command, when the rest of the world takes its turn.
+#    - "turn":   At the start of every turn, before the player is prompted.
+#  Every "world" and "turn" rule whose conditions hold is carried out, in
+#  order, until one of them ends the game.
+#
+#  Conditions:                     Effects:
+#    ["holding", object]             ["say", text]
+#    ["here", object]                ["useMessage", object]
+#    ["at", object, roomID]          ["takeMessage", object]
+#    ["playerIn", roomID]            ["take", object]       (into the inventory)
+#    ["status", object, status]      ["remove", object]     (out of the inventory)
+#    ["turnAtLeast", turn] *         ["move", object, roomID]
+#    ["encounter"] *                 ["setStatus", object, status]
+#                                    ["setExit", roomID, direction, toRoomID]
+#                                    ["wander", object] *
+#                                    ["end", outcome] *     (one of gameOutcomes)
+#  * Only in "world" and "turn" rules, which can see the whole game session.
+#
+#  CompileRules turns a list of rules into a RuleBook, with object names
+#  swapped for objectIDs and the rules sorted into indexes, so that each
+#  command or turn only checks the rules that could possibly apply to it.
+
+# When a rule can be checked.
+ruleTimes = ("use", "world", "turn")
+
+# The ways a game can end.
+gameOutcomes = ("win", "death", "exit")
+
+# The rules in effect.  The game flow functions point this at their
+# session's rules for as long as they run (see RulesFrom).  Outside of a
+# game, the built-in world's rules are used.
+activeRules = None
+
+def GetGameRules():
+    '''
+    Returns the built-in world's RuleBook.
+    '''
+    # The built-in world is only built the first time something needs it,
+    # so importing the game doesn't build a world nobody may play.
+    from adventure.builtin import gameRules
+    return gameRules
+
+def TestHolding( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    True if the player is carrying the object.
+    '''
+    return IsInInventory(arguments[0],objectList)
+
+def TestHere( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    True if the object is in the room the player is in.
+    '''
+    return GetObjectLocation(arguments[0],objectList) == roomID
+
+def TestAt( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    True if the object is in the given room.
+    '''
+    return GetObjectLocation(arguments[0],objectList) == arguments[1]
+
+def TestPlayerIn( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    True if the player is in the given room.
+    '''
+    return roomID == arguments[0]
+
+def TestStatus( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    True if the object's status is the given number.
+    '''
+    return GetObjectStatus(arguments[0],objectList) == arguments[1]
+
+def TestTurnAtLeast( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    True once the game has gone on for at least the given number of turns.
+    '''
+    return session.gameTurn >= arguments[0]
+
+def TestEncounter( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    True while a hostile creature has caught up with the player.
+    '''
+    return session.encounter
+
+def EffectSay( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    Says the given text.
+    '''
+    Say(arguments[0])
+
+def EffectUseMessage( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    Says the object's use message.
+    '''
+    Say(GetUseMessage(arguments[0],objectList))
+
+def EffectTakeMessage( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    Says the object's take message.
+    '''
+    Say(GetTakeMessage(arguments[0],objectList))
+
+def EffectTake( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    Puts the object in the player's inventory.
+    '''
+    AddToInventory(arguments[0],objectList,playerInventory)
+
+def EffectRemove( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    Takes the object out of the player's inventory and out of the world.
+    '''
+    RemoveFromInventory(arguments[0],objectList,playerInventory)
+
+def EffectMove( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    Moves the object to the given room.
+    '''
+    SetObjectLocation(arguments[0],arguments[1],objectList)
+
+def EffectSetStatus( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    Sets the object's status.
+    '''
+    SetObjectStatus(arguments[0],arguments[1],objectList)
+
+def EffectSetExit( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    Sets one of a room's exits:  room, direction, room it leads to (or -1).
+    '''
+    SetRoomExit(arguments[0],arguments[1],arguments[2],roomList)
+
+def EffectWander( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    Moves the creature (see MoveCreature).
+    '''
+    MoveCreature(arguments[0],session)
+
+def EffectEnd( arguments, roomList, objectList, playerInventory, roomID, session ):
+    '''
+    Ends the game with the given outcome.
+    '''
+    session.finished = True
+    session.outcome = arguments[0]
+
+#  Every kind of condition and effect:  the function that does it, what its
+#  arguments are, and whether it needs the whole session.  Argument kinds are
+#  "object" (a name, which is turned into an objectID), "room", "direction",
+#  "number", "text" and "outcome".
+conditionKinds = {
+    "holding":      [TestHolding, ("object",), False],
+    "here":         [TestHere, ("object",), False],
+    "at":           [TestAt, ("object", "room"), False],
+    "playerIn":     [TestPlayerIn, ("room",), False],
+    "status":       [TestStatus, ("object", "number"), False],
+    "turnAtLeast":  [TestTurnAtLeast, ("number",), True],
+    "encounter":    [TestEncounter, (), True]}
+effectKinds = {
+    "say":          [EffectSay, ("text",), False],
+    "useMessage":   [EffectUseMessage, ("object",), False],
+    "takeMessage":  [EffectTakeMessage, ("object",), False],
+    "take":         [EffectTake, ("object",), False],
+    "remove":       [EffectRemove, ("object",), False],
+    "move":         [EffectMove, ("object", "room"), False],
+    "setStatus":    [EffectSetStatus, ("object", "number"), False],
+    "setExit":      [EffectSetExit, ("room", "direction", "room"), False],
+    "wander":       [EffectWander, ("object",), True],
+    "end":          [EffectEnd, ("outcome",), True]}
+
+class TurnRuleIndex:
+    '''
+    The "world" or "turn" rules of a RuleBook, sorted by whichever of their
+    conditions rules them out most often:  the player's room, then the turn.
+    '''
+    __slots__ = ("roomRules", "thresholds", "timedRules", "otherRules")
+
+    def __init__( self ):
+        # roomID -> numbers of the rules with a "playerIn" condition for it
+        self.roomRules = {}
+        # Turn thresholds of the rules with a "turnAtLeast" condition, lowest
+        # first, and the matching rule numbers in the same order.
+        self.thresholds = []
+        self.timedRules = []
+        # Everything else, which has to be checked every time.
+        self.otherRules = []
+
+    def AddRule( self, ruleNum, conditions ):
+        for condition in conditions:
+            if condition[0] is TestPlayerIn:
+                self.roomRules.setdefault(condition[1][0], []).append(ruleNum)
+                return
+        for condition in conditions:
+            if condition[0] is TestTurnAtLeast:
+                position = bisect.bisect_right(self.thresholds, condition[1][0])
+                self.thresholds.insert(position, condition[1][0])
+                self.timedRules.insert(position, ruleNum)
+                return
+        self.otherRules.append(ruleNum)
+
+    def GetRules( self, roomID, gameTurn ):
+        '''
+        Returns the numbers of the rules that might apply, in rule order.
+        '''
+        ruleNums = self.roomRules.get(roomID, []) + \
+            self.timedRules[:bisect.bisect_right(self.thresholds, gameTurn)] + self.otherRules
+        ruleNums.sort()
+        return ruleNums
+
+class RuleBook:
+    '''
+    A world's rules, as made by CompileRules.
+
+    Each rule is kept as [conditions, effects], where every condition and
+    effect is [function, arguments] with objects already turned into objectIDs.
+    '''
+    __slots__ = ("rules", "useRules", "worldRules", "turnRules")
+
+    def __init__( self ):
+        self.rules = []
+        # objectID -> numbers of the "use" rules for that object
+        self.useRules = {}
+        self.worldRules = TurnRuleIndex()
+        self.turnRules = TurnRuleIndex()
+
+def CompileStep( step, kinds, roomCount, objectList, forSession, label ):
+    '''
+    Turns one condition or effect into [function, arguments].
+    Raises ValueError if it doesn't make sense.
+    '''
+    if not isinstance(step, (list, tuple)) or len(step) == 0 or step[0] not in kinds:
+        raise ValueError("%s:  unknown condition or effect %r" % (label, step))
+    function, argumentKinds, needsSession = kinds[step[0]]
+    if needsSession and not forSession:
+        raise ValueError("%s:  %s only works in world and turn rules" % (label, step[0]))
+    if len(step) - 1 != len(argumentKinds):
+        raise ValueError("%s:  %s takes %d argument(s)" % (label, step[0], len(argumentKinds)))
+    arguments = []
+    for argumentNum in range(len(argumentKinds)):
+        argument = step[argumentNum + 1]
+        argumentKind = argumentKinds[argumentNum]
+        if argumentKind == "object":
+            objectID = -1
+            if isinstance(argument, str):
+                objectID = GetObjectID(argument,objectList)
+            if objectID < 0:
+                raise ValueError("%s:  there is no object called %r" % (label, argument))
+            argument = objectID
+        elif argumentKind == "text":
+            if not isinstance(argument, str):
+                raise ValueError("%s:  %s needs text" % (label, step[0]))
+        elif argumentKind == "outcome":
+            if argument not in gameOutcomes:
+                raise ValueError("%s:  %r isn't one of %s" % (label, argument, ", ".join(gameOutcomes)))
+        elif not isinstance(argument, int) or isinstance(argument, bool):
+            raise ValueError("%s:  %s needs a number" % (label, step[0]))
+        elif argumentKind == "room" and (argument < -1 or argument >= roomCount):
+            raise ValueError("%s:  there is no room %d" % (label, argument))
+        elif argumentKind == "direction" and (argument < 0 or argument > 3):
+            raise ValueError("%s:  directions are 0 to 3 (N, E, S, W)" % label)
+        arguments.append(argument)
+    return [function, tuple(arguments)]
+
+def CompileRules( ruleList, roomCount, objectList ):
+    '''
+    Returns a RuleBook for the given rules, in a world with the given number
+    of rooms and the given objects.
+    Raises ValueError if a rule doesn't make sense in that world.
+    '''
+    ruleBook = RuleBook()
+    for ruleNum in range(len(ruleList)):
+        rule = ruleList[ruleNum]
+        label = "rule %d" % ruleNum
+        if not isinstance(rule, dict) or rule.get("when") not in ruleTimes:
+            raise ValueError("%s:  \"when\" must be one of %s" % (label, ", ".join(ruleTimes)))
+        when = rule["when"]
+        forSession = when != "use"
+        conditions = [CompileStep(step, conditionKinds, roomCount, objectList, forSession, label)
+                      for step in rule.get("if", [])]
+        effects = [CompileStep(step, effectKinds, roomCount, objectList, forSession, label)
+                   for step in rule.get("then", [])]
+        ruleBook.rules.append([conditions, effects])
+        if when == "use":
+            objectID = -1
+            if isinstance(rule.get("object"), str):
+                objectID = GetObjectID(rule["object"],objectList)
+            if objectID < 0:
+                raise ValueError("%s:  there is no object called %r" % (label, rule.get("object")))
+            ruleBook.useRules.setdefault(objectID, []).append(ruleNum)
+        elif when == "world":
+            ruleBook.worldRules.AddRule(ruleNum, conditions)
+        else:
+            ruleBook.turnRules.AddRule(ruleNum, conditions)
+    return ruleBook
+
+def GetActiveRules():
+    '''
+    Returns the rules in effect right now.
+    '''
+    if activeRules is None:
+        return GetGameRules()
+    return activeRules
+
+@contextlib.contextmanager
+def RulesFrom( ruleBook ):
+    '''
+    Puts the given RuleBook in effect inside the "with" block.
+    '''
+    global activeRules
+    previousRules = activeRules
+    activeRules = ruleBook
+    try:
+        yield ruleBook
+    finally:
+        activeRules = previousRules
+
+def RuleApplies( rule, roomList, objectList, playerInventory, roomID, session ):
+    for test, arguments in rule[0]:
+        if not test(arguments, roomList, objectList, playerInventory, roomID, session):
+            return False
+    return True
+
+def CarryOutRule( rule, roomList, objectList, playerInventory, roomID, session ):
+    for effect, arguments in rule[1]:
+        effect(arguments, roomList, objectList, playerInventory, roomID, session)
+
+def HasUseRules( objectID ):
+    '''
+    Returns True if the rules in effect say anything about using the object.
+    '''
+    return objectID in GetActiveRules().useRules
+
+def RunUseRules( objectID, roomList, objectList, playerInventory, roomID ):
+    '''
+    Carries out the first "use" rule for the object whose conditions hold.
+    Returns False if there wasn't one.
+    '''
+    ruleBook = GetActiveRules()
+    for ruleNum in ruleBook.useRules.get(objectID, []):
+        rule = ruleBook.rules[ruleNum]
+        if RuleApplies(rule, roomList, objectList, playerInventory, roomID, None):
+            CarryOutRule(rule, roomList, objectList, playerInventory, roomID, None)
+            return True
+    return False
+
+def RunTurnRules( ruleIndex, session ):
+    '''
+    Carries out every rule from a TurnRuleIndex whose conditions hold, stopping
+    if one of them ends the game.
+    '''
+    rules = session.rules.rules
+    for ruleNum in ruleIndex.GetRules(session.playerRoom, session.gameTurn):
+        if session.finished:
+            return
+        rule = rules[ruleNum]
+        if RuleApplies(rule, session.roomList, session.objectList, session.playerInventory, session.playerRoom, session):
+            CarryOutRule(rule, session.roomList, session.objectList, session.playerInventory, session.playerRoom, session)
+
+
+##### Creatures
+
+def MoveCreature( creatureID, session ):
+    '''
+    Moves a creature to a random neighbouring room, or after the player if it is hostile.
+    This is what the "wander" rule effect does.
+    '''
+    roomList = session.roomList
+    objectList = session.objectList
+    creatureLocation = GetObjectLocation(creatureID,objectList)
+    # Skip trying to move the creature if it's already gone.
+    if creatureLocation > -1:
+        creatureMoveTo = -1
+        if (GetObjectStatus(creatureID,objectList) > 0):
+            # Hostile creature.  Will hunt nearby player if able.
+            if (creatureLocation == session.playerRoom):
+                session.encounter = True
+                creatureMoveTo = creatureLocation
+            else:
+                session.encounter = False
+                creatureExits = GetRoomExits(creatureLocation,roomList)
+                for path in creatureExits:
+                    if path == session.playerRoom:
+                        creatureMoveTo = path
+        moveChoices = [creatureLocation] + list(GetRoomExits(creatureLocation,roomList))
+        while creatureMoveTo == -1:
+            # If the creature doesn't already have somewhere to go, select at random.
+            creatureMoveTo = session.rng.choice(moveChoices)
+        SetObjectLocation(creatureID,creatureMoveTo,objectList)
+    # End creature movement segment
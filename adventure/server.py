@@ -0,0 +1,236 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+A headless game server.  Every connection gets its own game.
+
+The protocol is plain lines of text:  the client sends one command per line,
+and the server answers with everything the console game would have printed,
+ending with the usual prompt.  The connection is closed when the game ends.
+A line can hold several commands separated by semicolons, which saves a
+round trip for each:  they are all carried out before the answer goes back.
+
+All sessions share one frozen copy of the world.  Each session only keeps
+the things it has changed (see adventure/overlay.py).
+
+Run from the repository root:
+    python -m adventure.server [--names] [host] [port] [world file] [metrics port] [journal file]
+
+With --names, every game gets forgiving object names (see adventure/names.py):
+"take oni" takes the Onion, and near misses get a "Did you mean".  Games
+recovered from a journal have to be played with the same setting they
+were started with.
+
+Given a metrics port, the server also collects metrics on every game (see
+adventure/instrument.py) and answers Prometheus scrapes on that port ("-"
+for none).
+
+Given a journal file, every game is journaled as it goes (see
+adventure/journal.py), and games that were still going when the server
+stopped are brought back when it starts again.  Each game is told its
+number and a secret resume token, and a player who gets cut off can carry
+on by sending "resume <number> <token>" as the first line of their next
+connection.  Games that aren't resumed within detachedTimeout are ended.
+If the journal can't be written, the games waiting on it are cut off (and
+can be resumed later).
+'''
+
+import asyncio
+import random
+import re
+import sys
+import time
+
+from adventure.output import OutputTo
+from adventure.commands import CommandLook
+from adventure.game import GameSession, StartGame, RunCommandLine, promptString, promptPadding
+from adventure.instrument import Instrumented, Metrics, StartMetricsServer
+from adventure.names import NewNameResolver
+from adventure.journal import RecoverSessions, StartJournal, NewResumeToken, defaultSnapshotEvery
+from adventure.overlay import FreezeWorld, NewSessionWorld
+from adventure.world import LoadGameWorld
+
+
+defaultHost = "127.0.0.1"
+defaultPort = 4000
+
+resumeCommand = re.compile(r"^\s*resume\s+(\d+)(?:\s+(\S+))?\s*$", re.IGNORECASE)
+
+# Seconds a journaled game waits for its player to resume it before it is ended.
+detachedTimeout = 24 * 60 * 60.0
+
+# Said for a resume that doesn't work.  It's the same whether or not there
+# is such a game, so nobody can find out which games there are.
+resumeFailedMessage = "That game can't be resumed.\n"
+
+# Said when the journal can't be written, with the game number and token
+# (which the player won't have been sent yet if it happens at the start).
+journalFailedMessage = "\nSorry, the server can't save your game right now.  Send \"resume %d %s\" " \
+                       "to carry on with it later.\n"
+
+
+def NewSession( roomList, objectList, rules, forgivingNames ):
+    '''
+    Returns a new GameSession playing in its own view of the shared (frozen)
+    world, with forgiving object names if asked.
+    '''
+    sessionWorld = NewSessionWorld(roomList, objectList)
+    session = GameSession(sessionWorld[0], sessionWorld[1], rules, random.Random())
+    if forgivingNames:
+        session.names = NewNameResolver()
+    return session
+
+async def JournalIsDurable( journal, recordNumber ):
+    '''
+    Waits for a journal record to be on disk.  Returns False if the journal
+    couldn't be written.
+    '''
+    try:
+        await journal.WaitUntilDurable(recordNumber)
+    except OSError:
+        return False
+    return True
+
+async def HandleConnection( reader, writer, roomList, objectList, rules, journal, forgivingNames ):
+    '''
+    Plays one game over one connection, journaling it if journal (a Journal
+    from adventure/journal.py) isn't None.
+    '''
+    def SendText( text ):
+        writer.write(text.encode())
+
+    # Each turn's output, prompt included, goes out as one write.
+    session = NewSession(roomList, objectList, rules, forgivingNames)
+    session.output.sink = SendText
+    running = StartGame(session)
+    sessionID = 0
+    firstLine = True
+    journalWorks = True
+    try:
+        if journal is not None:
+            journal.ExpireDetached(time.monotonic(), detachedTimeout)
+            sessionID = journal.NewSessionID()
+            token = NewResumeToken()
+            session.output.Write("\n(This is game %d.  If you get cut off, send \"resume %d %s\" first "
+                                 "thing when you connect again.)\n" % (sessionID, sessionID, token))
+            journal.RecordSnapshot(sessionID, session)
+            journalWorks = await JournalIsDurable(journal, journal.RecordToken(sessionID, token))
+        while journalWorks:
+            if not running:
+                session.output.Flush()
+                await writer.drain()
+                break
+            session.output.Write(promptPadding + promptString)
+            session.output.Flush()
+            await writer.drain()
+            line = await reader.readline()
+            if not line:
+                # The player hung up.
+                break
+            action = line.decode("utf-8", "replace").rstrip("\r\n")
+            if journal is None:
+                running = RunCommandLine(session, action)
+                continue
+
+            resume = resumeCommand.match(action)
+            if firstLine and resume is not None:
+                firstLine = False
+                resumed = journal.Resume(int(resume.group(1)), resume.group(2) or "")
+                if resumed is None:
+                    session.output.Write(resumeFailedMessage)
+                    continue
+                # Swap the new game for the one being resumed.
+                journal.RecordEnd(sessionID)
+                sessionID = int(resume.group(1))
+                session = resumed
+                session.output.sink = SendText
+                with OutputTo(session.output):
+                    session.output.Write("Welcome back.\n")
+                    CommandLook(session.playerRoom, session.roomList, session.objectList)
+                continue
+            firstLine = False
+            running = RunCommandLine(session, action)
+            recordNumber = journal.RecordCommand(sessionID, session, action)
+            if not running:
+                recordNumber = journal.RecordEnd(sessionID)
+            # The turn's output only goes out once the turn is safely on disk.
+            journalWorks = await JournalIsDurable(journal, recordNumber)
+        if not journalWorks:
+            # Its records are still waiting to be written, so the game can be
+            # resumed once the journal works again.
+            session.output.Take()
+            writer.write((journalFailedMessage % (sessionID, journal.tokens.get(sessionID, ""))).encode())
+    except (OSError, ValueError):
+        # The player hung up, or the connection broke.  ValueError is what
+        # readline gives us for absurdly long lines.
+        pass
+    finally:
+        writer.close()
+        if journal is not None and not session.finished:
+            # Keep the game around for the player to resume.
+            session.output.Take()
+            journal.Detach(sessionID, session, time.monotonic())
+
+async def StartServer( host, port, roomList, objectList, rules, journal, forgivingNames ):
+    '''
+    Starts listening for players.  Returns the asyncio server.
+    The room and object lists should come from FreezeWorld.
+    journal is a Journal to keep every game in, or None.
+    '''
+    async def OnConnect( reader, writer ):
+        await HandleConnection(reader, writer, roomList, objectList, rules, journal, forgivingNames)
+    return await asyncio.start_server(OnConnect, host, port)
+
+async def Serve( host, port, worldFile, metricsPort, journalFile, forgivingNames ):
+    world = LoadGameWorld(worldFile)
+    sharedWorld = FreezeWorld(world[0], world[1])
+    journal = None
+    if journalFile is not None:
+        sessions, tokens, problems = RecoverSessions(journalFile, sharedWorld[0], sharedWorld[1], world[2],
+                                                     forgivingNames)
+        for problem in problems:
+            print("Journal:  %s" % problem)
+        journal = StartJournal(journalFile, sessions, tokens, defaultSnapshotEvery, time.monotonic())
+        print("Recovered %d games from %s" % (len(sessions), journalFile))
+    server = await StartServer(host, port, sharedWorld[0], sharedWorld[1], world[2], journal, forgivingNames)
+    print("Listening on %s:%d" % (host, port))
+    if metricsPort is None:
+        async with server:
+            await server.serve_forever()
+        return
+    metrics = Metrics()
+    metricsServer = await StartMetricsServer(host, metricsPort, metrics)
+    print("Metrics on %s:%d" % (host, metricsPort))
+    with Instrumented(metrics):
+        async with server, metricsServer:
+            await server.serve_forever()
+
+def Main( arguments ):
+    host = defaultHost
+    port = defaultPort
+    worldFile = None
+    metricsPort = None
+    journalFile = None
+    forgivingNames = "--names" in arguments
+    arguments = [argument for argument in arguments if argument != "--names"]
+    if len(arguments) > 0:
+        host = arguments[0]
+    if len(arguments) > 1:
+        port = int(arguments[1])
+    if len(arguments) > 2:
+        worldFile = arguments[2]
+    if len(arguments) > 3 and arguments[3] != "-":
+        metricsPort = int(arguments[3])
+    if len(arguments) > 4:
+        journalFile = arguments[4]
+    try:
+        asyncio.run(Serve(host, port, worldFile, metricsPort, journalFile, forgivingNames))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    Main(sys.argv[1:])
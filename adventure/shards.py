@@ -0,0 +1,479 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+A game server spread over several processes, to use more than one core.
+
+One Python process only ever runs one thread of Python at a time, so the
+plain server (adventure/server.py) can't play more games at once by having
+more cores.  Here a front end takes the connections and hands the games out
+to a number of shard processes:
+
+  - every game gets a session number, and JumpHash picks its shard from
+    that, the same shard every time;
+  - each shard loads the world once, freezes it (see adventure/overlay.py),
+    and plays every game it is given in its own view of it, just as the
+    plain server does;
+  - the front end and each shard talk over a pair of connected local
+    sockets, in frames:  a header (payload length, message kind, session
+    number) and then the payload;
+  - a game can move to another shard between commands:  the shard it is on
+    gives it up as a snapshot (see adventure/snapshot.py) and the new shard
+    carries on from that.  Resize uses this to change the number of shards
+    while games are going, and JumpHash only moves the games it must (about
+    one in N+1 when going from N shards to N+1).
+
+Players see exactly what the plain server would have sent them, and
+--names turns on forgiving object names just as it does there.
+
+Something going wrong with one game (a snapshot that won't load, say) only
+ends that game:  its player is told, and the shard carries on with the
+rest.  If a shard process dies, the games it was playing are lost, so their
+players are told and their connections closed, and a new shard takes its
+place for new games.
+
+Run from the repository root:
+    python -m adventure.shards [--names] [host] [port] [world file] [shards]
+    python benchmarks/shard_scaling.py
+'''
+
+import asyncio
+import multiprocessing
+import os
+import socket
+import struct
+import sys
+
+from adventure.game import StartGame, RunCommandLine, promptString, promptPadding
+from adventure.overlay import FreezeWorld
+from adventure.snapshot import SaveSnapshot, LoadSnapshot
+from adventure.world import LoadGameWorld
+from adventure.names import NewNameResolver
+from adventure.server import NewSession, defaultHost, defaultPort
+
+
+# Frames are a header and then the payload.
+frameFormat = struct.Struct("<IBQ")
+
+# Message kinds, front end to shard.
+openMessage = 1       # start a new game
+lineMessage = 2       # payload is a line typed by the player
+closeMessage = 3      # the player hung up;  forget the game
+releaseMessage = 4    # give the game up, answering with its snapshot
+adoptMessage = 5      # payload is a snapshot of a game to carry on with
+# Shard to front end.
+outputMessage = 6     # payload is what to send the player;  the game goes on
+endedMessage = 7      # payload is what to send the player;  the game is over
+stateMessage = 8      # payload is the snapshot asked for by releaseMessage
+
+# What a player is told when their game can't go on.
+gameErrorMessage = "\nSorry, something went wrong with this game, and it can't go on.  (%s)\n"
+shardLostMessage = "\nSorry, the server playing this game has stopped, and the game is lost.\n"
+
+
+def JumpHash( key, bucketCount ):
+    '''
+    Returns which of bucketCount buckets a (non-negative) key goes in, by
+    Lamping and Veach's jump consistent hash.  Going from N buckets to N+1
+    only moves the keys that land in the new one.
+    '''
+    bucket = -1
+    jump = 0
+    while jump < bucketCount:
+        bucket = jump
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        jump = int((bucket + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return bucket
+
+
+##### Shard side
+
+def ReceiveExactly( connection, size ):
+    '''
+    Reads exactly size bytes from a socket.  Returns None at the end of the stream.
+    '''
+    chunks = []
+    while size > 0:
+        chunk = connection.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+def ReceiveFrame( connection ):
+    '''
+    Reads one frame from a socket.  Returns [kind, sessionID, payload], or None
+    once the other end has closed it.
+    '''
+    header = ReceiveExactly(connection, frameFormat.size)
+    if header is None:
+        return None
+    length, kind, sessionID = frameFormat.unpack(header)
+    payload = b""
+    if length > 0:
+        payload = ReceiveExactly(connection, length)
+        if payload is None:
+            return None
+    return [kind, sessionID, payload]
+
+def SendFrame( connection, kind, sessionID, payload ):
+    connection.sendall(frameFormat.pack(len(payload), kind, sessionID) + payload)
+
+def TurnOutput( session, running ):
+    '''
+    Returns the frame kind and payload for everything a turn said, with the
+    prompt on the end if the game goes on, as the plain server would send it.
+    '''
+    if not running:
+        return [endedMessage, session.output.Take().encode()]
+    session.output.Write(promptPadding + promptString)
+    return [outputMessage, session.output.Take().encode()]
+
+def CarryOutMessage( kind, sessionID, payload, sessions, sharedWorld, rules, forgivingNames ):
+    '''
+    Does what one message from the front end asks.  Returns [kind, payload]
+    to answer with, or None for messages that don't get an answer.
+    '''
+    if kind == openMessage:
+        session = NewSession(sharedWorld[0], sharedWorld[1], rules, forgivingNames)
+        session.output.sink = None
+        sessions[sessionID] = session
+        return TurnOutput(session, StartGame(session))
+    if kind == closeMessage:
+        sessions.pop(sessionID, None)
+        return None
+    if kind == adoptMessage:
+        session = LoadSnapshot(payload, sharedWorld[0], sharedWorld[1], rules)
+        session.output.sink = None
+        if forgivingNames:
+            # Snapshots don't hold the resolver, only the game.
+            session.names = NewNameResolver()
+        sessions[sessionID] = session
+        return None
+    if kind != lineMessage and kind != releaseMessage:
+        raise ValueError("unknown message kind %d" % kind)
+    if sessionID not in sessions:
+        # The player's line (or a move) crossed with the game ending here.
+        raise ValueError("game %d isn't being played here" % sessionID)
+    if kind == releaseMessage:
+        return [stateMessage, SaveSnapshot(sessions.pop(sessionID))]
+    session = sessions[sessionID]
+    return TurnOutput(session, RunCommandLine(session, payload.decode("utf-8", "replace")))
+
+def RunShard( connection, worldFile, forgivingNames ):
+    '''
+    Plays the games the front end hands this shard, until it closes the connection.
+    '''
+    world = LoadGameWorld(worldFile)
+    sharedWorld = FreezeWorld(world[0], world[1])
+    rules = world[2]
+    # sessionID -> GameSession
+    sessions = {}
+    while True:
+        frame = ReceiveFrame(connection)
+        if frame is None:
+            break
+        kind, sessionID, payload = frame
+        try:
+            reply = CarryOutMessage(kind, sessionID, payload, sessions, sharedWorld, rules, forgivingNames)
+        except Exception as error:
+            # Only this game has to end.  Every other game on the shard goes on.
+            sessions.pop(sessionID, None)
+            reply = [endedMessage, (gameErrorMessage % error).encode()]
+        if reply is None:
+            continue
+        if reply[0] == endedMessage:
+            sessions.pop(sessionID, None)
+        SendFrame(connection, reply[0], sessionID, reply[1])
+    connection.close()
+
+
+##### Front end
+
+class Shard:
+    '''
+    The front end's end of one shard process.
+    '''
+    __slots__ = ("process", "reader", "writer", "listener", "answered", "stopping", "dead")
+
+    def __init__( self, process, reader, writer ):
+        self.process = process
+        self.reader = reader
+        self.writer = writer
+        # The task passing the shard's answers on (see ShardedServer.Listen).
+        self.listener = None
+        # Whether it has answered anything yet, whether the front end is
+        # stopping it, and whether its connection has gone.
+        self.answered = False
+        self.stopping = False
+        self.dead = False
+
+
+class ShardedServer:
+    '''
+    Takes connections and passes each game's commands to the shard it is on.
+    '''
+    __slots__ = ("worldFile", "forgivingNames", "shards", "shardCount", "placement", "locks", "waiting", "lost",
+                 "nextSessionID")
+
+    def __init__( self, worldFile, forgivingNames ):
+        self.worldFile = worldFile
+        self.forgivingNames = forgivingNames
+        self.shards = []
+        # How many shards new games are spread over.  Only differs from
+        # len(shards) while Resize is moving games off shards about to go.
+        self.shardCount = 0
+        # sessionID -> index in shards of the shard playing it
+        self.placement = {}
+        # sessionID -> lock held while a command (or a move) is under way
+        self.locks = {}
+        # sessionID -> future for the shard's answer to the last request
+        self.waiting = {}
+        # sessionIDs of games that were on a shard when it died
+        self.lost = set()
+        self.nextSessionID = 1
+
+    async def NewShard( self ):
+        '''
+        Starts a shard process.  Returns its Shard.
+        '''
+        frontSocket, shardSocket = socket.socketpair()
+        # Spawned rather than forked, so a shard doesn't hold on to copies of
+        # the front end's sockets (which would stop other shards ever seeing
+        # the end of their connections) or of anything else it had open.
+        context = multiprocessing.get_context("spawn")
+        process = context.Process(target=RunShard, args=(shardSocket, self.worldFile, self.forgivingNames),
+                                  daemon=True)
+        process.start()
+        shardSocket.close()
+        reader, writer = await asyncio.open_connection(sock=frontSocket)
+        shard = Shard(process, reader, writer)
+        shard.listener = asyncio.ensure_future(self.Listen(shard))
+        return shard
+
+    async def StartShard( self ):
+        '''
+        Starts one more shard process.
+        '''
+        self.shards.append(await self.NewShard())
+
+    async def StopShard( self ):
+        '''
+        Stops the last shard, which must have no games left.
+        '''
+        await self.EndShard(self.shards.pop())
+
+    async def EndShard( self, shard ):
+        shard.stopping = True
+        shard.writer.close()
+        await shard.listener
+        await asyncio.get_running_loop().run_in_executor(None, shard.process.join)
+
+    async def Listen( self, shard ):
+        '''
+        Hands each answer from a shard to whoever is waiting for it.
+        '''
+        while True:
+            try:
+                header = await shard.reader.readexactly(frameFormat.size)
+                length, kind, sessionID = frameFormat.unpack(header)
+                payload = await shard.reader.readexactly(length)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            shard.answered = True
+            future = self.waiting.pop(sessionID, None)
+            if future is not None and not future.done():
+                future.set_result([kind, payload])
+        # A shard that goes away leaves its players waiting, so let them go.
+        # Anything sent to it from now on fails straight away (see Request).
+        shard.dead = True
+        shardNum = -1
+        if shard in self.shards:
+            shardNum = self.shards.index(shard)
+        for sessionID, placed in list(self.placement.items()):
+            if placed == shardNum:
+                self.lost.add(sessionID)
+                future = self.waiting.pop(sessionID, None)
+                if future is not None and not future.done():
+                    future.set_exception(ConnectionError("shard %d stopped" % placed))
+        if shardNum > -1 and not shard.stopping and shard.answered:
+            # It died on its own.  Its games are gone with it, but a new
+            # shard can take its place for new games.  (One that never
+            # answered anything probably can't load the world, and a new
+            # one would only do the same.)
+            newShard = await self.NewShard()
+            if shard.stopping or shard not in self.shards:
+                # Resize got rid of it while the new one was starting.
+                await self.EndShard(newShard)
+            else:
+                self.shards[self.shards.index(shard)] = newShard
+
+    def Send( self, sessionID, kind, payload ):
+        '''
+        Sends a message about a game to its shard, if the shard is still there.
+        '''
+        shard = self.shards[self.placement[sessionID]]
+        if not shard.dead:
+            shard.writer.write(frameFormat.pack(len(payload), kind, sessionID) + payload)
+
+    async def Request( self, sessionID, kind, payload ):
+        '''
+        Sends a message about a game to its shard.  Returns [kind, payload] of
+        the answer.  Raises ConnectionError if the shard has stopped.
+        '''
+        shard = self.shards[self.placement[sessionID]]
+        if shard.dead:
+            raise ConnectionError("shard %d stopped" % self.placement[sessionID])
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[sessionID] = future
+        try:
+            self.Send(sessionID, kind, payload)
+            await shard.writer.drain()
+            return await future
+        finally:
+            if self.waiting.get(sessionID) is future:
+                del self.waiting[sessionID]
+
+    async def Play( self, sessionID, kind, payload ):
+        '''
+        Requests a turn of a game.  Returns [kind, payload] to send the
+        player, which ends the game if its shard has stopped.
+        '''
+        if sessionID in self.lost:
+            return [endedMessage, shardLostMessage.encode()]
+        try:
+            return await self.Request(sessionID, kind, payload)
+        except ConnectionError:
+            return [endedMessage, shardLostMessage.encode()]
+
+    async def HandleConnection( self, reader, writer ):
+        '''
+        Plays one game over one connection, on whichever shard it's placed on.
+        '''
+        sessionID = self.nextSessionID
+        self.nextSessionID += 1
+        self.placement[sessionID] = JumpHash(sessionID, self.shardCount)
+        lock = asyncio.Lock()
+        self.locks[sessionID] = lock
+        kind = outputMessage
+        try:
+            async with lock:
+                kind, payload = await self.Play(sessionID, openMessage, b"")
+            while True:
+                writer.write(payload)
+                await writer.drain()
+                if kind == endedMessage:
+                    break
+                line = await reader.readline()
+                if not line:
+                    # The player hung up.
+                    break
+                async with lock:
+                    kind, payload = await self.Play(sessionID, lineMessage, line.rstrip(b"\r\n"))
+        except (ConnectionError, ValueError):
+            # ValueError is what readline gives us for absurdly long lines.
+            pass
+        finally:
+            writer.close()
+            async with lock:
+                if kind != endedMessage and self.placement[sessionID] < len(self.shards):
+                    self.Send(sessionID, closeMessage, b"")
+                del self.placement[sessionID]
+                del self.locks[sessionID]
+                self.lost.discard(sessionID)
+
+    async def MoveSession( self, sessionID, toShard ):
+        '''
+        Moves a game to another shard, between two of its commands.
+        '''
+        lock = self.locks.get(sessionID)
+        if lock is None:
+            return
+        async with lock:
+            if sessionID not in self.placement or self.placement[sessionID] == toShard:
+                return
+            if sessionID in self.lost:
+                # Nothing left to move.
+                self.placement[sessionID] = toShard
+                return
+            try:
+                kind, snapshot = await self.Request(sessionID, releaseMessage, b"")
+            except ConnectionError:
+                kind = endedMessage
+            self.placement[sessionID] = toShard
+            if kind == stateMessage:
+                self.Send(sessionID, adoptMessage, snapshot)
+            # Otherwise the game is lost, and the new shard will say so
+            # when the player next sends a line.
+
+    async def Resize( self, shardCount ):
+        '''
+        Changes the number of shards, moving every game whose shard changes.
+        Returns how many games moved.
+        '''
+        if shardCount < 1:
+            raise ValueError("there must be at least one shard")
+        while len(self.shards) < shardCount:
+            await self.StartShard()
+        self.shardCount = shardCount
+        moves = []
+        for sessionID, placed in list(self.placement.items()):
+            toShard = JumpHash(sessionID, shardCount)
+            if toShard != placed:
+                moves.append(self.MoveSession(sessionID, toShard))
+        await asyncio.gather(*moves)
+        while len(self.shards) > shardCount:
+            await self.StopShard()
+        return len(moves)
+
+    async def Close( self ):
+        while len(self.shards) > 0:
+            await self.StopShard()
+
+
+async def StartShardedServer( host, port, worldFile, shardCount, forgivingNames ):
+    '''
+    Starts the shards and starts listening for players.
+    Returns [ShardedServer, asyncio server].
+    '''
+    shardedServer = ShardedServer(worldFile, forgivingNames)
+    await shardedServer.Resize(shardCount)
+    server = await asyncio.start_server(shardedServer.HandleConnection, host, port)
+    return [shardedServer, server]
+
+async def Serve( host, port, worldFile, shardCount, forgivingNames ):
+    shardedServer, server = await StartShardedServer(host, port, worldFile, shardCount, forgivingNames)
+    print("Listening on %s:%d with %d shards" % (host, port, shardCount))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await shardedServer.Close()
+
+def Main( arguments ):
+    host = defaultHost
+    port = defaultPort
+    worldFile = None
+    shardCount = os.cpu_count() or 1
+    forgivingNames = "--names" in arguments
+    arguments = [argument for argument in arguments if argument != "--names"]
+    if len(arguments) > 0:
+        host = arguments[0]
+    if len(arguments) > 1:
+        port = int(arguments[1])
+    if len(arguments) > 2:
+        worldFile = arguments[2]
+    if len(arguments) > 3:
+        shardCount = int(arguments[3])
+    try:
+        asyncio.run(Serve(host, port, worldFile, shardCount, forgivingNames))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    Main(sys.argv[1:])
@@ -0,0 +1,239 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Saving and loading games as compact binary snapshots.
+
+A snapshot holds only what can change during a game:  the player's room,
+inventory and turn count, the creature encounter flag, the state of the
+session's random number generator, and whatever the session has changed in
+its view of the shared world (see adventure/overlay.py).  The world itself is
+never saved, so a snapshot is small and quick to make no matter how big the
+world is, and can be run every turn.
+
+Layout (all little-endian):
+
+    header      4s H H        magic "PADV", format version, reserved (0)
+    session     i i B B B B   playerRoom, gameTurn, encounter, newLook,
+                              finished, outcome (0 while playing, else 1 +
+                              its index in adventure.rules.gameOutcomes)
+    rng         i I           generator version, state length N
+                N * I         generator state
+                B d           has gauss_next, gauss_next
+    inventory   I, n * i      count, objectIDs in inventory order
+    locations   I, n * i, n * i   count, objectIDs, new locations
+    statuses    I, n * i, n * i   count, objectIDs, new statuses
+    usable      I, n * i, n * B   count, objectIDs, new usable flags
+    exits       I, n * i, 4n * i  count, roomIDs, new [N, E, S, W] exits
+    extras      I, n bytes    length, UTF-8 JSON of name and alias changes
+                              (empty when there are none, which is usual)
+'''
+
+import json
+import random
+import struct
+import sys
+from array import array
+
+from adventure.rules import gameOutcomes
+from adventure.game import GameSession
+from adventure.overlay import NewSessionWorld
+
+
+snapshotMagic = b"PADV"
+snapshotVersion = 3
+
+headerFormat = struct.Struct("<4sHH")
+sessionFormat = struct.Struct("<iiBBBB")
+rngHeaderFormat = struct.Struct("<iI")
+gaussFormat = struct.Struct("<Bd")
+countFormat = struct.Struct("<I")
+
+# Delta fields that are rare enough to store as JSON instead of packed arrays.
+extraFields = ("names", "aliases", "nameKeys")
+
+
+def PackArray( typecode, values ):
+    '''
+    Returns the given values packed as little-endian bytes.
+    '''
+    packed = array(typecode, values)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    return packed.tobytes()
+
+def UnpackArray( typecode, data, offset, count ):
+    '''
+    Reads count values of the given type starting at offset.
+    Returns [array, new offset].
+    '''
+    unpacked = array(typecode)
+    end = offset + count * unpacked.itemsize
+    if end > len(data):
+        raise ValueError("snapshot is truncated")
+    unpacked.frombytes(data[offset:end])
+    if sys.byteorder != "little":
+        unpacked.byteswap()
+    return [unpacked, end]
+
+def PackChanges( changes, valueTypecode ):
+    '''
+    Packs one objectID -> value change dictionary (or None) as count, IDs, values.
+    '''
+    if changes is None or len(changes) == 0:
+        return countFormat.pack(0)
+    return countFormat.pack(len(changes)) + PackArray("i", changes.keys()) + \
+        PackArray(valueTypecode, changes.values())
+
+def UnpackChanges( data, offset, valueTypecode ):
+    '''
+    Reads one change dictionary written by PackChanges.
+    Returns [dictionary or None, new offset].
+    '''
+    count = countFormat.unpack_from(data, offset)[0]
+    offset += countFormat.size
+    if count == 0:
+        return [None, offset]
+    keys, offset = UnpackArray("i", data, offset, count)
+    values, offset = UnpackArray(valueTypecode, data, offset, count)
+    return [dict(zip(keys, values)), offset]
+
+def SaveSnapshot( session ):
+    '''
+    Returns a binary snapshot of the given GameSession.
+    The session must be playing in a view made by NewSessionWorld.
+    '''
+    roomList = session.roomList
+    objectList = session.objectList
+    if not hasattr(roomList, "ExportDelta") or not hasattr(objectList, "ExportDelta"):
+        raise TypeError("snapshots need a session view of a shared world (see adventure/overlay.py)")
+    outcomeCode = 0
+    if session.outcome != "":
+        outcomeCode = gameOutcomes.index(session.outcome) + 1
+    parts = [
+        headerFormat.pack(snapshotMagic, snapshotVersion, 0),
+        sessionFormat.pack(session.playerRoom, session.gameTurn, bool(session.encounter),
+                           bool(session.newLook), bool(session.finished), outcomeCode)]
+
+    # Random number generator.
+    rngVersion, rngState, gaussNext = session.rng.getstate()
+    parts.append(rngHeaderFormat.pack(rngVersion, len(rngState)))
+    parts.append(PackArray("I", rngState))
+    if gaussNext is None:
+        parts.append(gaussFormat.pack(0, 0.0))
+    else:
+        parts.append(gaussFormat.pack(1, gaussNext))
+
+    parts.append(countFormat.pack(len(session.playerInventory)))
+    parts.append(PackArray("i", session.playerInventory))
+
+    # What the session changed in the world.
+    parts.append(PackChanges(objectList.locations, "i"))
+    parts.append(PackChanges(objectList.statuses, "i"))
+    parts.append(PackChanges(objectList.usable, "B"))
+    exits = roomList.exits
+    if exits is None or len(exits) == 0:
+        parts.append(countFormat.pack(0))
+    else:
+        parts.append(countFormat.pack(len(exits)))
+        parts.append(PackArray("i", exits.keys()))
+        parts.append(PackArray("i", [roomExit for localExits in exits.values() for roomExit in localExits]))
+
+    extras = {}
+    for field in extraFields:
+        changes = getattr(objectList, field)
+        if changes is not None:
+            extras[field] = changes
+    extraBytes = b""
+    if len(extras) > 0:
+        extraBytes = json.dumps(extras).encode("utf-8")
+    parts.append(countFormat.pack(len(extraBytes)))
+    parts.append(extraBytes)
+    return b"".join(parts)
+
+def LoadSnapshot( data, sharedRoomList, sharedObjectList, rules ):
+    '''
+    Returns a new GameSession, playing in a new view of the given shared world
+    by the given RuleBook, with everything restored from a snapshot made by
+    SaveSnapshot.
+    '''
+    if len(data) < headerFormat.size:
+        raise ValueError("snapshot is truncated")
+    magic, version, reserved = headerFormat.unpack_from(data, 0)
+    if magic != snapshotMagic:
+        raise ValueError("not a game snapshot")
+    if version != snapshotVersion:
+        raise ValueError("unsupported snapshot version %d" % version)
+    offset = headerFormat.size
+
+    try:
+        playerRoom, gameTurn, encounter, newLook, finished, outcomeCode = sessionFormat.unpack_from(data, offset)
+        offset += sessionFormat.size
+        if outcomeCode > len(gameOutcomes):
+            raise ValueError("unknown game outcome %d" % outcomeCode)
+
+        rngVersion, rngLength = rngHeaderFormat.unpack_from(data, offset)
+        offset += rngHeaderFormat.size
+        rngState, offset = UnpackArray("I", data, offset, rngLength)
+        hasGauss, gaussNext = gaussFormat.unpack_from(data, offset)
+        offset += gaussFormat.size
+
+        inventoryCount = countFormat.unpack_from(data, offset)[0]
+        offset += countFormat.size
+        playerInventory, offset = UnpackArray("i", data, offset, inventoryCount)
+
+        locations, offset = UnpackChanges(data, offset, "i")
+        statuses, offset = UnpackChanges(data, offset, "i")
+        usable, offset = UnpackChanges(data, offset, "B")
+
+        exitCount = countFormat.unpack_from(data, offset)[0]
+        offset += countFormat.size
+        exits = None
+        if exitCount > 0:
+            roomIDs, offset = UnpackArray("i", data, offset, exitCount)
+            allExits, offset = UnpackArray("i", data, offset, exitCount * 4)
+            exits = {}
+            for roomNum in range(exitCount):
+                exits[roomIDs[roomNum]] = allExits[roomNum * 4:roomNum * 4 + 4].tolist()
+
+        extraLength = countFormat.unpack_from(data, offset)[0]
+        offset += countFormat.size
+        if offset + extraLength > len(data):
+            raise ValueError("snapshot is truncated")
+        extraBytes = data[offset:offset + extraLength]
+    except struct.error:
+        raise ValueError("snapshot is truncated")
+
+    sessionWorld = NewSessionWorld(sharedRoomList, sharedObjectList)
+    roomList = sessionWorld[0]
+    objectList = sessionWorld[1]
+    if len(extraBytes) > 0:
+        objectList.LoadDelta(json.loads(extraBytes.decode("utf-8")))
+    roomList.exits = exits
+    objectList.locations = locations
+    objectList.statuses = statuses
+    if usable is not None:
+        objectList.usable = dict([(objectID, bool(value)) for objectID, value in usable.items()])
+    roomList.StampChangedRooms()
+    objectList.StampChangedRooms()
+
+    rng = random.Random()
+    if hasGauss:
+        rng.setstate((rngVersion, tuple(rngState), gaussNext))
+    else:
+        rng.setstate((rngVersion, tuple(rngState), None))
+
+    session = GameSession(roomList, objectList, rules, rng)
+    session.playerRoom = playerRoom
+    session.gameTurn = gameTurn
+    session.encounter = bool(encounter)
+    session.newLook = bool(newLook)
+    session.finished = bool(finished)
+    if outcomeCode > 0:
+        session.outcome = gameOutcomes[outcomeCode - 1]
+    session.playerInventory = playerInventory.tolist()
+    return session
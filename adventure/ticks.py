@@ -0,0 +1,272 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+World-wide ticks:  timed status changes and random moves for lots of objects at once.
+
+A TickPlan lists what happens to objects as turns go by:
+
+  - timers:  on a given turn, an object's status changes (the food goes
+    off, the candle burns down, the creature gets hungry);
+  - wanderers:  every turn, an object moves to a random neighbouring room
+    or stays put, with the same choices (and chances) as a wandering
+    creature (see GetMoveChoices in adventure/npc.py).
+
+A tick can be run two ways, with the same results:
+
+  - RunTick goes through the objects one at a time with the usual data
+    lookup functions, so it works on any storage.
+  - RunTickVectorized does the whole tick as NumPy array operations.  It
+    needs compact storage (adventure/compact.py), which already keeps every
+    object's location and status in typed arrays;  NumPy works on those
+    arrays where they are, without copying them.
+
+Given random number generators in the same state, both make the same
+changes, in the same order, right down to the order objects are listed in
+each room.  RunTick draws one random() per wanderer, in the order they were
+added, and RunTickVectorized draws them all at once with random(count),
+which for a numpy.random.Generator is the same numbers.
+
+NumPy is optional.  Without it, RunTickVectorized raises ValueError and
+everything else still works.
+
+A session runs a tick every turn if session.ticks is set to a TickPhase.
+A TickPhase asked to run vectorized on storage that can't be (a session
+view of a shared world, say, or anything without NumPy) runs RunTick instead.
+
+Run from the repository root:
+    python benchmarks/vector_ticks.py
+'''
+
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    # Only RunTickVectorized needs it.
+    numpy = None
+
+from adventure.data import GetRoomExits, GetObjectLocation, SetObjectLocation, SetObjectStatus
+from adventure.compact import CompactRoomList, CompactObjectList
+from adventure.npc import GetMoveChoices
+
+
+# When more than 1 in this many objects moved in a tick, RunTickVectorized
+# rebuilds every room's chain of objects at once rather than moving the
+# objects one at a time.
+bulkRelinkShare = 8
+
+
+class TickPlan:
+    '''
+    The timers and wanderers of a world.
+    '''
+    __slots__ = ("wanderers", "wandererSet", "timersByTurn", "timerTurns", "timerObjects",
+                 "timerStatuses", "arrays")
+
+    def __init__( self ):
+        self.wanderers = array("i")
+        self.wandererSet = set()
+        # turn -> [[objectID, newStatus], ...] in the order they were added
+        self.timersByTurn = {}
+        # Every timer again, as columns, for RunTickVectorized.
+        self.timerTurns = array("i")
+        self.timerObjects = array("i")
+        self.timerStatuses = array("i")
+        # NumPy copies of the above, made when a vectorized tick first needs them.
+        self.arrays = None
+
+    def AddWanderer( self, objectID ):
+        if objectID in self.wandererSet:
+            raise ValueError("object %d is already a wanderer" % objectID)
+        self.wandererSet.add(objectID)
+        self.wanderers.append(objectID)
+        self.arrays = None
+
+    def AddTimer( self, objectID, turn, newStatus ):
+        '''
+        Sets an object's status to newStatus on the given turn.  If an object
+        has more than one timer on the same turn, the one added last wins.
+        '''
+        self.timersByTurn.setdefault(turn, []).append([objectID, newStatus])
+        self.timerTurns.append(turn)
+        self.timerObjects.append(objectID)
+        self.timerStatuses.append(newStatus)
+        self.arrays = None
+
+    def GetArrays( self ):
+        '''
+        Returns [wanderers, timerTurns, timerObjects, timerStatuses] as NumPy
+        arrays, with the timers sorted by turn (and otherwise left in the
+        order they were added).
+        '''
+        if self.arrays is None:
+            timerTurns = numpy.array(self.timerTurns, dtype=numpy.int64)
+            order = numpy.argsort(timerTurns, kind="stable")
+            self.arrays = [numpy.array(self.wanderers, dtype=numpy.int64), timerTurns[order],
+                           numpy.array(self.timerObjects, dtype=numpy.int64)[order],
+                           numpy.array(self.timerStatuses, dtype=numpy.intc)[order]]
+        return self.arrays
+
+
+##### One object at a time
+
+def RunTick( plan, roomList, objectList, turn, rng ):
+    '''
+    Runs one turn's tick with the data lookup functions.  rng needs a
+    random() method:  a random.Random, or a numpy.random.Generator to get the
+    same results as RunTickVectorized.
+    '''
+    for objectID, newStatus in plan.timersByTurn.get(turn, []):
+        SetObjectStatus(objectID, newStatus, objectList)
+    for objectID in plan.wanderers:
+        # Every wanderer draws a number, even ones that aren't in a room to
+        # move from, so the draws line up with RunTickVectorized's.
+        draw = rng.random()
+        location = GetObjectLocation(objectID, objectList)
+        if location < 0:
+            continue
+        choices = GetMoveChoices(location, GetRoomExits(location, roomList))
+        moveTo = choices[int(draw * len(choices))]
+        if moveTo != location:
+            SetObjectLocation(objectID, moveTo, objectList)
+
+
+##### All at once
+
+def GetColumns( roomList, objectList ):
+    '''
+    Returns [exits, locations, statuses, nextInRoom, previousInRoom] as NumPy
+    arrays sharing memory with compact world storage.  exits has a row of
+    [N, E, S, W] per room.
+    '''
+    if numpy is None:
+        raise ValueError("vectorized ticks need NumPy")
+    if not isinstance(roomList, CompactRoomList) or not isinstance(objectList, CompactObjectList):
+        raise TypeError("vectorized ticks need compact storage (see BuildCompactWorld)")
+    # array("i") holds C ints, which NumPy calls intc.
+    return [numpy.frombuffer(roomList.exits, dtype=numpy.intc).reshape(-1, 4),
+            numpy.frombuffer(objectList.locations, dtype=numpy.intc),
+            numpy.frombuffer(objectList.statuses, dtype=numpy.intc),
+            numpy.frombuffer(objectList.nextInRoom, dtype=numpy.intc),
+            numpy.frombuffer(objectList.previousInRoom, dtype=numpy.intc)]
+
+def CanRunVectorized( roomList, objectList ):
+    '''
+    Returns True if RunTickVectorized can run on the given world storage.
+    '''
+    return numpy is not None and isinstance(roomList, CompactRoomList) and \
+        isinstance(objectList, CompactObjectList)
+
+def RelinkAll( objectList, columns, movers, toRooms ):
+    '''
+    Moves objects by rebuilding every location's chain of objects at once,
+    in exactly the order moving them one at a time with SetObjectLocation
+    would leave them:  everything that moved in, latest first, then
+    everything that was already there, in the order it was.
+    '''
+    exits, locations, statuses, nextInRoom, previousInRoom = columns
+    objectCount = len(locations)
+
+    # How many objects are behind each one in its old chain, by pointer
+    # jumping:  every pass, each object adds on the count of the object it
+    # points to, and then points twice as far along.
+    following = nextInRoom.astype(numpy.int64)
+    behind = (following >= 0).astype(numpy.int64)
+    linked = numpy.nonzero(following >= 0)[0]
+    while len(linked) > 0:
+        behind[linked] += behind[following[linked]]
+        following[linked] = following[following[linked]]
+        linked = linked[following[linked] >= 0]
+
+    # Where each object goes within its location:  movers first, latest
+    # first (0 to objectCount - 1), then everyone else, front of the old
+    # chain first (objectCount to 2 * objectCount - 1).
+    place = objectCount + (objectCount - 1 - behind)
+    place[movers] = numpy.arange(len(movers) - 1, -1, -1)
+    locations[movers] = toRooms
+    # One sort key holding both, with locations (which start at
+    # inventoryLocation, -2) kept apart.  Sorting one number is far quicker
+    # than lexsort on several.
+    order = numpy.argsort((locations.astype(numpy.int64) + 2) * (2 * objectCount) + place)
+
+    sortedLocations = locations[order]
+    sameRoom = sortedLocations[:-1] == sortedLocations[1:]
+    newNext = numpy.full(objectCount, -1, dtype=numpy.intc)
+    newNext[order[:-1][sameRoom]] = order[1:][sameRoom]
+    newPrevious = numpy.full(objectCount, -1, dtype=numpy.intc)
+    newPrevious[order[1:][sameRoom]] = order[:-1][sameRoom]
+    nextInRoom[:] = newNext
+    previousInRoom[:] = newPrevious
+    heads = numpy.concatenate([[True], ~sameRoom])
+    objectList.roomHeads = dict(zip(sortedLocations[heads].tolist(), order[heads].tolist()))
+
+def RunTickVectorized( plan, roomList, objectList, turn, rng ):
+    '''
+    Runs one turn's tick as array operations on compact world storage.
+    rng is a numpy.random.Generator.
+    '''
+    columns = GetColumns(roomList, objectList)
+    exits, locations, statuses, nextInRoom, previousInRoom = columns
+    wanderers, timerTurns, timerObjects, timerStatuses = plan.GetArrays()
+
+    first = numpy.searchsorted(timerTurns, turn, side="left")
+    last = numpy.searchsorted(timerTurns, turn, side="right")
+    if last > first:
+        # NumPy doesn't promise which of several writes to the same place
+        # wins, so keep only the last timer for each object.
+        dueObjects = timerObjects[first:last][::-1]
+        objectIDs, positions = numpy.unique(dueObjects, return_index=True)
+        statuses[objectIDs] = timerStatuses[first:last][::-1][positions]
+
+    if len(wanderers) == 0:
+        return
+    draws = rng.random(len(wanderers))
+    fromRooms = locations[wanderers]
+    inRoom = fromRooms >= 0
+    movers = wanderers[inRoom]
+    fromRooms = fromRooms[inRoom]
+    roomExits = exits[fromRooms]
+    isExit = roomExits > -1
+    # The same pick RunTick makes:  0 stays put, N takes the Nth real exit.
+    picks = (draws[inRoom] * (1 + isExit.sum(axis=1))).astype(numpy.int64)
+    exitColumns = numpy.argmax((numpy.cumsum(isExit, axis=1) == picks[:, None]) & isExit, axis=1)
+    toRooms = numpy.where(picks > 0, roomExits[numpy.arange(len(movers)), exitColumns], fromRooms)
+
+    moved = toRooms != fromRooms
+    movers = movers[moved]
+    toRooms = toRooms[moved]
+    if len(movers) * bulkRelinkShare > len(locations):
+        RelinkAll(objectList, columns, movers, toRooms)
+    else:
+        for objectID, toRoom in zip(movers.tolist(), toRooms.tolist()):
+            objectList.SetObjectLocation(objectID, toRoom)
+
+
+class TickPhase:
+    '''
+    Runs a TickPlan once for every turn of a session, playing in the given
+    room and object lists.  rng is a numpy.random.Generator if vectorized.
+    '''
+    __slots__ = ("plan", "rng", "vectorized", "lastTurn")
+
+    def __init__( self, plan, rng, vectorized, roomList, objectList ):
+        self.plan = plan
+        self.rng = rng
+        # Only compact storage can be ticked as arrays.  Anything else falls
+        # back to RunTick, which gets the same results a little slower.
+        self.vectorized = vectorized and CanRunVectorized(roomList, objectList)
+        # The last turn that has been run.
+        self.lastTurn = 0
+
+    def RunTurn( self, session ):
+        for turn in range(self.lastTurn + 1, session.gameTurn + 1):
+            if self.vectorized:
+                RunTickVectorized(self.plan, session.roomList, session.objectList, turn, self.rng)
+            else:
+                RunTick(self.plan, session.roomList, session.objectList, turn, self.rng)
+            self.lastTurn = turn
@@ -0,0 +1,343 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Loading worlds from data files.
+
+A world file is JSON (or TOML, on Python 3.11 and newer) holding a list of
+rooms and a list of objects, with the same fields as roomList and objectList
+in adventure/builtin.py, but named:
+
+    {"rooms": [{"description": "...", "exits": [-1, 1, -1, -1]}, ...],
+     "objects": [{"name": "Tablet", "aliases": ["Tab"], "description": "...",
+                  "location": 0, "usable": false, "takable": false,
+                  "status": -1, "useMessage": "", "takeMessage": "",
+                  "statusMessages": []}, ...],
+     "rules": [{"when": "use", "object": "Key", "if": [["here", "Gate"]],
+                "then": [["setStatus", "Gate", 1], ...]}, ...]}
+
+Only "description" and "exits" (rooms) and "name" and "description"
+(objects) are required.  A room's ID is its place in the list, and so is an
+object's.  Every world is checked before it is used:  exits and locations
+have to name real rooms, and an object's status has to have a status message.
+An object whose location is -2 starts off in the player's inventory.
+"rules" is optional, and is written the same way as ruleList in
+adventure/builtin.py; a world without it has no puzzles at all.
+
+Parsing and checking a big world takes a while, so LoadWorld saves the
+finished world next to the source file (as <file>.cache) and uses that next
+time, for as long as the source file's contents don't change.  Cache files
+are pickles, so only load ones this program wrote.
+
+Run from the repository root:
+    python -m adventure.world export garden.json
+    python -m adventure.world compile garden.json
+'''
+
+import gc
+import hashlib
+import json
+import os
+import pickle
+import sys
+
+try:
+    import tomllib
+except ImportError:
+    # Python 3.10 and older.  JSON worlds still work.
+    tomllib = None
+
+from adventure.data import ObjectList, RoomList, inventoryLocation
+from adventure.rules import CompileRules
+
+
+# Names of the object fields, in the order objectList keeps them.
+objectFields = ("name", "aliases", "description", "location", "usable", "takable",
+                "status", "useMessage", "takeMessage", "statusMessages")
+
+# Object fields holding text that is often the same from one object to the
+# next:  description, useMessage and takeMessage.
+sharedTextFields = (2, 7, 8)
+
+# What an object field is when the world file leaves it out.  Fields that
+# aren't here are required.
+objectDefaults = {"aliases": [], "location": -1, "usable": False, "takable": False,
+                  "status": -1, "useMessage": "", "takeMessage": "", "statusMessages": []}
+
+# What parsing a broken world file can raise.
+parseErrors = (UnicodeDecodeError, json.JSONDecodeError)
+if tomllib is not None:
+    parseErrors += (tomllib.TOMLDecodeError,)
+
+cacheMagic = b"PADW"
+# Bump this whenever the cached form of a world changes.
+cacheVersion = 3
+cacheSuffix = ".cache"
+
+# At most this many problems are listed when a world doesn't check out.
+problemLimit = 20
+
+
+##### Checking and building
+
+def IsInteger( value ):
+    # JSON true and false come back as bools, which Python also counts as ints.
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def IsStringList( value ):
+    return isinstance(value, list) and all([isinstance(item, str) for item in value])
+
+def BuildRoom( roomData, roomID, roomCount, problems ):
+    '''
+    Returns one room in roomList form, adding anything wrong with it to problems.
+    '''
+    if not isinstance(roomData, dict):
+        problems.append("room %d:  not a table of fields" % roomID)
+        return ["", [-1, -1, -1, -1]]
+    description = roomData.get("description")
+    if not isinstance(description, str):
+        problems.append("room %d:  needs a description" % roomID)
+    exits = roomData.get("exits")
+    if not isinstance(exits, list) or len(exits) != 4 or not all([IsInteger(roomExit) for roomExit in exits]):
+        problems.append("room %d:  exits must be a list of 4 room numbers [N, E, S, W]" % roomID)
+        exits = [-1, -1, -1, -1]
+    for roomExit in exits:
+        if roomExit < -1 or roomExit >= roomCount:
+            problems.append("room %d:  exit to room %d, which doesn't exist" % (roomID, roomExit))
+    return [description, list(exits)]
+
+def BuildObject( objectData, objectID, roomCount, problems ):
+    '''
+    Returns one object in objectList form, adding anything wrong with it to problems.
+    '''
+    if not isinstance(objectData, dict):
+        problems.append("object %d:  not a table of fields" % objectID)
+        return None
+    objectValues = []
+    for field in objectFields:
+        if field in objectData:
+            objectValues.append(objectData[field])
+        elif field in objectDefaults:
+            # A copy, so no two objects share the same default list.
+            objectValues.append(type(objectDefaults[field])(objectDefaults[field]))
+        else:
+            problems.append("object %d:  needs a %s" % (objectID, field))
+            objectValues.append(None)
+
+    name, aliases, description, location, usable, takable, status, useMessage, takeMessage, statusMessages = objectValues
+    label = "object %d" % objectID
+    if isinstance(name, str):
+        label = "object %d (%s)" % (objectID, name)
+    for field in objectData:
+        if field not in objectFields:
+            problems.append("%s:  unknown field %s" % (label, field))
+    for field, value in [["name", name], ["description", description],
+                         ["useMessage", useMessage], ["takeMessage", takeMessage]]:
+        if value is not None and not isinstance(value, str):
+            problems.append("%s:  %s must be text" % (label, field))
+    for field, value in [["aliases", aliases], ["statusMessages", statusMessages]]:
+        if not IsStringList(value):
+            problems.append("%s:  %s must be a list of text" % (label, field))
+    for field, value in [["usable", usable], ["takable", takable]]:
+        if not isinstance(value, bool):
+            problems.append("%s:  %s must be true or false" % (label, field))
+    if not IsInteger(location):
+        problems.append("%s:  location must be a room number" % label)
+    elif location != -1 and location != inventoryLocation and (location < 0 or location >= roomCount):
+        problems.append("%s:  location %d isn't a room" % (label, location))
+    if not IsInteger(status):
+        problems.append("%s:  status must be a number" % label)
+    elif IsStringList(statusMessages) and (status < -1 or status >= len(statusMessages)):
+        problems.append("%s:  status %d has no status message" % (label, status))
+    return objectValues
+
+def BuildWorld( worldData ):
+    '''
+    Checks world data read from a world file and returns
+    [roomList, objectList, ruleBook], with the object list's name and room
+    indexes built and the rules compiled.
+    Raises ValueError listing what is wrong if the world doesn't check out.
+    '''
+    problems = []
+    if not isinstance(worldData, dict):
+        raise ValueError("a world needs a list of rooms and a list of objects")
+    roomsData = worldData.get("rooms")
+    objectsData = worldData.get("objects", [])
+    rulesData = worldData.get("rules", [])
+    if not isinstance(roomsData, list) or len(roomsData) == 0:
+        raise ValueError("a world needs at least one room")
+    if not isinstance(objectsData, list):
+        raise ValueError("a world's objects must be a list")
+    if not isinstance(rulesData, list):
+        raise ValueError("a world's rules must be a list")
+
+    roomCount = len(roomsData)
+    roomList = [BuildRoom(roomsData[roomID], roomID, roomCount, problems) for roomID in range(roomCount)]
+    objects = [BuildObject(objectsData[objectID], objectID, roomCount, problems) for objectID in range(len(objectsData))]
+    if len(problems) > 0:
+        shown = problems[:problemLimit]
+        if len(problems) > problemLimit:
+            shown.append("... and %d more" % (len(problems) - problemLimit))
+        raise ValueError("world doesn't check out:\n  " + "\n  ".join(shown))
+
+    # Worlds reuse a lot of text.  Keep just one copy of each, which also
+    # means the cache only has to save it once.
+    sharedText = {}
+    for room in roomList:
+        room[0] = sharedText.setdefault(room[0], room[0])
+    for objectData in objects:
+        for fieldNum in sharedTextFields:
+            objectData[fieldNum] = sharedText.setdefault(objectData[fieldNum], objectData[fieldNum])
+        objectData[9] = [sharedText.setdefault(text, text) for text in objectData[9]]
+    roomList = RoomList(roomList)
+    objectList = ObjectList(objects)
+
+    # Rules name objects, so they can only be checked once the objects are built.
+    try:
+        ruleBook = CompileRules(rulesData, roomCount, objectList)
+    except ValueError as error:
+        raise ValueError("world doesn't check out:\n  " + str(error))
+    return [roomList, objectList, ruleBook]
+
+def ExportWorld( roomList, objectList, ruleList ):
+    '''
+    Returns world data for a list-of-lists world and its rules (written the
+    way ruleList is, not compiled), ready to be saved as a world file.
+    '''
+    rooms = [{"description": room[0], "exits": list(room[1])} for room in roomList]
+    objects = []
+    for objectData in objectList:
+        fields = {}
+        for fieldNum in range(len(objectFields)):
+            value = objectData[fieldNum]
+            if isinstance(value, (list, tuple)):
+                value = list(value)
+            fields[objectFields[fieldNum]] = value
+        objects.append(fields)
+    return {"rooms": rooms, "objects": objects, "rules": ruleList}
+
+
+##### World files and their caches
+
+def ParseWorldFile( worldFile, source ):
+    '''
+    Returns the world data in the bytes of a world file.  Files ending in
+    .toml are read as TOML, and everything else as JSON.
+    '''
+    if worldFile.endswith(".toml"):
+        if tomllib is None:
+            raise ValueError("TOML worlds need Python 3.11 or newer")
+        return tomllib.loads(source.decode("utf-8"))
+    return json.loads(source)
+
+def GetCacheFile( worldFile ):
+    return worldFile + cacheSuffix
+
+def ReadWorldCache( cacheFile, sourceHash ):
+    '''
+    Returns [roomList, objectList, ruleBook] from a world cache, or None if there is no
+    cache or it was made from a different source file.
+    '''
+    try:
+        with open(cacheFile, "rb") as cache:
+            header = cache.read(len(cacheMagic) + 1 + len(sourceHash))
+            if header != cacheMagic + bytes([cacheVersion]) + sourceHash:
+                return None
+            # A world is millions of little lists and strings, none of which
+            # can be garbage yet.  Letting the garbage collector look through
+            # them as they are made takes far longer than the loading itself.
+            collecting = gc.isenabled()
+            gc.disable()
+            try:
+                return pickle.load(cache)
+            finally:
+                if collecting:
+                    gc.enable()
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+def WriteWorldCache( cacheFile, sourceHash, world ):
+    '''
+    Saves a built world for ReadWorldCache.  A cache that can't be written
+    (a read-only directory, say) is quietly skipped.
+    '''
+    temporaryFile = "%s.%d.tmp" % (cacheFile, os.getpid())
+    try:
+        with open(temporaryFile, "wb") as cache:
+            cache.write(cacheMagic + bytes([cacheVersion]) + sourceHash)
+            pickle.dump(world, cache, protocol=pickle.HIGHEST_PROTOCOL)
+        # Other processes loading the same world never see half a cache.
+        os.replace(temporaryFile, cacheFile)
+    except OSError:
+        try:
+            os.remove(temporaryFile)
+        except OSError:
+            pass
+
+def LoadWorld( worldFile, useCache ):
+    '''
+    Returns [roomList, objectList, ruleBook] for a world file, using (and if need be
+    making) its cache when useCache is True.
+    Raises ValueError if the world file can't be read or doesn't check out.
+    '''
+    with open(worldFile, "rb") as source:
+        sourceBytes = source.read()
+    sourceHash = hashlib.sha256(sourceBytes).digest()
+    cacheFile = GetCacheFile(worldFile)
+    if useCache:
+        world = ReadWorldCache(cacheFile, sourceHash)
+        if world is not None:
+            return world
+
+    try:
+        worldData = ParseWorldFile(worldFile, sourceBytes)
+    except parseErrors as error:
+        raise ValueError(str(error))
+    world = BuildWorld(worldData)
+    if useCache:
+        WriteWorldCache(cacheFile, sourceHash, world)
+    return world
+
+def LoadGameWorld( worldFile ):
+    '''
+    Returns [roomList, objectList, ruleBook] for a world file, or the built-in
+    world (adventure/builtin.py) if worldFile is None.
+    '''
+    if worldFile is None:
+        # The built-in world is only built once it's asked for.
+        from adventure.builtin import roomList, objectList, gameRules
+        return [roomList, objectList, gameRules]
+    return LoadWorld(worldFile, True)
+
+
+def Main( arguments ):
+    if len(arguments) < 2 or arguments[0] not in ("export", "compile"):
+        print("usage:  python -m adventure.world export WORLDFILE")
+        print("        python -m adventure.world compile WORLDFILE...")
+        return 2
+    if arguments[0] == "export":
+        # The built-in world, as a world file.
+        from adventure.builtin import roomList, objectList, ruleList
+        worldData = ExportWorld(roomList, objectList, ruleList)
+        with open(arguments[1], "w", encoding="utf-8") as worldFile:
+            json.dump(worldData, worldFile, indent=2)
+            worldFile.write("\n")
+        return 0
+
+    failed = 0
+    for worldFile in arguments[1:]:
+        try:
+            world = LoadWorld(worldFile, True)
+        except (OSError, ValueError) as error:
+            print("%s:  %s" % (worldFile, error))
+            failed = 1
+            continue
+        print("%s:  %d rooms, %d objects, %d rules" % (worldFile, len(world[0]), len(world[1]), len(world[2].rules)))
+    return failed
+
+if __name__ == "__main__":
+    sys.exit(Main(sys.argv[1:]))
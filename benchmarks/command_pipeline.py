@@ -0,0 +1,248 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Command benchmark suite:  the commands players type, on worlds of growing size.
+
+Builds synthetic worlds in the roomList/objectList layout (the same ones
+world_memory.py uses, plus a wandering creature and a usable object with a
+rule), and times:
+
+  - GetObjectID, for names and aliases that exist and one that doesn't;
+  - CommandLook, CommandExamine, CommandTake (putting the object back each
+    time) and CommandUse, called directly;
+  - ParseCommand, for a move and for an examine;
+  - whole turns with RunCommand, creature wandering and all, going through
+    a short script of commands over and over;
+  - how long importing the game takes, in a fresh interpreter.
+
+Each measurement is run several times, and the median and best time per
+call are kept.  The results can be saved as JSON, and compared against an
+earlier run's JSON:  anything whose median got slower by more than the
+threshold is listed, and the script exits with status 1, so it can fail a
+build.
+
+Run from the repository root:
+    python benchmarks/command_pipeline.py
+    python benchmarks/command_pipeline.py --sizes 1000 100000 --json results.json
+    python benchmarks/command_pipeline.py --json results.json --baseline baseline.json --threshold 0.2
+'''
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+repositoryRoot = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, repositoryRoot)
+
+from python_adventure import ObjectList, GameSession, CompileRules, OutputBuffer, OutputTo, \
+    GetObjectID, SetObjectLocation, AddToInventory, RoomList, CommandLook, CommandExamine, \
+    CommandTake, CommandUse, ParseCommand, RunCommand, RulesFrom
+from world_memory import MakeListWorld
+
+
+# The modules whose import time is measured, each in a fresh interpreter.
+importedModules = ["adventure.game", "python_adventure", "adventure.server"]
+
+# How many times each measurement is repeated, and how long each repeat should roughly take.
+repeatCount = 7
+repeatSeconds = 0.05
+
+def MakeBenchWorld( objectCount ):
+    '''
+    Returns [roomList, objectList, ruleBook] for a world with the given number
+    of things, plus a wandering creature, set up the way a game plays it.
+    Thing0 is in the player's inventory, and using it has a rule.
+    '''
+    roomList, objects = MakeListWorld(objectCount)
+    roomList = RoomList(roomList)
+    objects.append(["Creature", [], "A creature.", 1 % len(roomList), False, False, 0, "", "",
+                    ["It ignores you.", "It looks hungry."]])
+    objectList = ObjectList(objects)
+    ruleBook = CompileRules([
+        {"when": "use", "object": "Thing0", "then": [["useMessage", "Thing0"]]},
+        {"when": "world", "then": [["wander", "Creature"]]}], len(roomList), objectList)
+    # Thing0 starts in room 0, and is usable and takable.
+    AddToInventory(0, objectList, [])
+    return [roomList, objectList, ruleBook]
+
+def TimeCalls( function ):
+    '''
+    Returns [median, best] seconds per call of function(), which is given no arguments.
+    '''
+    # Find how many calls make up one repeat.
+    loops = 1
+    while True:
+        startTime = time.perf_counter()
+        for loopNum in range(loops):
+            function()
+        if time.perf_counter() - startTime >= repeatSeconds / 10 or loops >= 1 << 20:
+            break
+        loops *= 2
+    loops = max(1, int(loops * repeatSeconds / max(time.perf_counter() - startTime, 1e-9)))
+    perCall = []
+    for repeatNum in range(repeatCount):
+        startTime = time.perf_counter()
+        for loopNum in range(loops):
+            function()
+        perCall.append((time.perf_counter() - startTime) / loops)
+    return [statistics.median(perCall), min(perCall)]
+
+def BenchLookups( world, rng ):
+    '''
+    Returns name -> [median, best] for GetObjectID and the Command* handlers.
+    '''
+    roomList, objectList, ruleBook = world
+    roomCount = len(roomList)
+    objectCount = len(objectList) - 1
+    results = {}
+
+    names = []
+    for nameNum in range(1000):
+        objectID = rng.randrange(objectCount)
+        names.append(rng.choice(["Thing%d", "Item%d", "Object%d", "thing%d"]) % objectID)
+    names.append("Nothing")
+    nameCycle = [0]
+    def LookUpName():
+        nameCycle[0] = (nameCycle[0] + 1) % len(names)
+        GetObjectID(names[nameCycle[0]], objectList)
+    results["GetObjectID"] = TimeCalls(LookUpName)
+
+    # The player is in room 0, which holds every roomCount'th thing.  That
+    # makes ThingN (N = roomCount) here, and takable, since roomCount is a
+    # multiple of 5 for any world of 50 things or more.
+    hereName = "Thing%d" % roomCount
+    output = OutputBuffer(None)
+    inventory = [0]
+    with OutputTo(output), RulesFrom(ruleBook):
+        def Look():
+            CommandLook(0, roomList, objectList)
+            output.Take()
+        def Examine():
+            CommandExamine(hereName, 0, roomList, objectList, inventory)
+            output.Take()
+        def Take():
+            CommandTake(hereName, 0, roomList, objectList, inventory)
+            output.Take()
+            inventory.pop()
+            SetObjectLocation(roomCount, 0, objectList)
+        def Use():
+            CommandUse("Thing0", 0, roomList, objectList, inventory)
+            output.Take()
+        def ParseMove():
+            ParseCommand("n", roomList, objectList, inventory, 0, 0)
+            output.Take()
+        def ParseExamine():
+            ParseCommand("examine " + hereName, roomList, objectList, inventory, 0, 0)
+            output.Take()
+        results["CommandLook"] = TimeCalls(Look)
+        results["CommandExamine"] = TimeCalls(Examine)
+        results["CommandTake"] = TimeCalls(Take)
+        results["CommandUse"] = TimeCalls(Use)
+        results["ParseCommand move"] = TimeCalls(ParseMove)
+        results["ParseCommand examine"] = TimeCalls(ParseExamine)
+    return results
+
+def BenchTurns( world ):
+    '''
+    Returns [median, best] seconds per whole turn, creature and all.
+    '''
+    roomList, objectList, ruleBook = world
+    session = GameSession(roomList, objectList, ruleBook, random.Random(1))
+    session.playerInventory = [0]
+    # Round trip from room 0 to room 1 and back, looking at things on the way.
+    script = ["look", "examine Thing0", "n", "examine Thing1", "s", "inventory", "use Thing0"]
+    scriptCycle = [0]
+    def Turn():
+        scriptCycle[0] = (scriptCycle[0] + 1) % len(script)
+        RunCommand(session, script[scriptCycle[0]])
+        session.output.Take()
+    return TimeCalls(Turn)
+
+def TimeImport( moduleName ):
+    '''
+    Returns [median, best] seconds to import a module in a fresh interpreter
+    (only the import itself, not starting Python).
+    '''
+    program = "import time; startTime = time.perf_counter(); import %s; print(time.perf_counter() - startTime)" % moduleName
+    seconds = []
+    for repeatNum in range(repeatCount):
+        result = subprocess.run([sys.executable, "-c", program], cwd=repositoryRoot, check=True,
+                                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, text=True)
+        seconds.append(float(result.stdout))
+    return [statistics.median(seconds), min(seconds)]
+
+def RunSuite( sizes ):
+    '''
+    Returns measurement name -> {"median", "best"} (seconds per call) for every measurement.
+    '''
+    results = {}
+    for moduleName in importedModules:
+        median, best = TimeImport(moduleName)
+        results["import %s" % moduleName] = {"median": median, "best": best}
+    for objectCount in sizes:
+        world = MakeBenchWorld(objectCount)
+        measurements = BenchLookups(world, random.Random(objectCount))
+        measurements["turn"] = BenchTurns(world)
+        for name, times in measurements.items():
+            results["%s [%d]" % (name, objectCount)] = {"median": times[0], "best": times[1]}
+    return results
+
+def FindRegressions( results, baseline, threshold ):
+    '''
+    Returns [[name, baseline median, median], ...] for every measurement in
+    both runs that got slower by more than threshold (0.2 for 20%).
+    '''
+    regressions = []
+    for name in sorted(results):
+        if name in baseline:
+            if results[name]["median"] > baseline[name]["median"] * (1 + threshold):
+                regressions.append([name, baseline[name]["median"], results[name]["median"]])
+    return regressions
+
+def Main( arguments ):
+    parser = argparse.ArgumentParser(prog="python benchmarks/command_pipeline.py",
+                                     description="Time the game's commands on synthetic worlds.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="numbers of things in the worlds to time")
+    parser.add_argument("--json", help="save the results to this file")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="how much slower (0.25 for 25%%) counts as a regression")
+    options = parser.parse_args(arguments)
+
+    results = RunSuite(options.sizes)
+    print("%-34s %12s %12s" % ("measurement", "median us", "best us"))
+    for name, times in results.items():
+        print("%-34s %12.2f %12.2f" % (name, times["median"] * 1e6, times["best"] * 1e6))
+    if options.json is not None:
+        with open(options.json, "w", encoding="utf-8") as resultsFile:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "results": results}, resultsFile, indent=2)
+            resultsFile.write("\n")
+    if options.baseline is None:
+        return 0
+
+    with open(options.baseline, encoding="utf-8") as baselineFile:
+        baseline = json.load(baselineFile)["results"]
+    regressions = FindRegressions(results, baseline, options.threshold)
+    if len(regressions) == 0:
+        print("No regressions against %s (threshold %d%%)." % (options.baseline, options.threshold * 100))
+        return 0
+    print("Slower than %s by more than %d%%:" % (options.baseline, options.threshold * 100))
+    for name, baselineSeconds, seconds in regressions:
+        print("  %-32s %10.2f us -> %10.2f us" % (name, baselineSeconds * 1e6, seconds * 1e6))
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(Main(sys.argv[1:]))
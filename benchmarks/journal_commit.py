@@ -0,0 +1,110 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Journal benchmark:  group commit vs. one fsync per command.
+
+Plays many games at once on the built-in world, each sending the same few
+commands, with every command journaled (see adventure/journal.py) and not
+counted as done until it is on disk.  First each command syncs the journal
+itself, then the games share syncs through WaitUntilDurable.  Reports
+commands per second and how many fsyncs each way took.
+
+Run from the repository root:
+    python benchmarks/journal_commit.py [games] [commands per game] [journal directory]
+
+The journal directory defaults to a temporary one;  give one on the disk
+the server would really use, since fsync costs very different amounts on
+different disks.
+'''
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from adventure.builtin import roomList, objectList, gameRules
+from adventure.game import GameSession, StartGame, RunCommand
+from adventure.overlay import FreezeWorld, NewSessionWorld
+from adventure.journal import Journal, defaultSnapshotEvery
+
+
+# Walks around without finishing the game, so it can go on as long as needed.
+gameScript = ["look", "e", "w", "examine onion", "n", "s"]
+
+
+def NewGames( gameCount, sharedWorld, journal ):
+    '''
+    Returns a list of started sessions, each with its starting snapshot journaled.
+    '''
+    sessions = []
+    for gameNum in range(gameCount):
+        sessionWorld = NewSessionWorld(sharedWorld[0], sharedWorld[1])
+        session = GameSession(sessionWorld[0], sessionWorld[1], gameRules, random.Random(gameNum))
+        StartGame(session)
+        session.output.Take()
+        journal.RecordSnapshot(gameNum, session)
+        sessions.append(session)
+    journal.Sync()
+    return sessions
+
+async def PlayGame( sessionID, session, journal, commandCount, groupCommit ):
+    for commandNum in range(commandCount):
+        action = gameScript[commandNum % len(gameScript)]
+        RunCommand(session, action)
+        session.output.Take()
+        recordNumber = journal.RecordCommand(sessionID, session, action)
+        if groupCommit:
+            await journal.WaitUntilDurable(recordNumber)
+        else:
+            journal.Sync()
+            # Let the other games have a turn, as a server would.
+            await asyncio.sleep(0)
+
+async def TimeGames( gameCount, commandCount, sharedWorld, journalFileName, groupCommit ):
+    '''
+    Returns [seconds, fsyncs] to play every game.
+    '''
+    journal = Journal(open(journalFileName, "wb"), defaultSnapshotEvery)
+    sessions = NewGames(gameCount, sharedWorld, journal)
+    startSyncs = journal.syncCount
+    startTime = time.perf_counter()
+    await asyncio.gather(*[PlayGame(sessionID, session, journal, commandCount, groupCommit)
+                           for sessionID, session in enumerate(sessions)])
+    seconds = time.perf_counter() - startTime
+    journal.Close()
+    return [seconds, journal.syncCount - startSyncs]
+
+def Main( arguments ):
+    gameCount = 100
+    commandCount = 50
+    journalDirectory = None
+    if len(arguments) > 0:
+        gameCount = int(arguments[0])
+    if len(arguments) > 1:
+        commandCount = int(arguments[1])
+    if len(arguments) > 2:
+        journalDirectory = arguments[2]
+
+    sharedWorld = FreezeWorld(roomList, objectList)
+    totalCommands = gameCount * commandCount
+    print("%d games, %d commands each" % (gameCount, commandCount))
+    print("%-22s %12s %10s %16s" % ("", "commands/s", "fsyncs", "commands/fsync"))
+    with tempfile.TemporaryDirectory(dir=journalDirectory) as directory:
+        journalFileName = os.path.join(directory, "journal.bin")
+        for name, groupCommit in [["fsync per command", False], ["group commit", True]]:
+            seconds, syncCount = asyncio.run(TimeGames(gameCount, commandCount, sharedWorld,
+                                                       journalFileName, groupCommit))
+            print("%-22s %12.0f %10d %16.1f" % (name, totalCommands / seconds, syncCount,
+                                                totalCommands / max(syncCount, 1)))
+
+if __name__ == "__main__":
+    Main(sys.argv[1:])
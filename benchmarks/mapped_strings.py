@@ -0,0 +1,137 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Mapped string store benchmark:  memory and first-read time vs. in-memory lists.
+
+Builds a world where every room and object has its own text, and saves it
+twice:  as the usual lists, and as compact storage reading its text from a
+string store (adventure/mapped.py).  Each is then loaded in a fresh process,
+which reports how much resident memory the world added, and how long it
+takes to read a few thousand random room and object descriptions the first
+time and again after that.  The store file is dropped from the page cache
+first (where the system allows it), so first reads really go to the disk.
+
+Run from the repository root:
+    python benchmarks/mapped_strings.py [rooms] [reads]
+'''
+
+import gc
+import json
+import os
+import pickle
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from python_adventure import ObjectList, GetRoomDescription, GetObjectDescription
+from adventure.mapped import BuildMappedWorld
+from session_overlay import CurrentRSS
+
+
+def MakeTextWorld( roomCount ):
+    '''
+    Returns [roomList, objectList] with one object per room, where no two
+    rooms or objects share any text.
+    '''
+    roomList = []
+    objectList = []
+    for roomID in range(roomCount):
+        roomList.append([
+            "You are in room %d.  The walls here are scratched with the marks of everyone who came through before you." % roomID,
+            [(roomID + 1) % roomCount, -1, (roomID - 1) % roomCount, -1]])
+        objectList.append([
+            "Thing%d" % roomID, [],
+            "Thing %d looks much like the others, though someone has carved a small number into its side." % roomID,
+            roomID, True, True, 0,
+            "You use thing %d." % roomID, "You pick up thing %d." % roomID,
+            ["Thing %d sits here." % roomID]])
+    return [roomList, ObjectList(objectList)]
+
+def DropFromPageCache( fileName ):
+    '''
+    Asks the system to forget any cached pages of a file, if it can.
+    '''
+    if hasattr(os, "posix_fadvise"):
+        fileHandle = os.open(fileName, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fileHandle, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fileHandle)
+
+def TimeReads( world, roomIDs ):
+    '''
+    Returns the average seconds per read of a room and an object description.
+    '''
+    startTime = time.perf_counter()
+    for roomID in roomIDs:
+        GetRoomDescription(roomID, world[0])
+        GetObjectDescription(roomID, world[1])
+    return (time.perf_counter() - startTime) / (len(roomIDs) * 2)
+
+def MeasureInChild( worldPickle, readCount ):
+    '''
+    Runs in a fresh process:  loads a pickled world and prints what it measured as JSON.
+    '''
+    gc.collect()
+    startRSS = CurrentRSS()
+    gc.disable()
+    with open(worldPickle, "rb") as pickleFile:
+        world = pickle.load(pickleFile)
+    gc.enable()
+    gc.collect()
+    loadedRSS = CurrentRSS()
+    roomIDs = random.Random(1).sample(range(len(world[0])), min(readCount, len(world[0])))
+    firstRead = TimeReads(world, roomIDs)
+    againRead = TimeReads(world, roomIDs)
+    readRSS = CurrentRSS()
+    print(json.dumps({"loadedBytes": loadedRSS - startRSS, "readBytes": readRSS - startRSS,
+                      "firstRead": firstRead, "againRead": againRead}))
+
+def Main( arguments ):
+    if len(arguments) > 0 and arguments[0] == "child":
+        MeasureInChild(arguments[1], int(arguments[2]))
+        return
+    roomCount = 200000
+    readCount = 5000
+    if len(arguments) > 0:
+        roomCount = int(arguments[0])
+    if len(arguments) > 1:
+        readCount = int(arguments[1])
+
+    workDirectory = tempfile.mkdtemp()
+    try:
+        world = MakeTextWorld(roomCount)
+        listPickle = os.path.join(workDirectory, "list.pickle")
+        with open(listPickle, "wb") as pickleFile:
+            pickle.dump(world, pickleFile, protocol=pickle.HIGHEST_PROTOCOL)
+        storeFile = os.path.join(workDirectory, "world.strings")
+        mappedPickle = os.path.join(workDirectory, "mapped.pickle")
+        with open(mappedPickle, "wb") as pickleFile:
+            pickle.dump(BuildMappedWorld(world[0], world[1], storeFile), pickleFile, protocol=pickle.HIGHEST_PROTOCOL)
+        del world
+        print("world:  %d rooms, %d objects;  string store:  %.1f MB" %
+              (roomCount, roomCount, os.path.getsize(storeFile) / 1e6))
+
+        print("%-8s %14s %16s %14s %14s" % ("storage", "RSS loaded MB", "RSS after reads", "first read us", "again us"))
+        for name, worldPickle in [["lists", listPickle], ["mapped", mappedPickle]]:
+            DropFromPageCache(storeFile)
+            childOutput = subprocess.run([sys.executable, os.path.abspath(__file__), "child", worldPickle, str(readCount)],
+                                         check=True, stdout=subprocess.PIPE).stdout
+            result = json.loads(childOutput)
+            print("%-8s %14.1f %16.1f %14.2f %14.2f" % (name, result["loadedBytes"] / 1e6, result["readBytes"] / 1e6,
+                                                        result["firstRead"] * 1e6, result["againRead"] * 1e6))
+    finally:
+        shutil.rmtree(workDirectory)
+
+if __name__ == "__main__":
+    Main(sys.argv[1:])
@@ -0,0 +1,75 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Name matching benchmark:  NameResolver (prefixes and near misses) vs. GetObjectID.
+
+Builds worlds of 1 thousand to 100 thousand named objects, ten to a room
+(the same ones world_memory.py uses), puts the player in room 0 with one
+thing in hand, and times working out a whole name, a prefix and a typo,
+both the first time (with the cache cleared) and again from the cache.
+GetObjectID on the whole name is there for comparison.
+
+Run from the repository root:
+    python benchmarks/name_matching.py [most objects] [lookups]
+'''
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from python_adventure import ObjectList, GetObjectID, AddToInventory
+from adventure.names import NameResolver
+from world_memory import MakeListWorld
+
+
+def TimeLookups( lookup, lookupCount ):
+    '''
+    Returns the average seconds per call of lookup().
+    '''
+    startTime = time.perf_counter()
+    for lookupNum in range(lookupCount):
+        lookup()
+    return (time.perf_counter() - startTime) / lookupCount
+
+def Main( arguments ):
+    mostObjects = 100000
+    lookupCount = 2000
+    if len(arguments) > 0:
+        mostObjects = int(arguments[0])
+    if len(arguments) > 1:
+        lookupCount = int(arguments[1])
+
+    print("%10s %10s %14s %14s %14s" % ("objects", "typed", "GetObjectID us", "first us", "cached us"))
+    objectCount = 1000
+    while objectCount <= mostObjects:
+        roomList, objects = MakeListWorld(objectCount)
+        objectList = ObjectList(objects)
+        roomCount = len(roomList)
+        AddToInventory(0, objectList, [])
+        resolver = NameResolver(2, 256)
+        # Room 0 holds every roomCount'th thing, so Thing<2 * roomCount> is here.
+        wanted = 2 * roomCount
+        name = "Thing%d" % wanted
+        for typed in [name, name.lower()[:6], name[:2] + name[3] + name[2] + name[4:]]:
+            objectID, suggestions = resolver.Resolve(typed, 0, objectList)
+            if objectID != wanted and suggestions[:1] != [wanted]:
+                raise SystemExit("%r didn't find %s" % (typed, name))
+            def Uncached():
+                resolver.Clear()
+                resolver.Resolve(typed, 0, objectList)
+            exactSeconds = TimeLookups(lambda: GetObjectID(typed, objectList), lookupCount)
+            firstSeconds = TimeLookups(Uncached, lookupCount)
+            cachedSeconds = TimeLookups(lambda: resolver.Resolve(typed, 0, objectList), lookupCount)
+            print("%10d %10s %14.2f %14.2f %14.2f" % (objectCount, typed, exactSeconds * 1e6,
+                                                      firstSeconds * 1e6, cachedSeconds * 1e6))
+        objectCount *= 10
+
+if __name__ == "__main__":
+    Main(sys.argv[1:])
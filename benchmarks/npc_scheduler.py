@@ -0,0 +1,115 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+NPC benchmark:  moving every creature every turn vs. the NpcScheduler.
+
+Builds a square grid of rooms with a few NPCs in each, and has the player
+wander around it for a number of turns.  Each turn either moves every NPC
+the way the "wander" rule moves the built-in creature (MoveCreature), or
+lets an NpcScheduler (adventure/npc.py) move just the ones near the player.
+Reports the time per turn as the number of NPCs grows.
+
+Run from the repository root:
+    python benchmarks/npc_scheduler.py [most NPCs] [turns]
+'''
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from python_adventure import GameSession, MoveCreature, CompileRules
+from adventure.overlay import FreezeWorld, NewSessionWorld
+from adventure.npc import MoveTable, NpcScheduler
+
+
+# NPCs per room, and how far from the player the scheduler moves them.
+npcsPerRoom = 4
+nearRadius = 2
+
+def MakeGridWorld( side, npcCount ):
+    '''
+    Returns [roomList, objectList] for a side x side grid of rooms, with
+    npcCount creatures spread around it.  Every tenth one is hostile.
+    '''
+    roomList = []
+    for row in range(side):
+        for column in range(side):
+            roomID = row * side + column
+            roomList.append([
+                "You are in room %d, %d." % (row, column),
+                [roomID - side if row > 0 else -1,
+                 roomID + 1 if column < side - 1 else -1,
+                 roomID + side if row < side - 1 else -1,
+                 roomID - 1 if column > 0 else -1]])
+    objectList = []
+    for objectID in range(npcCount):
+        objectList.append([
+            "Creature%d" % objectID, [], "A creature.", (objectID * 7919) % len(roomList),
+            False, False, 1 if objectID % 10 == 0 else 0, "", "", ["It wanders.", "It hunts."]])
+    return [roomList, objectList]
+
+def WalkPlayer( session, moveTable, walkRng ):
+    '''
+    Moves the player one step at random, and counts the turn.
+    '''
+    choices = moveTable.GetChoices(session.playerRoom, session.roomList)
+    session.playerRoom = walkRng.choice(choices)
+    session.gameTurn += 1
+
+def TimeTurns( sharedWorld, moveTable, npcCount, turnCount, useScheduler ):
+    '''
+    Returns the average seconds per turn.
+    '''
+    sessionWorld = NewSessionWorld(sharedWorld[0], sharedWorld[1])
+    noRules = CompileRules([], len(sharedWorld[0]), sharedWorld[1])
+    session = GameSession(sessionWorld[0], sessionWorld[1], noRules, random.Random(1))
+    if useScheduler:
+        session.npcs = NpcScheduler(moveTable, nearRadius)
+        for objectID in range(npcCount):
+            session.npcs.AddNpc(objectID, 1, 1)
+    walkRng = random.Random(2)
+    # The scheduler's first turn looks at every NPC, to put the ones far from
+    # the player to sleep.  Time the turns after that.
+    for turn in range(turnCount + 1):
+        if turn == 1:
+            startTime = time.perf_counter()
+        WalkPlayer(session, moveTable, walkRng)
+        if useScheduler:
+            session.npcs.RunTurn(session)
+        else:
+            for objectID in range(npcCount):
+                MoveCreature(objectID, session)
+    return (time.perf_counter() - startTime) / turnCount
+
+def Main( arguments ):
+    mostNpcs = 100000
+    turnCount = 20
+    if len(arguments) > 0:
+        mostNpcs = int(arguments[0])
+    if len(arguments) > 1:
+        turnCount = int(arguments[1])
+
+    print("%d turns, NPCs within %d moves of the player are moved" % (turnCount, nearRadius))
+    print("%10s %16s %16s %10s" % ("NPCs", "every NPC us", "scheduler us", "speedup"))
+    npcCount = 1000
+    while npcCount <= mostNpcs:
+        side = max(2, int((npcCount / npcsPerRoom) ** 0.5))
+        world = MakeGridWorld(side, npcCount)
+        sharedWorld = FreezeWorld(world[0], world[1])
+        moveTable = MoveTable(sharedWorld[0])
+        everySeconds = TimeTurns(sharedWorld, moveTable, npcCount, turnCount, False)
+        schedulerSeconds = TimeTurns(sharedWorld, moveTable, npcCount, turnCount, True)
+        print("%10d %16.1f %16.1f %9.1fx" % (npcCount, everySeconds * 1e6, schedulerSeconds * 1e6,
+                                             everySeconds / schedulerSeconds))
+        npcCount *= 10
+
+if __name__ == "__main__":
+    Main(sys.argv[1:])
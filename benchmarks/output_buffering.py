@@ -0,0 +1,124 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Output benchmark:  one write per turn vs. one write per line.
+
+Plays the same games over and over, sending the output to a few different
+sinks, once with the usual per-turn OutputBuffer and once with a buffer that
+passes every line straight on, which is what print() used to do.  Reports
+turns per second for each.
+
+The sinks are an in-memory list, an unbuffered file (every write is a
+system call, like a console), and a local socket with a thread reading the
+other end (like a player connected to the server).
+
+Run from the repository root:
+    python benchmarks/output_buffering.py [turns]
+'''
+
+import os
+import random
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import python_adventure
+from python_adventure import GameSession, StartGame, RunCommand, OutputBuffer, \
+    promptString, promptPadding
+from adventure.overlay import FreezeWorld, NewSessionWorld
+
+
+# The winning game, with a couple of extra looks.  A game that doesn't win
+# with its seed just ends when the script does, and the next one starts.
+gameScript = ["look", "e", "n", "take onion", "s", "e", "s", "use onion", "i",
+              "n", "e", "look", "use key", "e"]
+
+class LineOutput(OutputBuffer):
+    '''
+    An OutputBuffer that doesn't buffer:  every line goes to the sink as soon
+    as it is said, the way print() works.
+    '''
+    __slots__ = ()
+
+    def Write( self, text ):
+        self.sink(text)
+
+def PlayTurns( turnCount, sharedWorld, bufferType, sink ):
+    '''
+    Plays games until turnCount commands have been run.  Returns the seconds taken.
+    '''
+    turns = 0
+    gameNum = 0
+    startTime = time.perf_counter()
+    while turns < turnCount:
+        sessionWorld = NewSessionWorld(sharedWorld[0], sharedWorld[1])
+        session = GameSession(sessionWorld[0], sessionWorld[1], python_adventure.gameRules,
+                              random.Random(gameNum))
+        session.output = bufferType(sink)
+        gameNum += 1
+        running = StartGame(session)
+        for action in gameScript:
+            if not running or turns >= turnCount:
+                break
+            session.output.Write(promptPadding + promptString)
+            session.output.Flush()
+            running = RunCommand(session, action)
+            turns += 1
+        session.output.Flush()
+    return time.perf_counter() - startTime
+
+def DrainSocket( connection ):
+    '''
+    Reads and throws away everything sent to a socket until it is closed.
+    '''
+    while connection.recv(65536):
+        pass
+
+def Main( arguments ):
+    turnCount = 100000
+    if len(arguments) > 0:
+        turnCount = int(arguments[0])
+    sharedWorld = FreezeWorld(python_adventure.roomList, python_adventure.objectList)
+
+    kept = []
+    nullFile = open(os.devnull, "wb", buffering=0)
+    sendEnd, receiveEnd = socket.socketpair()
+    drainThread = threading.Thread(target=DrainSocket, args=(receiveEnd,))
+    drainThread.start()
+
+    def KeepText( text ):
+        kept.append(text)
+        # Don't let the list grow forever.
+        if len(kept) > 1000:
+            kept.clear()
+
+    def WriteFile( text ):
+        nullFile.write(text.encode())
+
+    def SendText( text ):
+        sendEnd.sendall(text.encode())
+
+    sinks = [["list", KeepText], ["file", WriteFile], ["socket", SendText]]
+    print("%d turns per run" % turnCount)
+    print("%-8s %16s %16s %10s" % ("sink", "per-line turns/s", "per-turn turns/s", "speedup"))
+    for sinkName, sink in sinks:
+        lineSeconds = PlayTurns(turnCount, sharedWorld, LineOutput, sink)
+        turnSeconds = PlayTurns(turnCount, sharedWorld, OutputBuffer, sink)
+        print("%-8s %16.0f %16.0f %9.2fx" % (sinkName, turnCount / lineSeconds,
+                                              turnCount / turnSeconds, lineSeconds / turnSeconds))
+
+    sendEnd.close()
+    drainThread.join()
+    receiveEnd.close()
+    nullFile.close()
+
+if __name__ == "__main__":
+    Main(sys.argv[1:])
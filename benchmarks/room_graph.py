@@ -0,0 +1,85 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Room graph benchmark:  RoomGraph distances vs. a breadth-first search per question.
+
+Builds square grids of rooms of a few sizes, small enough for a RoomGraph to
+work out every distance ahead of time and big enough to need landmarks, and
+reports how long making the graph takes, how long a distance takes to look
+up compared with searching for it, and how long opening one new exit takes
+to catch up with compared with making the graph again.
+
+Run from the repository root:
+    python benchmarks/room_graph.py [biggest grid side] [questions]
+'''
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from python_adventure import SetRoomExit
+from adventure.graph import BuildRoomGraph, BreadthFirst, farAway
+from npc_scheduler import MakeGridWorld
+
+
+def Main( arguments ):
+    biggestSide = 300
+    questionCount = 200
+    if len(arguments) > 0:
+        biggestSide = int(arguments[0])
+    if len(arguments) > 1:
+        questionCount = int(arguments[1])
+
+    print("%8s %10s %10s %12s %12s %12s %12s" % ("rooms", "kind", "build s", "lookup us", "search us",
+                                                "new exit us", "rebuild s"))
+    side = 8
+    while side <= biggestSide:
+        roomList = MakeGridWorld(side, 0)[0]
+        roomCount = len(roomList)
+        rng = random.Random(side)
+        questions = [[rng.randrange(roomCount), rng.randrange(roomCount)] for questionNum in range(questionCount)]
+
+        startTime = time.perf_counter()
+        roomGraph = BuildRoomGraph(roomList)
+        buildSeconds = time.perf_counter() - startTime
+        kind = "all pairs" if roomGraph.distances is not None else "landmarks"
+
+        startTime = time.perf_counter()
+        for fromRoom, toRoom in questions:
+            roomGraph.GetDistance(fromRoom, toRoom)
+        lookupSeconds = (time.perf_counter() - startTime) / questionCount
+
+        # Without a graph, every question is a search of its own.  (Checks
+        # the answers while it's at it.)
+        startTime = time.perf_counter()
+        for fromRoom, toRoom in questions:
+            distance = BreadthFirst(fromRoom, roomGraph.neighbours, False)[0][toRoom]
+            if distance == farAway:
+                distance = -1
+            if distance != roomGraph.GetDistance(fromRoom, toRoom):
+                raise SystemExit("wrong distance from room %d to room %d" % (fromRoom, toRoom))
+        searchSeconds = (time.perf_counter() - startTime) / questionCount
+
+        # A shortcut from one corner of the grid to the middle, like the gate opening.
+        SetRoomExit(0, 0, roomCount // 2, roomList)
+        startTime = time.perf_counter()
+        roomGraph.UpdateRoom(0, roomList)
+        updateSeconds = time.perf_counter() - startTime
+        startTime = time.perf_counter()
+        BuildRoomGraph(roomList)
+        rebuildSeconds = time.perf_counter() - startTime
+
+        print("%8d %10s %10.3f %12.1f %12.1f %12.1f %12.3f" % (roomCount, kind, buildSeconds, lookupSeconds * 1e6,
+                                                               searchSeconds * 1e6, updateSeconds * 1e6, rebuildSeconds))
+        side *= 3
+
+if __name__ == "__main__":
+    Main(sys.argv[1:])
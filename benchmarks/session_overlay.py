@@ -0,0 +1,114 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Session benchmark:  per-session views of a shared world vs. deep copies.
+
+Freezes one synthetic world, then creates many sessions on it and has each
+of them play a few commands.  Reports how long creating a session takes and
+how much resident memory each session adds.  For comparison it also deep
+copies the world a few times, which is what running separate games used to
+need.
+
+Run from the repository root:
+    python benchmarks/session_overlay.py [sessions] [objects]
+'''
+
+import copy
+import gc
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from python_adventure import GameSession, StartGame, RunCommand, CompileRules
+from adventure.overlay import FreezeWorld, NewSessionWorld
+from world_memory import MakeListWorld
+
+
+# Enough to move the player, pick something up and change the world a little.
+sessionScript = ["look", "n", "take Thing1", "s", "examine Thing1"]
+
+# Deep copies are slow and big, so only a few are made.
+deepCopyCount = 3
+
+def CurrentRSS():
+    '''
+    Returns the resident memory of this process in bytes.
+    Falls back to the peak value where the current one isn't available.
+    '''
+    if os.path.exists("/proc/self/statm"):
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    # ru_maxrss is in kilobytes on Linux, but bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak
+    return peak * 1024
+
+def Main( arguments ):
+    sessionCount = 10000
+    objectCount = 100000
+    if len(arguments) > 0:
+        sessionCount = int(arguments[0])
+    if len(arguments) > 1:
+        objectCount = int(arguments[1])
+
+    world = MakeListWorld(objectCount)
+    sharedWorld = FreezeWorld(world[0], world[1])
+    # The built-in rules name the built-in objects, so this world has none.
+    noRules = CompileRules([], len(world[0]), world[1])
+    gc.collect()
+    print("world:  %d objects, %d rooms" % (objectCount, len(world[0])))
+
+    # Sessions on the shared world.
+    startRSS = CurrentRSS()
+    startTime = time.perf_counter()
+    sessions = []
+    for sessionNum in range(sessionCount):
+        sessionWorld = NewSessionWorld(sharedWorld[0], sharedWorld[1])
+        session = GameSession(sessionWorld[0], sessionWorld[1], noRules, random.Random(sessionNum))
+        sessions.append(session)
+    createSeconds = time.perf_counter() - startTime
+    createdRSS = CurrentRSS()
+
+    # Play a few turns in every session so each has some changes of its own.
+    startTime = time.perf_counter()
+    for session in sessions:
+        StartGame(session)
+        for action in sessionScript:
+            RunCommand(session, action)
+        # Nobody reads the output.
+        session.output.Take()
+    playSeconds = time.perf_counter() - startTime
+    playedRSS = CurrentRSS()
+
+    print("overlay sessions:  %d" % sessionCount)
+    print("  create:  %.3f s total, %.2f us per session" % (createSeconds, createSeconds / sessionCount * 1e6))
+    print("  RSS after create:  %.0f bytes per session" % ((createdRSS - startRSS) / sessionCount))
+    print("  play %d commands each:  %.3f s total" % (len(sessionScript), playSeconds))
+    print("  RSS after play:  %.0f bytes per session" % ((playedRSS - startRSS) / sessionCount))
+    del sessions
+    gc.collect()
+
+    # The old way:  every game gets its own copy of the world.
+    startRSS = CurrentRSS()
+    startTime = time.perf_counter()
+    copies = []
+    for copyNum in range(deepCopyCount):
+        copies.append(copy.deepcopy(world))
+    copySeconds = time.perf_counter() - startTime
+    copiedRSS = CurrentRSS()
+    print("deep copied worlds:  %d" % deepCopyCount)
+    print("  create:  %.0f us per session" % (copySeconds / deepCopyCount * 1e6))
+    print("  RSS:  %.0f bytes per session" % ((copiedRSS - startRSS) / deepCopyCount))
+
+if __name__ == "__main__":
+    Main(sys.argv[1:])
@@ -0,0 +1,107 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Sharding benchmark:  commands per second against the number of shards.
+
+Starts the plain server (adventure/server.py), then the sharded one
+(adventure/shards.py) with 1 shard up to the given number, and has many
+clients play the built-in world's winning game over and over, one command
+at a time, for a few seconds each.  Reports how many commands a second got
+answered.
+
+The clients run in this process, alongside the front end, so with only a
+core or two they take a good share of the time, and the shards can't help.
+Sharding pays off with more cores than shards, and with worlds big enough
+that a turn is real work.
+
+Run from the repository root:
+    python benchmarks/shard_scaling.py [most shards] [clients] [seconds]
+'''
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from adventure.game import promptString
+from adventure.builtin import roomList, objectList, gameRules
+from adventure.overlay import FreezeWorld
+from adventure.server import StartServer
+from adventure.shards import StartShardedServer
+
+
+# A winning game in the built-in world.  The creature can get in the way
+# now and then, which only makes the game shorter.
+winningGame = ["e", "n", "take onion", "s", "e", "s", "use onion", "i", "n", "e", "use key",
+               "look", "e"]
+
+prompt = promptString.encode()
+
+
+async def PlayGames( port, stopTime, counts ):
+    '''
+    Plays one game after another until stopTime, counting every command answered.
+    '''
+    while time.perf_counter() < stopTime:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            await reader.readuntil(prompt)
+            for action in winningGame:
+                writer.write((action + "\n").encode())
+                await writer.drain()
+                await reader.readuntil(prompt)
+                counts[0] += 1
+        except asyncio.IncompleteReadError:
+            # The game ended early.
+            counts[0] += 1
+        finally:
+            writer.close()
+
+async def TimeServer( port, clientCount, seconds ):
+    '''
+    Returns commands answered per second.
+    '''
+    counts = [0]
+    startTime = time.perf_counter()
+    await asyncio.gather(*[PlayGames(port, startTime + seconds, counts) for clientNum in range(clientCount)])
+    return counts[0] / (time.perf_counter() - startTime)
+
+async def RunBenchmark( mostShards, clientCount, seconds ):
+    sharedWorld = FreezeWorld(roomList, objectList)
+    server = await StartServer("127.0.0.1", 0, sharedWorld[0], sharedWorld[1], gameRules, None, False)
+    commandRate = await TimeServer(server.sockets[0].getsockname()[1], clientCount, seconds)
+    server.close()
+    await server.wait_closed()
+    print("%-16s %12.0f" % ("plain server", commandRate))
+
+    for shardCount in range(1, mostShards + 1):
+        shardedServer, server = await StartShardedServer("127.0.0.1", 0, None, shardCount, False)
+        commandRate = await TimeServer(server.sockets[0].getsockname()[1], clientCount, seconds)
+        server.close()
+        await server.wait_closed()
+        await shardedServer.Close()
+        print("%-16s %12.0f" % ("%d shards" % shardCount, commandRate))
+
+def Main( arguments ):
+    mostShards = os.cpu_count() or 1
+    clientCount = 50
+    seconds = 3.0
+    if len(arguments) > 0:
+        mostShards = int(arguments[0])
+    if len(arguments) > 1:
+        clientCount = int(arguments[1])
+    if len(arguments) > 2:
+        seconds = float(arguments[2])
+    print("%d cores, %d clients, %.0f seconds each" % (os.cpu_count() or 1, clientCount, seconds))
+    print("%-16s %12s" % ("", "commands/s"))
+    asyncio.run(RunBenchmark(mostShards, clientCount, seconds))
+
+if __name__ == "__main__":
+    Main(sys.argv[1:])
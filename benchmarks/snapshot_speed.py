@@ -0,0 +1,90 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Snapshot benchmark:  how long SaveSnapshot and LoadSnapshot take.
+
+Plays a few turns on a synthetic world, then saves and loads the session
+over and over.  Each loaded session is checked against the original, so
+this doubles as a round-trip check.
+
+Run from the repository root:
+    python benchmarks/snapshot_speed.py [objects] [repeats]
+'''
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from python_adventure import GameSession, StartGame, RunCommand, \
+    SetObjectLocation, SetObjectStatus, SetRoomExit, SetObjectName, CompileRules
+from adventure.overlay import FreezeWorld, NewSessionWorld, ExportSessionDelta
+from adventure.snapshot import SaveSnapshot, LoadSnapshot
+from world_memory import MakeListWorld
+
+
+sessionScript = ["look", "n", "take Thing1", "s", "examine Thing1"]
+
+def SessionState( session ):
+    '''
+    Returns everything a snapshot is supposed to keep, for comparing sessions.
+    '''
+    return [session.playerRoom, session.gameTurn, session.encounter,
+            session.newLook, session.finished, session.outcome, list(session.playerInventory),
+            session.rng.getstate(), ExportSessionDelta(session.roomList, session.objectList)]
+
+def Main( arguments ):
+    objectCount = 100000
+    repeats = 1000
+    if len(arguments) > 0:
+        objectCount = int(arguments[0])
+    if len(arguments) > 1:
+        repeats = int(arguments[1])
+
+    world = MakeListWorld(objectCount)
+    sharedWorld = FreezeWorld(world[0], world[1])
+    # The built-in rules name the built-in objects, so this world has none.
+    noRules = CompileRules([], len(world[0]), world[1])
+    sessionWorld = NewSessionWorld(sharedWorld[0], sharedWorld[1])
+    session = GameSession(sessionWorld[0], sessionWorld[1], noRules, random.Random(1))
+    StartGame(session)
+    for action in sessionScript:
+        RunCommand(session, action)
+    session.output.Take()
+    # A busier game than the script alone:  lots of things moved around.
+    for objectID in range(0, objectCount, max(1, objectCount // 200)):
+        SetObjectLocation(objectID, objectID % 7, session.objectList)
+        SetObjectStatus(objectID, 0, session.objectList)
+    SetRoomExit(0, 3, 1, session.roomList)
+    SetObjectName(2, "Renamed", session.objectList)
+    session.rng.gauss(0, 1)
+
+    expected = SessionState(session)
+    snapshot = SaveSnapshot(session)
+    print("world:  %d objects;  snapshot:  %d bytes" % (objectCount, len(snapshot)))
+
+    startTime = time.perf_counter()
+    for repeat in range(repeats):
+        snapshot = SaveSnapshot(session)
+    saveSeconds = (time.perf_counter() - startTime) / repeats
+
+    startTime = time.perf_counter()
+    for repeat in range(repeats):
+        loaded = LoadSnapshot(snapshot, sharedWorld[0], sharedWorld[1], noRules)
+    loadSeconds = (time.perf_counter() - startTime) / repeats
+
+    if SessionState(loaded) != expected:
+        raise SystemExit("loaded session does not match the saved one")
+    print("save:  %.1f us" % (saveSeconds * 1e6))
+    print("load:  %.1f us" % (loadSeconds * 1e6))
+    print("round trip:  ok")
+
+if __name__ == "__main__":
+    Main(sys.argv[1:])
@@ -0,0 +1,100 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Startup benchmark:  how long importing the game takes, and that it does nothing else.
+
+Imports each module in a fresh interpreter with nothing to read on stdin,
+and reports how long the import took and how many modules it loaded.  Also
+checks that importing it didn't print anything, didn't wait for input, and
+didn't build the built-in world, and times building that world the first
+time it is asked for.
+
+Exits with status 1 if an engine module (the ones a server, a test or a
+worker process imports to play games) does any of those things, or takes
+longer than the limit to import.
+
+Run from the repository root:
+    python benchmarks/startup.py [limit ms] [runs]
+'''
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+repositoryRoot = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+# The modules a worker imports to play games, and other entry points for comparison.
+engineModules = ["adventure", "adventure.data", "adventure.commands", "adventure.rules",
+                 "adventure.game", "python_adventure"]
+otherModules = ["adventure.replay", "adventure.batch", "adventure.server"]
+
+# Reports on stderr, so that anything the import itself prints shows up on stdout.
+importProgram = '''
+import json, sys, time
+moduleCount = len(sys.modules)
+startTime = time.perf_counter()
+import %s
+importSeconds = time.perf_counter() - startTime
+worldBuilt = "adventure.builtin" in sys.modules
+startTime = time.perf_counter()
+from adventure.rules import GetGameRules
+GetGameRules()
+worldSeconds = time.perf_counter() - startTime
+sys.stderr.write(json.dumps([importSeconds, len(sys.modules) - moduleCount, worldBuilt, worldSeconds]))
+'''
+
+def TimeImport( moduleName, runCount ):
+    '''
+    Returns [median import seconds, modules loaded, printed, world built, median world seconds].
+    Raises subprocess.TimeoutExpired if the import hangs (waiting for input, say).
+    '''
+    importSeconds = []
+    worldSeconds = []
+    for runNum in range(runCount):
+        result = subprocess.run([sys.executable, "-c", importProgram % moduleName], cwd=repositoryRoot,
+                                check=True, timeout=30, stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        report = json.loads(result.stderr)
+        importSeconds.append(report[0])
+        worldSeconds.append(report[3])
+    return [statistics.median(importSeconds), report[1], len(result.stdout) > 0, report[2],
+            statistics.median(worldSeconds)]
+
+def Main( arguments ):
+    limitSeconds = 0.02
+    runCount = 7
+    if len(arguments) > 0:
+        limitSeconds = float(arguments[0]) / 1000
+    if len(arguments) > 1:
+        runCount = int(arguments[1])
+
+    print("%-20s %10s %8s %8s %8s %10s" % ("module", "import ms", "modules", "printed", "world", "world ms"))
+    failures = []
+    for moduleName in engineModules + otherModules:
+        try:
+            importSeconds, moduleCount, printed, worldBuilt, worldSeconds = TimeImport(moduleName, runCount)
+        except subprocess.TimeoutExpired:
+            print("%-20s  hung (waiting for input?)" % moduleName)
+            failures.append(moduleName)
+            continue
+        print("%-20s %10.2f %8d %8s %8s %10.2f" % (moduleName, importSeconds * 1e3, moduleCount,
+                                                   "yes" if printed else "no", "built" if worldBuilt else "lazy",
+                                                   worldSeconds * 1e3))
+        if moduleName in engineModules and (printed or worldBuilt or importSeconds > limitSeconds):
+            failures.append(moduleName)
+    if len(failures) > 0:
+        print("Too slow or not side effect free (limit %.0f ms):  %s" % (limitSeconds * 1e3, ", ".join(failures)))
+        return 1
+    print("Every engine module imports in under %.0f ms with no side effects." % (limitSeconds * 1e3))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(Main(sys.argv[1:]))
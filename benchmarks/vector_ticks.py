@@ -0,0 +1,101 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Tick benchmark:  RunTick (one object at a time) vs. RunTickVectorized (NumPy).
+
+Builds compact worlds of 10 thousand to 1 million objects on a grid of
+rooms, where every object has a couple of timers and a quarter of them
+wander.  Runs the same ticks both ways from the same random seed, checks
+that both worlds end up exactly the same, and reports the time per tick.
+
+Needs NumPy.
+
+Run from the repository root:
+    python benchmarks/vector_ticks.py [most objects] [ticks]
+'''
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from python_adventure import GetObjectsInRoom
+from adventure.compact import BuildCompactWorld
+from adventure.ticks import TickPlan, RunTick, RunTickVectorized, numpy
+from npc_scheduler import MakeGridWorld
+
+
+# Objects per room, how many objects in each wander, and how many turns apart their timers are.
+objectsPerRoom = 4
+wanderEvery = 4
+timerSpacing = 3
+
+def MakePlan( objectCount ):
+    '''
+    Returns a TickPlan where every object's status goes to 1 and back to 0
+    on turns spread over the first few, and every wanderEvery'th object wanders.
+    '''
+    plan = TickPlan()
+    for objectID in range(objectCount):
+        firstTurn = 1 + objectID % timerSpacing
+        plan.AddTimer(objectID, firstTurn, 1)
+        plan.AddTimer(objectID, firstTurn + timerSpacing, 0)
+        if objectID % wanderEvery == 0:
+            plan.AddWanderer(objectID)
+    return plan
+
+def TimeTicks( tickFunction, plan, world, tickCount, seed ):
+    '''
+    Returns the average seconds per tick.
+    '''
+    rng = numpy.random.default_rng(seed)
+    startTime = time.perf_counter()
+    for turn in range(1, tickCount + 1):
+        tickFunction(plan, world[0], world[1], turn, rng)
+    return (time.perf_counter() - startTime) / tickCount
+
+def SameWorld( world, otherWorld ):
+    if world[1].locations != otherWorld[1].locations or world[1].statuses != otherWorld[1].statuses:
+        return False
+    # Down to the order of each room's objects.
+    for roomID in range(-2, len(world[0])):
+        if GetObjectsInRoom(roomID, world[1]) != GetObjectsInRoom(roomID, otherWorld[1]):
+            return False
+    return True
+
+def Main( arguments ):
+    if numpy is None:
+        raise SystemExit("this benchmark needs NumPy")
+    mostObjects = 1000000
+    tickCount = 6
+    if len(arguments) > 0:
+        mostObjects = int(arguments[0])
+    if len(arguments) > 1:
+        tickCount = int(arguments[1])
+
+    print("%d ticks, 1 in %d objects wandering" % (tickCount, wanderEvery))
+    print("%10s %14s %14s %10s" % ("objects", "scalar ms", "vector ms", "speedup"))
+    objectCount = 10000
+    while objectCount <= mostObjects:
+        side = max(1, int((objectCount / objectsPerRoom) ** 0.5))
+        listWorld = MakeGridWorld(side, objectCount)
+        plan = MakePlan(objectCount)
+        scalarWorld = BuildCompactWorld(listWorld[0], listWorld[1])
+        vectorWorld = BuildCompactWorld(listWorld[0], listWorld[1])
+        del listWorld
+        scalarSeconds = TimeTicks(RunTick, plan, scalarWorld, tickCount, objectCount)
+        vectorSeconds = TimeTicks(RunTickVectorized, plan, vectorWorld, tickCount, objectCount)
+        if not SameWorld(scalarWorld, vectorWorld):
+            raise SystemExit("the vectorized ticks didn't match the scalar ones")
+        print("%10d %14.2f %14.2f %9.1fx" % (objectCount, scalarSeconds * 1e3, vectorSeconds * 1e3,
+                                             scalarSeconds / vectorSeconds))
+        objectCount *= 10
+
+if __name__ == "__main__":
+    Main(sys.argv[1:])
@@ -0,0 +1,63 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+World generator benchmark:  how fast made-up worlds stream out, and in how much memory.
+
+Writes maze worlds (with a couple of things per room, some NPCs and a gate
+for every thousand rooms) of 10 thousand rooms and up to a scratch file,
+and reports how long that took, how big the file is, and the most memory
+generating it needed at any one time.  That only grows with the number of
+gates, which the plan keeps a list of, not with the number of rooms.
+Watching the memory is slow, so the biggest world is 100 thousand rooms
+unless you ask for more.
+
+Run from the repository root:
+    python benchmarks/world_generator.py [most rooms] [shape]
+'''
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from adventure.generate import WorldPlan, WriteWorld
+
+
+def Main( arguments ):
+    mostRooms = 100000
+    shape = "maze"
+    if len(arguments) > 0:
+        mostRooms = int(arguments[0])
+    if len(arguments) > 1:
+        shape = arguments[1]
+
+    print("%10s %10s %12s %14s %14s" % ("rooms", "seconds", "rooms/s", "file bytes", "peak bytes"))
+    roomCount = 10000
+    with tempfile.TemporaryDirectory() as scratch:
+        worldFileName = os.path.join(scratch, "world.json")
+        while roomCount <= mostRooms:
+            plan = WorldPlan(1, roomCount, shape, 2.0, 2, roomCount // 100, roomCount // 1000)
+            startTime = time.perf_counter()
+            with open(worldFileName, "w", encoding="utf-8") as worldFile:
+                WriteWorld(plan, worldFile)
+            seconds = time.perf_counter() - startTime
+            # Again, watching memory this time (which slows it down).
+            tracemalloc.start()
+            with open(worldFileName, "w", encoding="utf-8") as worldFile:
+                WriteWorld(plan, worldFile)
+            peakBytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print("%10d %10.2f %12.0f %14d %14d" % (roomCount, seconds, roomCount / seconds,
+                                                    os.path.getsize(worldFileName), peakBytes))
+            roomCount *= 10
+
+if __name__ == "__main__":
+    Main(sys.argv[1:])
@@ -0,0 +1,79 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+World loading benchmark:  cold vs. warm starts of a big world file.
+
+Writes a synthetic world file, then times loading it with no cache (parse,
+check, build indexes and write the cache), loading it again from the cache,
+and for comparison just parsing the JSON.
+
+Run from the repository root:
+    python benchmarks/world_loading.py [rooms] [objects per room]
+'''
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from adventure.world import ExportWorld, LoadWorld, GetCacheFile
+from world_memory import MakeListWorld
+
+
+def TimeCall( function, arguments ):
+    '''
+    Returns [result, seconds] for one call.
+    '''
+    startTime = time.perf_counter()
+    result = function(*arguments)
+    return [result, time.perf_counter() - startTime]
+
+def ReadJSON( worldFile ):
+    with open(worldFile, "rb") as source:
+        return json.loads(source.read())
+
+def Main( arguments ):
+    roomCount = 100000
+    objectsPerRoom = 1
+    if len(arguments) > 0:
+        roomCount = int(arguments[0])
+    if len(arguments) > 1:
+        objectsPerRoom = int(arguments[1])
+
+    # MakeListWorld makes one room for every ten objects.
+    world = MakeListWorld(roomCount * 10)
+    world[1] = world[1][:roomCount * objectsPerRoom]
+    workDirectory = tempfile.mkdtemp()
+    try:
+        worldFile = os.path.join(workDirectory, "world.json")
+        with open(worldFile, "w", encoding="utf-8") as output:
+            json.dump(ExportWorld(world[0], world[1], []), output)
+        del world
+        print("world:  %d rooms, %d objects, %.1f MB of JSON" %
+              (roomCount, roomCount * objectsPerRoom, os.path.getsize(worldFile) / 1e6))
+
+        loaded, parseSeconds = TimeCall(ReadJSON, [worldFile])
+        del loaded
+        loaded, coldSeconds = TimeCall(LoadWorld, [worldFile, True])
+        del loaded
+        cacheFile = GetCacheFile(worldFile)
+        print("cache:  %.1f MB" % (os.path.getsize(cacheFile) / 1e6))
+        loaded, warmSeconds = TimeCall(LoadWorld, [worldFile, True])
+        print("  json.loads only:                 %7.3f s" % parseSeconds)
+        print("  cold (parse, check, index, save): %7.3f s" % coldSeconds)
+        print("  warm (hash source, unpickle):     %7.3f s" % warmSeconds)
+        print("  speedup:  %.1fx" % (coldSeconds / warmSeconds))
+    finally:
+        shutil.rmtree(workDirectory)
+
+if __name__ == "__main__":
+    Main(sys.argv[1:])
@@ -0,0 +1,111 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Memory benchmark:  list-of-lists world data vs. adventure.compact storage.
+
+Builds a synthetic world in the same layout as roomList/objectList, measures
+how much memory it takes (on its own, and with the same name and room
+indexes that python_adventure.ObjectList adds), then converts it to compact
+storage and measures that too.  The compact numbers always include its
+indexes.
+
+Run from the repository root:
+    python benchmarks/world_memory.py
+    python benchmarks/world_memory.py 10000 100000
+'''
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from python_adventure import ObjectList
+from adventure.compact import BuildCompactWorld
+
+
+# A handful of shared texts, the way a real world reuses the same few lines.
+descriptionTemplates = [
+    "It looks like any other %s you have seen before." % thing for thing in
+    ["rock", "stick", "coin", "bone", "feather", "shell", "leaf", "nail", "button", "pebble"]]
+statusTemplates = [
+    ["It is closed.", "It is open."],
+    ["It is cold.", "It is warm.", "It is hot."],
+    []]
+
+def FreshCopy( text ):
+    '''
+    Returns an equal but separate string object, which is what reading the
+    same text out of a data file many times would give you.
+    '''
+    return (text + " ")[:-1]
+
+def MakeListWorld( objectCount ):
+    '''
+    Returns [roomList, objectList] for a world with the given number of objects,
+    spread across one room for every ten objects.
+    '''
+    roomCount = max(1, objectCount // 10)
+    roomList = []
+    for roomID in range(roomCount):
+        roomList.append([
+            "You are in room %d." % roomID,
+            [(roomID + 1) % roomCount, -1, (roomID - 1) % roomCount, -1]])
+    objectList = []
+    for objectID in range(objectCount):
+        statusStrings = statusTemplates[objectID % len(statusTemplates)]
+        objectList.append([
+            "Thing%d" % objectID,
+            ["Item%d" % objectID, "Object%d" % objectID],
+            FreshCopy(descriptionTemplates[objectID % len(descriptionTemplates)]),
+            objectID % roomCount,
+            objectID % 3 == 0,
+            objectID % 5 == 0,
+            0 if len(statusStrings) > 0 else -1,
+            FreshCopy("You use it."),
+            FreshCopy("You take it."),
+            [FreshCopy(text) for text in statusStrings]])
+    return [roomList, objectList]
+
+def MeasureWorld( objectCount ):
+    '''
+    Returns [listBytes, indexedListBytes, compactBytes, buildSeconds] for one world size.
+    '''
+    gc.collect()
+    tracemalloc.start()
+    startBytes = tracemalloc.get_traced_memory()[0]
+    world = MakeListWorld(objectCount)
+    listBytes = tracemalloc.get_traced_memory()[0] - startBytes
+    indexedObjectList = ObjectList(world[1])
+    indexedListBytes = tracemalloc.get_traced_memory()[0] - startBytes
+    del indexedObjectList
+    buildStart = time.perf_counter()
+    compactWorld = BuildCompactWorld(world[0], world[1])
+    buildSeconds = time.perf_counter() - buildStart
+    # Drop the lists.  Anything still traced belongs to the compact world.
+    del world
+    gc.collect()
+    compactBytes = tracemalloc.get_traced_memory()[0] - startBytes
+    tracemalloc.stop()
+    del compactWorld
+    return [listBytes, indexedListBytes, compactBytes, buildSeconds]
+
+def Main( arguments ):
+    sizes = [int(size) for size in arguments] or [10000, 100000, 1000000]
+    print("%10s  %14s  %14s  %14s  %7s  %9s" % (
+        "objects", "list bytes", "+indexes", "compact bytes", "ratio", "build s"))
+    for objectCount in sizes:
+        listBytes, indexedListBytes, compactBytes, buildSeconds = MeasureWorld(objectCount)
+        print("%10d  %14d  %14d  %14d  %6.2fx  %9.3f" % (
+            objectCount, listBytes, indexedListBytes, compactBytes,
+            indexedListBytes / compactBytes, buildSeconds))
+
+if __name__ == "__main__":
+    Main(sys.argv[1:])
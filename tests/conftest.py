@@ -0,0 +1,47 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Shared pieces for the tests.
+
+Run from the repository root:
+    python -m pytest tests
+'''
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from adventure.builtin import roomList, objectList, gameRules
+from adventure.overlay import FreezeWorld
+from adventure.replay import NewReplaySession
+
+
+# The built-in world's winning game.
+winningGame = ["e", "n", "take onion", "s", "e", "s", "use onion", "i", "n", "e", "use key",
+               "look", "e"]
+
+
+@pytest.fixture(scope="session")
+def sharedWorld():
+    '''
+    [roomList, objectList, ruleBook] of the built-in world, frozen for sessions to share.
+    '''
+    frozen = FreezeWorld(roomList, objectList)
+    return [frozen[0], frozen[1], gameRules]
+
+@pytest.fixture
+def newSession( sharedWorld ):
+    '''
+    Makes fresh sessions on the shared world, each seeded the same way.
+    '''
+    def NewSession( seed ):
+        return NewReplaySession(seed, sharedWorld[0], sharedWorld[1], sharedWorld[2])
+    return NewSession
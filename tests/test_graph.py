@@ -0,0 +1,69 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Room graphs (adventure/graph.py) keep up with exits that change during a
+game, and NPCs hunting by one never walk through an exit that isn't there.
+'''
+
+import random
+
+from adventure.data import RoomList, GetObjectID, GetObjectLocation, SetRoomExit, inventoryLocation
+from adventure.game import GameSession, StartGame, RunCommand
+from adventure.graph import BuildRoomGraph
+from adventure.npc import MoveTable, NpcScheduler
+from adventure.overlay import FreezeWorld, NewSessionWorld
+from adventure.rules import CompileRules
+
+
+# Rooms 0 <-> 1 <-> 2, joined east to west.
+hallRooms = [
+    ["You are in the west room.", [-1, 1, -1, -1]],
+    ["You are in the middle room.", [-1, 2, -1, 0]],
+    ["You are in the east room.", [-1, -1, -1, 1]]]
+
+# Pulling the lever closes the west room's only exit.
+hallObjects = [
+    ["Lever", [], "A lever.", inventoryLocation, True, True, 0, "Something slams shut.", "", ["", ""]],
+    ["Beast", [], "A beast.", 0, False, False, 1, "", "", ["A calm beast.", "A hungry beast."]]]
+
+hallRules = [{"when": "use", "object": "Lever", "then": [["setExit", 0, 1, -1], ["useMessage", "Lever"]]}]
+
+def testHunterStaysBehindAClosedExit():
+    shared = FreezeWorld(hallRooms, hallObjects)
+    sessionWorld = NewSessionWorld(shared[0], shared[1])
+    rules = CompileRules(hallRules, len(hallRooms), shared[1])
+    session = GameSession(sessionWorld[0], sessionWorld[1], rules, random.Random(1))
+    session.playerRoom = 2
+    beast = GetObjectID("Beast", session.objectList)
+    session.npcs = NpcScheduler(MoveTable(shared[0]), 3)
+    session.npcs.roomGraph = BuildRoomGraph(session.roomList)
+    session.npcs.AddNpc(beast, 1, 1)
+    StartGame(session)
+
+    RunCommand(session, "use lever")
+    for turn in range(4):
+        RunCommand(session, "look")
+        assert GetObjectLocation(beast, session.objectList) == 0
+    session.output.Take()
+    assert session.npcs.roomGraph.GetDistance(0, 2) == -1
+    assert session.npcs.roomGraph.GetDirectionTo(0, 2, session.roomList) == -1
+
+def testStaleGraphGivesNoDirection():
+    rooms = RoomList([[description, list(exits)] for description, exits in hallRooms])
+    roomGraph = BuildRoomGraph(rooms)
+    SetRoomExit(0, 1, -1, rooms)
+    # The graph hasn't caught up yet, but won't point through a wall.
+    assert roomGraph.GetNextHop(0, 2) == 1
+    assert roomGraph.GetDirectionTo(0, 2, rooms) == -1
+
+    roomGraph.CatchUp(rooms)
+    assert roomGraph.GetNextHop(0, 2) == -1
+    SetRoomExit(0, 1, 1, rooms)
+    roomGraph.CatchUp(rooms)
+    assert roomGraph.GetDistance(0, 2) == 2
+    assert roomGraph.GetDirectionTo(0, 2, rooms) == 1
@@ -0,0 +1,195 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+The game journal (adventure/journal.py):  unfinished games come back from
+it as they were, a torn last record is left out, only the right token
+resumes a game, and a failed write loses nothing.
+'''
+
+import asyncio
+import os
+
+import pytest
+
+from adventure.game import StartGame, RunCommandLine
+from adventure.snapshot import SaveSnapshot
+from adventure.journal import Journal, RecoverSessions, StartJournal, ReadJournal, NewResumeToken
+
+from conftest import winningGame
+
+
+def JournaledGames( newSession, journal, gameCount, commandCount ):
+    '''
+    Plays gameCount games commandCount commands into the winning game, and
+    syncs the journal.  Returns a dictionary of sessionID -> GameSession.
+    '''
+    sessions = {}
+    for gameNum in range(gameCount):
+        sessionID = journal.NewSessionID()
+        session = newSession(gameNum)
+        StartGame(session)
+        journal.RecordSnapshot(sessionID, session)
+        journal.RecordToken(sessionID, NewResumeToken())
+        for action in winningGame[:commandCount]:
+            RunCommandLine(session, action)
+            journal.RecordCommand(sessionID, session, action)
+        session.output.Take()
+        sessions[sessionID] = session
+    journal.Sync()
+    return sessions
+
+def Recover( journalFileName, sharedWorld ):
+    return RecoverSessions(journalFileName, sharedWorld[0], sharedWorld[1], sharedWorld[2], False)
+
+def testRecoveryRebuildsUnfinishedGames( newSession, sharedWorld, tmp_path ):
+    journalFileName = str(tmp_path / "games.journal")
+    journal = Journal(open(journalFileName, "wb"), 3)
+    sessions = JournaledGames(newSession, journal, 4, 8)
+    journal.Close()
+
+    recovered, tokens, problems = Recover(journalFileName, sharedWorld)
+    assert problems == []
+    assert sorted(recovered) == sorted(sessions)
+    assert tokens == journal.tokens
+    for sessionID, session in sessions.items():
+        assert SaveSnapshot(recovered[sessionID]) == SaveSnapshot(session)
+
+def testFinishedAndEndedGamesStayGone( newSession, sharedWorld, tmp_path ):
+    journalFileName = str(tmp_path / "games.journal")
+    journal = Journal(open(journalFileName, "wb"), 50)
+    sessions = JournaledGames(newSession, journal, 3, 4)
+    journal.RecordEnd(1)
+    finished = sessions[2]
+    RunCommandLine(finished, "exit")
+    journal.RecordCommand(2, finished, "exit")
+    journal.Close()
+
+    recovered, tokens, problems = Recover(journalFileName, sharedWorld)
+    assert sorted(recovered) == [3]
+    assert sorted(tokens) == [3]
+
+def testTornLastRecordIsLeftOut( newSession, sharedWorld, tmp_path ):
+    journalFileName = str(tmp_path / "games.journal")
+    journal = Journal(open(journalFileName, "wb"), 50)
+    sessions = JournaledGames(newSession, journal, 1, 5)
+    before = SaveSnapshot(sessions[1])
+    RunCommandLine(sessions[1], winningGame[5])
+    journal.RecordCommand(1, sessions[1], winningGame[5])
+    journal.Close()
+
+    # Cut the last record off part way, as a crash in the middle of writing it would.
+    records, goodLength = ReadJournal(journalFileName)
+    with open(journalFileName, "r+b") as journalFile:
+        journalFile.truncate(goodLength - 3)
+    recovered, tokens, problems = Recover(journalFileName, sharedWorld)
+    assert len(problems) == 1
+    assert SaveSnapshot(recovered[1]) == before
+
+    # And garbage after the last whole record is ignored too.
+    with open(journalFileName, "ab") as journalFile:
+        journalFile.write(b"\x40\x00\x00\x00garbage")
+    recovered, tokens, problems = Recover(journalFileName, sharedWorld)
+    assert len(problems) == 1
+    assert SaveSnapshot(recovered[1]) == before
+
+def testRestartKeepsGamesAndTokens( newSession, sharedWorld, tmp_path ):
+    journalFileName = str(tmp_path / "games.journal")
+    journal = Journal(open(journalFileName, "wb"), 50)
+    sessions = JournaledGames(newSession, journal, 2, 6)
+    tokens = dict(journal.tokens)
+    journal.Close()
+
+    recovered, recoveredTokens, problems = Recover(journalFileName, sharedWorld)
+    journal = StartJournal(journalFileName, recovered, recoveredTokens, 50, 0.0)
+    assert journal.nextSessionID == 3
+    assert sorted(journal.detached) == [1, 2]
+    journal.Close()
+    recovered, recoveredTokens, problems = Recover(journalFileName, sharedWorld)
+    assert recoveredTokens == tokens
+    assert SaveSnapshot(recovered[2]) == SaveSnapshot(sessions[2])
+
+def testResumeNeedsTheRightToken( newSession, sharedWorld, tmp_path ):
+    journal = Journal(open(str(tmp_path / "games.journal"), "wb"), 50)
+    sessions = JournaledGames(newSession, journal, 2, 3)
+    for sessionID, session in sessions.items():
+        journal.Detach(sessionID, session, 0.0)
+
+    assert journal.Resume(1, journal.tokens[2]) is None
+    assert journal.Resume(1, "") is None
+    assert journal.Resume(1, "é") is None
+    assert journal.Resume(7, journal.tokens[1]) is None
+    assert journal.Resume(1, journal.tokens[1]) is sessions[1]
+    # Once resumed, it isn't waiting any more.
+    assert journal.Resume(1, journal.tokens[1]) is None
+    journal.Close()
+
+def testIdleDetachedGamesExpire( newSession, sharedWorld, tmp_path ):
+    journalFileName = str(tmp_path / "games.journal")
+    journal = Journal(open(journalFileName, "wb"), 50)
+    sessions = JournaledGames(newSession, journal, 3, 3)
+    journal.Detach(1, sessions[1], 10.0)
+    journal.Detach(2, sessions[2], 20.0)
+    journal.Detach(3, sessions[3], 30.0)
+
+    assert journal.ExpireDetached(25.0, 10.0) == 1
+    assert sorted(journal.detached) == [2, 3]
+    assert journal.ExpireDetached(40.0, 10.0) == 2
+    assert journal.detached == {}
+    journal.Close()
+
+    recovered, tokens, problems = Recover(journalFileName, sharedWorld)
+    assert recovered == {}
+
+
+class FailingFile:
+    '''
+    A journal file whose next few writes fail, as on a full disk.
+    '''
+    __slots__ = ("journalFile", "failures")
+
+    def __init__( self, journalFile, failures ):
+        self.journalFile = journalFile
+        self.failures = failures
+
+    def write( self, data ):
+        if self.failures > 0:
+            self.failures -= 1
+            # Some of it gets written before the disk fills up.
+            self.journalFile.write(data[:len(data) // 2])
+            raise OSError("no space left on device")
+        return self.journalFile.write(data)
+
+    def __getattr__( self, name ):
+        return getattr(self.journalFile, name)
+
+def testFailedSyncKeepsItsRecords( newSession, sharedWorld, tmp_path ):
+    journalFileName = str(tmp_path / "games.journal")
+    journal = Journal(open(journalFileName, "wb"), 50)
+    sessions = JournaledGames(newSession, journal, 1, 2)
+    session = sessions[1]
+    durableCount = journal.durableCount
+    journal.journalFile = FailingFile(journal.journalFile, 1)
+
+    async def PlayAndWait( action ):
+        RunCommandLine(session, action)
+        await journal.WaitUntilDurable(journal.RecordCommand(1, session, action))
+
+    with pytest.raises(OSError):
+        asyncio.run(PlayAndWait(winningGame[2]))
+    assert journal.durableCount == durableCount
+    assert len(journal.pending) == 1
+    # The half-written record was cut off again.
+    assert ReadJournal(journalFileName)[1] == os.path.getsize(journalFileName)
+
+    # Once the disk works again, the next sync writes it after all.
+    asyncio.run(PlayAndWait(winningGame[3]))
+    assert journal.durableCount == journal.appendedCount
+    journal.Close()
+    recovered, tokens, problems = Recover(journalFileName, sharedWorld)
+    assert problems == []
+    assert SaveSnapshot(recovered[1]) == SaveSnapshot(session)
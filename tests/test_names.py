@@ -0,0 +1,88 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Forgiving object names (adventure/names.py):  prefixes pick out one object
+in reach, near misses are suggested, and an empty name picks out nothing.
+The servers and the journal use them when asked to.
+'''
+
+from adventure.data import GetObjectID
+from adventure.game import StartGame, RunCommand, RunCommandLine
+from adventure.journal import Journal, RecoverSessions
+from adventure.names import NameResolver
+from adventure.server import NewSession
+from adventure.shards import CarryOutMessage, openMessage, lineMessage
+from adventure.snapshot import SaveSnapshot
+
+
+def ResolvingSession( newSession, commands ):
+    session = newSession(0)
+    session.names = NameResolver(2, 64)
+    StartGame(session)
+    for action in commands:
+        RunCommand(session, action)
+    session.output.Take()
+    return session
+
+def Reply( session, action ):
+    RunCommand(session, action)
+    return session.output.Take()
+
+def testPrefixPicksOutTheOneObjectInReach( newSession ):
+    session = ResolvingSession(newSession, ["e", "n"])
+    onion = GetObjectID("Onion", session.objectList)
+    assert session.names.Resolve("oni", session.playerRoom, session.objectList) == [onion, []]
+    Reply(session, "take oni")
+    assert onion in session.playerInventory
+
+def testNearMissIsSuggested( newSession ):
+    session = ResolvingSession(newSession, ["e", "n"])
+    onion = GetObjectID("Onion", session.objectList)
+    assert session.names.Resolve("onoin", session.playerRoom, session.objectList) == [-1, [onion]]
+    assert "Did you mean:  Onion?" in Reply(session, "take onoin")
+
+def testEmptyNamePicksOutNothing( newSession ):
+    session = ResolvingSession(newSession, [])
+    assert session.names.Resolve("", session.playerRoom, session.objectList) == [-1, []]
+    assert session.names.Resolve("   ", session.playerRoom, session.objectList) == [-1, []]
+    assert Reply(session, "examine ") == Reply(ResolvingSession(newSession, []), "examine nothing")
+
+    session = ResolvingSession(newSession, ["e", "n"])
+    assert "Did you mean" not in Reply(session, "take ")
+
+def testServersResolveNamesOnlyWhenAsked( sharedWorld ):
+    onion = GetObjectID("Onion", sharedWorld[1])
+    for forgivingNames in [True, False]:
+        session = NewSession(sharedWorld[0], sharedWorld[1], sharedWorld[2], forgivingNames)
+        StartGame(session)
+        RunCommandLine(session, "e; n; take oni")
+        session.output.Take()
+        assert (onion in session.playerInventory) == forgivingNames
+
+        sessions = {}
+        CarryOutMessage(openMessage, 1, b"", sessions, sharedWorld, sharedWorld[2], forgivingNames)
+        CarryOutMessage(lineMessage, 1, b"e; n; take oni", sessions, sharedWorld, sharedWorld[2], forgivingNames)
+        assert (onion in sessions[1].playerInventory) == forgivingNames
+
+def testJournalReplaysWithForgivingNames( sharedWorld, tmp_path ):
+    journalFileName = str(tmp_path / "games.journal")
+    journal = Journal(open(journalFileName, "wb"), 50)
+    session = NewSession(sharedWorld[0], sharedWorld[1], sharedWorld[2], True)
+    StartGame(session)
+    journal.RecordSnapshot(1, session)
+    for action in ["e", "n", "take oni"]:
+        RunCommandLine(session, action)
+        journal.RecordCommand(1, session, action)
+    journal.Sync()
+    journal.Close()
+
+    recovered, tokens, problems = RecoverSessions(journalFileName, sharedWorld[0], sharedWorld[1],
+                                                  sharedWorld[2], True)
+    assert problems == []
+    assert recovered[1].names is not None
+    assert SaveSnapshot(recovered[1]) == SaveSnapshot(session)
@@ -0,0 +1,83 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Session views of a shared world (adventure/overlay.py):  whatever one
+session changes stays in that session, and the shared world never changes.
+'''
+
+import copy
+
+import pytest
+
+from adventure.builtin import roomList, objectList
+from adventure.data import GetObjectID, GetObjectLocation, SetObjectLocation, GetObjectStatus, \
+    SetObjectStatus, GetObjectsInRoom, GetRoomExits, SetRoomExit, GetObjectName, SetObjectName, \
+    AddObjectAlias, IsUsableObject, SetUsableObject, inventoryLocation
+from adventure.overlay import FreezeWorld, NewSessionWorld, ExportSessionDelta, LoadSessionDelta
+
+
+def testChangesStayInTheirSession():
+    before = copy.deepcopy([list(roomList), list(objectList)])
+    shared = FreezeWorld(roomList, objectList)
+    firstRooms, firstObjects = NewSessionWorld(shared[0], shared[1])
+    secondRooms, secondObjects = NewSessionWorld(shared[0], shared[1])
+    onion = GetObjectID("Onion", firstObjects)
+    onionRoom = GetObjectLocation(onion, shared[1])
+
+    SetObjectLocation(onion, inventoryLocation, firstObjects)
+    SetObjectStatus(onion, 0, firstObjects)
+    SetRoomExit(0, 0, 3, firstRooms)
+    SetObjectName(onion, "Shallot", firstObjects)
+    AddObjectAlias(onion, "Bulb", firstObjects)
+    SetUsableObject(onion, not IsUsableObject(onion, shared[1]), firstObjects)
+
+    assert GetObjectLocation(onion, firstObjects) == inventoryLocation
+    assert onion in GetObjectsInRoom(inventoryLocation, firstObjects)
+    assert onion not in GetObjectsInRoom(onionRoom, firstObjects)
+    assert GetRoomExits(0, firstRooms)[0] == 3
+    assert GetObjectID("shallot", firstObjects) == onion
+    assert GetObjectID("bulb", firstObjects) == onion
+
+    # The other session and the shared world see none of it.
+    for rooms, objects in [[secondRooms, secondObjects], shared]:
+        assert GetObjectLocation(onion, objects) == onionRoom
+        assert onion in GetObjectsInRoom(onionRoom, objects)
+        assert GetObjectStatus(onion, objects) == GetObjectStatus(onion, objectList)
+        assert GetRoomExits(0, rooms) == tuple(GetRoomExits(0, roomList))
+        assert GetObjectName(onion, objects) == "Onion"
+        assert GetObjectID("shallot", objects) < 0
+        assert GetObjectID("bulb", objects) < 0
+        assert IsUsableObject(onion, objects) == IsUsableObject(onion, objectList)
+    # Nor does the world it was frozen from.
+    assert [list(roomList), list(objectList)] == before
+
+def testSharedWorldIsReadOnly():
+    shared = FreezeWorld(roomList, objectList)
+    with pytest.raises(TypeError):
+        shared[1][0] = shared[1][1]
+    with pytest.raises(TypeError):
+        SetObjectLocation(0, 1, shared[1])
+    with pytest.raises(TypeError):
+        SetRoomExit(0, 0, 1, shared[0])
+
+def testDeltaRoundTrip():
+    shared = FreezeWorld(roomList, objectList)
+    rooms, objects = NewSessionWorld(shared[0], shared[1])
+    SetObjectLocation(1, 2, objects)
+    SetObjectStatus(2, 1, objects)
+    SetRoomExit(3, 1, -1, rooms)
+    AddObjectAlias(1, "Bulb", objects)
+    delta = ExportSessionDelta(rooms, objects)
+
+    otherRooms, otherObjects = NewSessionWorld(shared[0], shared[1])
+    LoadSessionDelta(copy.deepcopy(delta), otherRooms, otherObjects)
+    assert ExportSessionDelta(otherRooms, otherObjects) == delta
+    assert GetObjectLocation(1, otherObjects) == 2
+    assert GetObjectStatus(2, otherObjects) == 1
+    assert GetRoomExits(3, otherRooms)[1] == -1
+    assert GetObjectID("bulb", otherObjects) == 1
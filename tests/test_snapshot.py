@@ -0,0 +1,80 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+Snapshots (adventure/snapshot.py):  saving and loading a game gives back the
+same game, and anything that isn't a whole snapshot is turned away.
+'''
+
+import random
+
+import pytest
+
+from adventure.builtin import roomList, objectList, gameRules
+from adventure.game import GameSession, StartGame, RunCommand
+from adventure.snapshot import SaveSnapshot, LoadSnapshot, headerFormat, snapshotMagic, snapshotVersion
+
+from conftest import winningGame
+
+
+def PlayedSession( newSession, seed, commands ):
+    session = newSession(seed)
+    StartGame(session)
+    for action in commands:
+        RunCommand(session, action)
+    session.output.Take()
+    return session
+
+def testRoundTripKeepsEverything( newSession, sharedWorld ):
+    session = PlayedSession(newSession, 3, winningGame[:7])
+    loaded = LoadSnapshot(SaveSnapshot(session), sharedWorld[0], sharedWorld[1], sharedWorld[2])
+    assert loaded.playerRoom == session.playerRoom
+    assert loaded.playerInventory == session.playerInventory
+    assert loaded.gameTurn == session.gameTurn
+    assert loaded.encounter == session.encounter
+    assert loaded.finished == session.finished
+    assert loaded.rng.getstate() == session.rng.getstate()
+    assert loaded.objectList.ExportDelta() == session.objectList.ExportDelta()
+    assert loaded.roomList.ExportDelta() == session.roomList.ExportDelta()
+    assert SaveSnapshot(loaded) == SaveSnapshot(session)
+
+def testLoadedGamePlaysOnTheSame( newSession, sharedWorld ):
+    for seed in range(20):
+        session = PlayedSession(newSession, seed, winningGame[:5])
+        loaded = LoadSnapshot(SaveSnapshot(session), sharedWorld[0], sharedWorld[1], sharedWorld[2])
+        for action in winningGame[5:]:
+            assert RunCommand(loaded, action) == RunCommand(session, action)
+            assert loaded.output.Take() == session.output.Take()
+        assert loaded.outcome == session.outcome
+
+def testFinishedGameKeepsItsOutcome( newSession, sharedWorld ):
+    session = PlayedSession(newSession, 1, ["exit"])
+    loaded = LoadSnapshot(SaveSnapshot(session), sharedWorld[0], sharedWorld[1], sharedWorld[2])
+    assert loaded.finished
+    assert loaded.outcome == "exit"
+
+def testWrongMagicIsRejected( newSession, sharedWorld ):
+    snapshot = SaveSnapshot(PlayedSession(newSession, 1, []))
+    with pytest.raises(ValueError, match="not a game snapshot"):
+        LoadSnapshot(b"XXXX" + snapshot[4:], sharedWorld[0], sharedWorld[1], sharedWorld[2])
+
+def testOtherVersionsAreRejected( newSession, sharedWorld ):
+    snapshot = SaveSnapshot(PlayedSession(newSession, 1, []))
+    for version in [snapshotVersion - 1, snapshotVersion + 1]:
+        other = headerFormat.pack(snapshotMagic, version, 0) + snapshot[headerFormat.size:]
+        with pytest.raises(ValueError, match="unsupported snapshot version"):
+            LoadSnapshot(other, sharedWorld[0], sharedWorld[1], sharedWorld[2])
+
+def testTruncatedSnapshotsAreRejected( newSession, sharedWorld ):
+    snapshot = SaveSnapshot(PlayedSession(newSession, 2, winningGame[:4]))
+    for length in range(len(snapshot)):
+        with pytest.raises(ValueError):
+            LoadSnapshot(snapshot[:length], sharedWorld[0], sharedWorld[1], sharedWorld[2])
+
+def testOnlySessionViewsCanBeSaved():
+    with pytest.raises(TypeError):
+        SaveSnapshot(GameSession(roomList, objectList, gameRules, random.Random(1)))
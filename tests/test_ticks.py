@@ -0,0 +1,127 @@
+# Example Python Adventure
+# Copyright Tim Rogers 2019
+#
+# License: Apache-2.0
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+
+'''
+World-wide ticks (adventure/ticks.py):  RunTickVectorized makes exactly the
+changes RunTick does, right down to the order of each room's objects.
+'''
+
+import pytest
+
+numpy = pytest.importorskip("numpy")
+
+from adventure import ticks
+from adventure.compact import BuildCompactWorld
+from adventure.data import GetObjectsInRoom, GetObjectLocation, GetObjectStatus, inventoryLocation
+from adventure.game import GameSession
+from adventure.overlay import FreezeWorld, NewSessionWorld
+from adventure.rules import CompileRules
+from adventure.ticks import TickPlan, TickPhase, RunTick, RunTickVectorized
+
+
+turnCount = 6
+
+def MakeGridWorld( side, objectCount ):
+    '''
+    Returns [roomList, objectList] for a side x side grid of rooms, with the
+    objects spread around it.  Every seventh one starts in the inventory.
+    '''
+    roomList = []
+    for row in range(side):
+        for column in range(side):
+            roomID = row * side + column
+            roomList.append([
+                "You are in room %d, %d." % (row, column),
+                [roomID - side if row > 0 else -1,
+                 roomID + 1 if column < side - 1 else -1,
+                 roomID + side if row < side - 1 else -1,
+                 roomID - 1 if column > 0 else -1]])
+    objectList = []
+    for objectID in range(objectCount):
+        location = (objectID * 37) % len(roomList)
+        if objectID % 7 == 3:
+            location = inventoryLocation
+        objectList.append(["Thing%d" % objectID, [], "A thing.", location,
+                           False, True, 0, "", "", ["Still.", "Stirring.", "Restless."]])
+    return [roomList, objectList]
+
+def MakePlan( objectCount, wanderEvery ):
+    '''
+    Returns a TickPlan with a timer or two for every object, two of them on
+    the same turn for some, and every wanderEvery'th object wandering.
+    '''
+    plan = TickPlan()
+    for objectID in range(objectCount):
+        plan.AddTimer(objectID, 1 + objectID % 3, 1)
+        if objectID % 5 == 0:
+            # The one added last wins.
+            plan.AddTimer(objectID, 2, 2)
+            plan.AddTimer(objectID, 2, 0)
+        if objectID % wanderEvery == 0:
+            plan.AddWanderer(objectID)
+    return plan
+
+def AssertSameWorld( world, otherWorld ):
+    assert world[1].locations == otherWorld[1].locations
+    assert world[1].statuses == otherWorld[1].statuses
+    for roomID in range(inventoryLocation, len(world[0])):
+        assert GetObjectsInRoom(roomID, world[1]) == GetObjectsInRoom(roomID, otherWorld[1])
+
+def RunBoth( objectCount, wanderEvery, monkeypatch ):
+    '''
+    Ticks twin compact worlds with RunTick and RunTickVectorized, checking
+    they match after every turn.  Returns how many times RelinkAll ran.
+    '''
+    relinks = []
+    relinkAll = ticks.RelinkAll
+    def CountingRelinkAll( *arguments ):
+        relinks.append(1)
+        relinkAll(*arguments)
+    monkeypatch.setattr(ticks, "RelinkAll", CountingRelinkAll)
+
+    listWorld = MakeGridWorld(4, objectCount)
+    plan = MakePlan(objectCount, wanderEvery)
+    scalarWorld = BuildCompactWorld(listWorld[0], listWorld[1])
+    vectorWorld = BuildCompactWorld(listWorld[0], listWorld[1])
+    scalarRng = numpy.random.default_rng(5)
+    vectorRng = numpy.random.default_rng(5)
+    for turn in range(1, turnCount + 1):
+        RunTick(plan, scalarWorld[0], scalarWorld[1], turn, scalarRng)
+        RunTickVectorized(plan, vectorWorld[0], vectorWorld[1], turn, vectorRng)
+        AssertSameWorld(scalarWorld, vectorWorld)
+    # Timers really did change something, and wanderers really moved.
+    assert vectorWorld[1].statuses != BuildCompactWorld(listWorld[0], listWorld[1])[1].statuses
+    assert vectorWorld[1].locations != BuildCompactWorld(listWorld[0], listWorld[1])[1].locations
+    return len(relinks)
+
+def testOneAtATimeMovesMatch( monkeypatch ):
+    # Few enough wanderers that they are moved one at a time.
+    assert RunBoth(200, 2 * ticks.bulkRelinkShare, monkeypatch) == 0
+
+def testBulkRelinkMatches( monkeypatch ):
+    # Everything wanders, so every turn rebuilds the rooms' chains at once.
+    assert RunBoth(200, 1, monkeypatch) == turnCount
+
+def testPhaseFallsBackWithoutCompactStorage():
+    listWorld = MakeGridWorld(4, 40)
+    plan = MakePlan(40, 2)
+    shared = FreezeWorld(listWorld[0], listWorld[1])
+    sessionWorld = NewSessionWorld(shared[0], shared[1])
+    noRules = CompileRules([], len(listWorld[0]), shared[1])
+    session = GameSession(sessionWorld[0], sessionWorld[1], noRules, None)
+    session.ticks = TickPhase(plan, numpy.random.default_rng(9), True, session.roomList, session.objectList)
+    assert not session.ticks.vectorized
+    session.gameTurn = turnCount
+    session.ticks.RunTurn(session)
+
+    compactWorld = BuildCompactWorld(listWorld[0], listWorld[1])
+    compactRng = numpy.random.default_rng(9)
+    for turn in range(1, turnCount + 1):
+        RunTickVectorized(plan, compactWorld[0], compactWorld[1], turn, compactRng)
+    for objectID in range(len(listWorld[1])):
+        assert GetObjectLocation(objectID, session.objectList) == GetObjectLocation(objectID, compactWorld[1])
+        assert GetObjectStatus(objectID, session.objectList) == GetObjectStatus(objectID, compactWorld[1])